@@ -1,11 +1,286 @@
-from flask import Flask, render_template, request, jsonify
-from models.lineal import resolver_modelo_lineal
-from models.grafico import generar_metodo_grafico
-from models.simplex import resolver_simplex_paso_a_paso
+from flask import Flask, render_template, request, jsonify, make_response, url_for, g
+from models.lineal import resolver_modelo_lineal, resolver_lote, resolver_variaciones, aplicar_variacion
+from models.grafico import (generar_metodo_grafico, generar_imagen_grafico, MODOS_GRAFICO, FORMATOS_IMAGEN,
+                            DPI_FIGURA, DPI_MINIMO, DPI_MAXIMO)
+from models.simplex import resolver_simplex_paso_a_paso, paso_con_tablas
+from models.parametrico import analisis_parametrico
+from models.dispersa import normalizar_coeficientes
+from models.ejecutor import EjecutorResoluciones, PoolSaturado
+from models.serializacion import a_json
+from models.trabajos import GestorTrabajos, AlmacenMemoria, AlmacenSQLite
+from models.cache import CacheResultados, huella_modelo
+from models.backends import MAX_VARIABLES_NUMPY, MAX_RESTRICCIONES_NUMPY
+from models.registro import configurar_registro, nuevo_id_peticion, fijar_id_peticion, id_peticion_actual
 import json
+import logging
+import os
+import time
 
 app = Flask(__name__)
 
+# Registro de la aplicación y de models/ con el id de cada petición (PL_LOG_NIVEL,
+# por defecto WARNING: sin mensajes por petición)
+configurar_registro('models', __name__)
+registro = logging.getLogger(__name__)
+
+# Resoluciones y gráficos se ejecutan en un pool de procesos acotado:
+#   PL_TAMANO_POOL: procesos (por defecto, uno por CPU; 0 = en el hilo de la petición)
+#   PL_MAX_COLA: tareas que pueden esperar además de las que se ejecutan (por defecto, 2 por proceso)
+ejecutor = EjecutorResoluciones(tamano=os.environ.get('PL_TAMANO_POOL'),
+                                max_cola=os.environ.get('PL_MAX_COLA'))
+
+# Caché de resultados de modelos idénticos:
+#   PL_CACHE_BYTES: tamaño máximo en memoria (por defecto 64 MB; 0 la desactiva)
+#   PL_CACHE_DIR: directorio para conservar también las entradas en disco
+bytes_cache = int(os.environ.get('PL_CACHE_BYTES', 64 * 1024 * 1024))
+cache = CacheResultados(max_bytes=bytes_cache, directorio=os.environ.get('PL_CACHE_DIR')) if bytes_cache > 0 else None
+
+# Modelos y bases finales de los resultados de /api/v1/solve, para reoptimizar desde
+# ellos (PL_PREVIOS_BYTES, por defecto 16 MB; los más antiguos se descartan)
+previos = CacheResultados(max_bytes=int(os.environ.get('PL_PREVIOS_BYTES', 16 * 1024 * 1024)))
+
+# Modelos de 2 variables de las páginas de resultados, para servir su gráfico
+# desde /grafico/<id_grafico> (PL_GRAFICOS_BYTES, por defecto 16 MB)
+graficos = CacheResultados(max_bytes=int(os.environ.get('PL_GRAFICOS_BYTES', 16 * 1024 * 1024)))
+
+# Tiempo (en segundos) que navegadores y proxies pueden reutilizar una imagen sin revalidarla
+SEGUNDOS_CACHE_IMAGEN = 24 * 60 * 60
+
+# Trabajos asíncronos: en memoria o, si se indica PL_TRABAJOS_DB, en ese archivo SQLite
+trabajos = GestorTrabajos(AlmacenSQLite(os.environ['PL_TRABAJOS_DB']) if os.environ.get('PL_TRABAJOS_DB')
+                          else AlmacenMemoria(), ejecutor)
+
+def es_pequeno(datos_modelo):
+    """
+    Modelos que se resuelven en el hilo de la petición: los del tamaño que el
+    backend NumPy resuelve por defecto, en los que el envío al pool cuesta más
+    que la propia resolución.
+    """
+    return datos_modelo['num_variables'] <= MAX_VARIABLES_NUMPY and \
+        datos_modelo['num_restricciones'] <= MAX_RESTRICCIONES_NUMPY
+
+def ejecutar_en_cache(espacio, funcion, datos_modelo, directo=False):
+    """
+    Ejecuta funcion(datos_modelo) con el ejecutor, salvo que el mismo modelo
+    (con las mismas opciones) ya esté en la caché. No se guardan los errores
+    ni los resultados cortados por tiempo_limite, que dependen de la carga.
+    """
+    if cache is None:
+        return ejecutor.ejecutar(funcion, datos_modelo, directo=directo)
+
+    clave = huella_modelo(datos_modelo, espacio)
+    resultado = cache.obtener(espacio, clave)
+    if resultado is None:
+        resultado = ejecutor.ejecutar(funcion, datos_modelo, directo=directo)
+        final = resultado.get('resultado_final', resultado)
+        if not resultado.get('error') and final.get('status_text') != 'Tiempo límite alcanzado':
+            cache.guardar(espacio, clave, resultado)
+    return resultado
+
+def leer_datos_modelo(data):
+    """
+    Construye datos_modelo a partir de los campos del formulario (o de un JSON
+    con los mismos nombres de campo), incluidos los límites opcionales de
+    iteraciones y tiempo.
+    """
+    # Procesar datos
+    num_variables = int(data.get('num_variables', 2))
+    num_restricciones = int(data.get('num_restricciones', 2))
+    tipo_operacion = data.get('tipo_operacion', 'maximizar')
+    
+    # Obtener coeficientes de la función objetivo
+    coef_objetivo = []
+    for i in range(1, num_variables + 1):
+        # Asegurarse de que los coeficientes se convierten correctamente a float
+        coef_str = data.get(f'obj_coef_{i}', '0')
+        try:
+            coef = float(coef_str)
+        except ValueError:
+            coef = 0.0
+        coef_objetivo.append(coef)
+    
+    # Obtener coeficientes de las restricciones
+    coef_restricciones = []
+    operadores = []
+    lados_derechos = []
+    
+    for i in range(1, num_restricciones + 1):
+        fila_coefs = []
+        for j in range(1, num_variables + 1):
+            coef = float(data.get(f'rest_coef_{i}_{j}', 0))
+            fila_coefs.append(coef)
+        
+        coef_restricciones.append(fila_coefs)
+        operadores.append(data.get(f'operador_{i}', '<='))
+        lados_derechos.append(float(data.get(f'lado_derecho_{i}', 0)))
+    
+    # Preparar datos para el modelo
+    datos_modelo = {
+        'num_variables': num_variables,
+        'num_restricciones': num_restricciones,
+        'coef_objetivo': coef_objetivo,
+        'tipo_operacion': tipo_operacion,
+        'coef_restricciones': coef_restricciones,
+        'operadores': operadores,
+        'lados_derechos': lados_derechos
+    }
+    
+    # Límites opcionales: se ignoran si vienen vacíos
+    if data.get('max_iteraciones') not in (None, ''):
+        datos_modelo['max_iteraciones'] = int(data['max_iteraciones'])
+    if data.get('tiempo_limite') not in (None, ''):
+        datos_modelo['tiempo_limite'] = float(data['tiempo_limite'])
+    
+    return datos_modelo
+
+def leer_peticion():
+    """
+    Devuelve los campos de la petición, tanto de un formulario como de un cuerpo JSON.
+    """
+    if request.is_json:
+        return request.get_json()
+    return request.form.to_dict()
+
+# Parámetros opcionales que la API pasa tal cual a los solvers
+OPCIONES_API = ('backend', 'metodo', 'modo_traza', 'regla_precio', 'max_iteraciones', 'tiempo_limite',
+                'base_inicial', 'presolve', 'escalado')
+
+def leer_modelo_json(cuerpo):
+    """
+    Construye datos_modelo a partir del cuerpo compacto de la API:
+
+        {
+            "tipo_operacion": "maximizar",
+            "objetivo": [3, 5],
+            "restricciones": [[1, 0], [0, 2]],
+            "operadores": ["<=", "<="],
+            "lados_derechos": [4, 12]
+        }
+
+    restricciones también puede ser una matriz dispersa COO/CSR (ver
+    models/dispersa.py). Acepta además las opciones de OPCIONES_API.
+
+    Raises:
+        ValueError: Si falta algún campo o las dimensiones no concuerdan
+    """
+    if not isinstance(cuerpo, dict):
+        raise ValueError("El cuerpo de la petición debe ser un objeto JSON")
+    for campo in ('objetivo', 'restricciones', 'lados_derechos'):
+        if campo not in cuerpo:
+            raise ValueError(f"Falta el campo {campo}")
+
+    coef_objetivo = [float(c) for c in cuerpo['objetivo']]
+    lados_derechos = [float(b) for b in cuerpo['lados_derechos']]
+    num_variables = len(coef_objetivo)
+    num_restricciones = len(lados_derechos)
+    operadores = list(cuerpo.get('operadores', ['<='] * num_restricciones))
+    tipo_operacion = cuerpo.get('tipo_operacion', 'maximizar')
+
+    if num_variables == 0:
+        raise ValueError("objetivo no puede estar vacío")
+    if tipo_operacion not in ('maximizar', 'minimizar'):
+        raise ValueError(f"tipo_operacion desconocido: {tipo_operacion}")
+    if len(operadores) != num_restricciones:
+        raise ValueError("operadores y lados_derechos deben tener la misma longitud")
+    for op in operadores:
+        if op not in ('<=', '>=', '='):
+            raise ValueError(f"Operador desconocido: {op}")
+
+    coef_restricciones = cuerpo['restricciones']
+    if not isinstance(coef_restricciones, dict):
+        coef_restricciones = [[float(a) for a in fila] for fila in coef_restricciones]
+        if len(coef_restricciones) != num_restricciones or \
+                any(len(fila) != num_variables for fila in coef_restricciones):
+            raise ValueError("restricciones debe tener una fila por lado derecho y una columna por variable")
+
+    datos_modelo = normalizar_coeficientes({
+        'num_variables': num_variables,
+        'num_restricciones': num_restricciones,
+        'coef_objetivo': coef_objetivo,
+        'tipo_operacion': tipo_operacion,
+        'coef_restricciones': coef_restricciones,
+        'operadores': operadores,
+        'lados_derechos': lados_derechos
+    })
+    for opcion in OPCIONES_API:
+        if cuerpo.get(opcion) is not None:
+            datos_modelo[opcion] = cuerpo[opcion]
+    return datos_modelo
+
+def modelo_api(datos_modelo):
+    """
+    Cuerpo de la API equivalente a datos_modelo (lo contrario de
+    leer_modelo_json), para que la página del Simplex pida a /api/v1/simplex
+    las tablas de un paso.
+    """
+    cuerpo = {
+        'tipo_operacion': datos_modelo['tipo_operacion'],
+        'objetivo': datos_modelo['coef_objetivo'],
+        'restricciones': datos_modelo['coef_restricciones'],
+        'operadores': datos_modelo['operadores'],
+        'lados_derechos': datos_modelo['lados_derechos']
+    }
+    # Sin tiempo_limite: los pasos ya mostrados no dependen de él, y con el mismo
+    # límite una nueva resolución podría cortarse antes de llegar al paso pedido
+    for opcion in OPCIONES_API:
+        if opcion != 'tiempo_limite' and datos_modelo.get(opcion) is not None:
+            cuerpo[opcion] = datos_modelo[opcion]
+    return cuerpo
+
+def leer_variacion_json(variacion):
+    """
+    Traduce una variación de la API ("objetivo", "lados_derechos", ...) a los
+    nombres de campo de datos_modelo.
+    """
+    if not isinstance(variacion, dict):
+        raise ValueError("Cada variación debe ser un objeto JSON")
+    variacion = dict(variacion)
+    if 'objetivo' in variacion:
+        variacion['coef_objetivo'] = [float(c) for c in variacion.pop('objetivo')]
+    if 'lados_derechos' in variacion:
+        variacion['lados_derechos'] = [float(b) for b in variacion['lados_derechos']]
+    return variacion
+
+def error_api(mensaje, codigo=400):
+    return jsonify({'error': mensaje}), codigo
+
+@app.errorhandler(PoolSaturado)
+def pool_saturado(e):
+    """
+    Con el pool saturado se responde 503 con Retry-After en lugar de encolar
+    la petición: JSON en la API y las imágenes, y la página de resultados con
+    el error en el resto.
+    """
+    registro.warning("Pool saturado: %s %s rechazada", request.method, request.path)
+    if request.path.startswith(('/api/', '/grafico/')):
+        respuesta = make_response(jsonify({'error': str(e)}))
+    else:
+        respuesta = make_response(render_template('results.html',
+                                                  resultados={'error': str(e)},
+                                                  datos={},
+                                                  metodo_grafico=None,
+                                                  tiene_grafico=False))
+    respuesta.status_code = 503
+    respuesta.headers['Retry-After'] = str(e.reintentar_en)
+    return respuesta
+
+@app.before_request
+def iniciar_peticion():
+    """
+    Asigna a la petición un id para sus mensajes de registro: el de la cabecera
+    X-Request-ID si lo trae (de un proxy, por ejemplo) o uno nuevo.
+    """
+    fijar_id_peticion(nuevo_id_peticion(request.headers.get('X-Request-ID')))
+    g.inicio = time.perf_counter()
+
+@app.after_request
+def terminar_peticion(respuesta):
+    respuesta.headers['X-Request-ID'] = id_peticion_actual()
+    if 'inicio' in g:
+        registro.info("peticion metodo=%s ruta=%s estado=%d ms=%.1f", request.method, request.path,
+                      respuesta.status_code, (time.perf_counter() - g.inicio) * 1000)
+    return respuesta
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -13,133 +288,337 @@ def index():
 @app.route('/resolver', methods=['POST'])
 def resolver():
     try:
-        # Obtener datos del formulario
-        data = request.form.to_dict()
-        
-        # Procesar datos
-        num_variables = int(data.get('num_variables', 2))
-        num_restricciones = int(data.get('num_restricciones', 2))
-        tipo_operacion = data.get('tipo_operacion', 'maximizar')
-        
-        # Obtener coeficientes de la función objetivo
-        coef_objetivo = []
-        for i in range(1, num_variables + 1):
-            # Asegurarse de que los coeficientes se convierten correctamente a float
-            coef_str = data.get(f'obj_coef_{i}', '0')
-            try:
-                coef = float(coef_str)
-            except ValueError:
-                coef = 0.0
-            coef_objetivo.append(coef)
-        
-        # Obtener coeficientes de las restricciones
-        coef_restricciones = []
-        operadores = []
-        lados_derechos = []
-        
-        for i in range(1, num_restricciones + 1):
-            fila_coefs = []
-            for j in range(1, num_variables + 1):
-                coef = float(data.get(f'rest_coef_{i}_{j}', 0))
-                fila_coefs.append(coef)
-            
-            coef_restricciones.append(fila_coefs)
-            operadores.append(data.get(f'operador_{i}', '<='))
-            lados_derechos.append(float(data.get(f'lado_derecho_{i}', 0)))
-        
-        # Preparar datos para el modelo
-        datos_modelo = {
-            'num_variables': num_variables,
-            'num_restricciones': num_restricciones,
-            'coef_objetivo': coef_objetivo,
-            'tipo_operacion': tipo_operacion,
-            'coef_restricciones': coef_restricciones,
-            'operadores': operadores,
-            'lados_derechos': lados_derechos
-        }
+        # Obtener datos del formulario (o JSON)
+        data = leer_peticion()
+        datos_modelo = leer_datos_modelo(data)
+        num_variables = datos_modelo['num_variables']
         
         # Resolver el modelo
-        resultados = resolver_modelo_lineal(datos_modelo)
+        resultados = ejecutar_en_cache('resultado', resolver_modelo_lineal, datos_modelo,
+                                       directo=es_pequeno(datos_modelo))
         
-        # Si el problema tiene 2 variables, generar el método gráfico
+        # Si el problema tiene 2 variables, generar el método gráfico: la página lleva
+        # su geometría y la imagen se sirve aparte (ver imagen_grafico)
         metodo_grafico = None
+        id_grafico = None
+        modo_grafico = data.get('modo_grafico', 'cliente')
         if num_variables == 2:
-            metodo_grafico = generar_metodo_grafico(datos_modelo)
+            if modo_grafico not in MODOS_GRAFICO:
+                metodo_grafico = {'error': f'Modo de gráfico desconocido: {modo_grafico}'}
+            else:
+                metodo_grafico = ejecutar_en_cache('grafico', generar_metodo_grafico,
+                                                   dict(datos_modelo, modo_grafico='cliente'),
+                                                   directo=es_pequeno(datos_modelo))
+                id_grafico = registrar_grafico(datos_modelo)
         
         # Renderizar la página de resultados
         return render_template('results.html', 
                               resultados=resultados, 
                               datos=datos_modelo,
                               metodo_grafico=metodo_grafico,
+                              modo_grafico=modo_grafico,
+                              id_grafico=id_grafico,
                               tiene_grafico=(num_variables == 2))
     
+    except PoolSaturado:
+        raise
     except Exception as e:
+        registro.info("Error en /resolver: %s", e, exc_info=registro.isEnabledFor(logging.DEBUG))
         return render_template('results.html', 
                               resultados={'error': str(e)}, 
                               datos={},
                               metodo_grafico=None,
                               tiene_grafico=False)
 
+def registrar_grafico(datos_modelo):
+    """
+    Guarda el modelo para servir después su gráfico y devuelve su id_grafico
+    (la huella del modelo, que identifica también la imagen).
+    """
+    id_grafico = huella_modelo(datos_modelo, 'grafico')
+    graficos.guardar('grafico', id_grafico, datos_modelo)
+    return id_grafico
+
+@app.route('/grafico/<id_grafico>.<formato>')
+def imagen_grafico(id_grafico, formato):
+    """
+    Imagen del método gráfico de un modelo registrado por /resolver, en formato
+    png, svg o webp y con la resolución del parámetro dpi. La imagen depende
+    solo del modelo, el formato y la resolución, así que su ETag se conoce sin
+    generarla: una petición condicional que coincide recibe 304 sin más trabajo,
+    y el resto pasa por la caché de resultados.
+    """
+    if formato not in FORMATOS_IMAGEN:
+        return error_api(f'Formato de imagen desconocido: {formato}', 404)
+    try:
+        dpi = int(request.args.get('dpi', DPI_FIGURA))
+    except ValueError:
+        return error_api('El parámetro dpi debe ser un número entero')
+    if not DPI_MINIMO <= dpi <= DPI_MAXIMO:
+        return error_api(f'La resolución debe estar entre {DPI_MINIMO} y {DPI_MAXIMO} dpi')
+
+    etag = f'{id_grafico}-{dpi}.{formato}'
+    if request.if_none_match.contains(etag):
+        respuesta = make_response('', 304)
+    else:
+        datos_modelo = graficos.obtener('grafico', id_grafico)
+        if datos_modelo is None:
+            return error_api('Gráfico no encontrado o caducado: vuelva a resolver el modelo', 404)
+        imagen = ejecutar_en_cache('imagen', generar_imagen_grafico,
+                                   dict(datos_modelo, formato_imagen=formato, dpi=dpi))
+        if imagen.get('error'):
+            return error_api(imagen['error'])
+        respuesta = make_response(imagen['contenido'])
+        respuesta.mimetype = imagen['tipo']
+    respuesta.set_etag(etag)
+    respuesta.cache_control.public = True
+    respuesta.cache_control.max_age = SEGUNDOS_CACHE_IMAGEN
+    return respuesta
+
 @app.route('/simplex', methods=['POST'])
 def simplex():
     try:
-        # Obtener datos del formulario
-        data = request.form.to_dict()
-        
-        # Procesar datos
-        num_variables = int(data.get('num_variables', 2))
-        num_restricciones = int(data.get('num_restricciones', 2))
-        tipo_operacion = data.get('tipo_operacion', 'maximizar')
-        
-        # Obtener coeficientes de la función objetivo
-        coef_objetivo = []
-        for i in range(1, num_variables + 1):
-            # Asegurarse de que los coeficientes se convierten correctamente a float
-            coef_str = data.get(f'obj_coef_{i}', '0')
-            try:
-                coef = float(coef_str)
-            except ValueError:
-                coef = 0.0
-            coef_objetivo.append(coef)
-        
-        # Obtener coeficientes de las restricciones
-        coef_restricciones = []
-        operadores = []
-        lados_derechos = []
-        
-        for i in range(1, num_restricciones + 1):
-            fila_coefs = []
-            for j in range(1, num_variables + 1):
-                coef = float(data.get(f'rest_coef_{i}_{j}', 0))
-                fila_coefs.append(coef)
-            
-            coef_restricciones.append(fila_coefs)
-            operadores.append(data.get(f'operador_{i}', '<='))
-            lados_derechos.append(float(data.get(f'lado_derecho_{i}', 0)))
-        
-        # Preparar datos para el modelo
-        datos_modelo = {
-            'num_variables': num_variables,
-            'num_restricciones': num_restricciones,
-            'coef_objetivo': coef_objetivo,
-            'tipo_operacion': tipo_operacion,
-            'coef_restricciones': coef_restricciones,
-            'operadores': operadores,
-            'lados_derechos': lados_derechos
-        }
+        # Obtener datos del formulario (o JSON)
+        data = leer_peticion()
+        datos_modelo = leer_datos_modelo(data)
+        datos_modelo.update({
+            'metodo': data.get('metodo', 'auto'),
+            'modo_traza': data.get('modo_traza', 'completo'),
+            'regla_precio': data.get('regla_precio', 'dantzig')
+        })
         
         # Resolver el modelo usando el método Simplex paso a paso
-        resultados_simplex = resolver_simplex_paso_a_paso(datos_modelo)
+        resultados_simplex = ejecutar_en_cache('pasos', resolver_simplex_paso_a_paso, datos_modelo,
+                                               directo=es_pequeno(datos_modelo))
         
         # Renderizar la página de resultados del Simplex
         return render_template('simplex_results.html', 
                               resultados=resultados_simplex, 
-                              datos=datos_modelo)
+                              datos=datos_modelo,
+                              modelo_api=modelo_api(datos_modelo))
     
+    except PoolSaturado:
+        raise
     except Exception as e:
+        registro.info("Error en /simplex: %s", e, exc_info=registro.isEnabledFor(logging.DEBUG))
         return render_template('simplex_results.html', 
                               resultados={'error': str(e)}, 
                               datos={})
 
+@app.route('/api/v1/solve', methods=['POST'])
+def api_resolver():
+    """
+    Resuelve el modelo del cuerpo JSON y devuelve los resultados en JSON, sin
+    renderizar plantillas. Con "grafico": true (o "imagen") y 2 variables incluye
+    además el método gráfico con la imagen en base64; con "grafico": "cliente",
+    solo su geometría, para dibujarlo en el cliente.
+    """
+    try:
+        cuerpo = request.get_json(silent=True)
+        datos_modelo = leer_modelo_json(cuerpo)
+    except (ValueError, TypeError) as e:
+        return error_api(str(e))
+
+    return responder_resultado(datos_modelo, cuerpo.get('grafico'))
+
+@app.route('/api/v1/solve/<id_resultado>/resolve', methods=['POST'])
+def api_reoptimizar(id_resultado):
+    """
+    Reoptimiza un resultado anterior (su id_resultado) con los cambios del
+    cuerpo, con los campos de una variación de lote ("objetivo",
+    "lados_derechos", ...), arrancando desde su base final: simplex dual si
+    cambian los lados derechos y primal si cambia el objetivo.
+    """
+    previo = previos.obtener('resultado', id_resultado)
+    if previo is None:
+        return error_api('Resultado no encontrado o caducado: envíe el modelo completo a /api/v1/solve', 404)
+
+    cuerpo = request.get_json(silent=True)
+    try:
+        if not isinstance(cuerpo, dict):
+            raise ValueError("El cuerpo de la petición debe ser un objeto JSON")
+        variacion = {clave: valor for clave, valor in cuerpo.items() if clave != 'grafico'}
+        datos_modelo = aplicar_variacion(previo['datos'], leer_variacion_json(variacion))
+    except (ValueError, TypeError) as e:
+        return error_api(str(e))
+    datos_modelo['base_inicial'] = previo['base']
+
+    return responder_resultado(datos_modelo, cuerpo.get('grafico'))
+
+def responder_resultado(datos_modelo, grafico):
+    """
+    Resuelve datos_modelo y devuelve la respuesta JSON de /api/v1/solve. Si el
+    resultado trae la base final, incluye un id_resultado para reoptimizar.
+    """
+    resultados = ejecutar_en_cache('resultado', resolver_modelo_lineal, datos_modelo,
+                                   directo=es_pequeno(datos_modelo))
+    if resultados.get('error'):
+        return error_api(resultados['error'])
+
+    if resultados.get('base') is not None:
+        resultados['id_resultado'] = huella_modelo(datos_modelo, 'resultado')
+        modelo = {clave: valor for clave, valor in datos_modelo.items() if clave != 'base_inicial'}
+        previos.guardar('resultado', resultados['id_resultado'], {'datos': modelo, 'base': resultados['base']})
+
+    if grafico and datos_modelo['num_variables'] == 2:
+        modo_grafico = grafico if isinstance(grafico, str) else 'imagen'
+        # Solo la geometría es tan ligera como la resolución directa; la imagen se dibuja en el pool
+        resultados['metodo_grafico'] = ejecutar_en_cache('grafico', generar_metodo_grafico,
+                                                         dict(datos_modelo, modo_grafico=modo_grafico),
+                                                         directo=es_pequeno(datos_modelo) and modo_grafico == 'cliente')
+    return jsonify(a_json(resultados))
+
+@app.route('/api/v1/solve/batch', methods=['POST'])
+def api_resolver_lote():
+    """
+    Resuelve muchas instancias en una sola petición. El cuerpo es una de estas formas:
+
+        {"instancias": [<modelo>, <modelo>, ...]}
+        {"modelo": <modelo>, "variaciones": [{"lados_derechos": [...]}, {"objetivo": [...]}, ...]}
+
+    donde <modelo> tiene el formato de /api/v1/solve. Con variaciones se
+    reutiliza la estructura del modelo base. Devuelve los resultados en el
+    mismo orden junto con tiempo_total e instancias_por_segundo.
+    """
+    cuerpo = request.get_json(silent=True)
+    try:
+        if not isinstance(cuerpo, dict):
+            raise ValueError("El cuerpo de la petición debe ser un objeto JSON")
+        if 'instancias' in cuerpo:
+            lote = ejecutor.ejecutar(resolver_lote, [leer_modelo_json(instancia) for instancia in cuerpo['instancias']])
+        elif 'modelo' in cuerpo and 'variaciones' in cuerpo:
+            lote = ejecutor.ejecutar(resolver_variaciones, leer_modelo_json(cuerpo['modelo']),
+                                     [leer_variacion_json(v) for v in cuerpo['variaciones']])
+        else:
+            raise ValueError("El lote necesita instancias, o bien modelo y variaciones")
+    except (ValueError, TypeError) as e:
+        return error_api(str(e))
+
+    return jsonify(a_json(lote))
+
+@app.route('/api/v1/solve/parametric', methods=['POST'])
+def api_parametrico():
+    """
+    Valor óptimo en función de un lado derecho o de un coeficiente del
+    objetivo. El cuerpo es el de /api/v1/solve más:
+
+        "parametro": {"tipo": "lado_derecho", "indice": 2, "desde": 0, "hasta": 40}
+
+    Devuelve los tramos lineales de la curva y sus puntos de ruptura (ver
+    analisis_parametrico), con una reoptimización por tramo.
+    """
+    cuerpo = request.get_json(silent=True)
+    try:
+        datos_modelo = leer_modelo_json(cuerpo)
+        if 'parametro' not in cuerpo:
+            raise ValueError("Falta el campo parametro")
+        resultado = ejecutor.ejecutar(analisis_parametrico, datos_modelo, cuerpo['parametro'],
+                                      directo=es_pequeno(datos_modelo))
+    except (ValueError, TypeError) as e:
+        return error_api(str(e))
+
+    return jsonify(a_json(resultado))
+
+@app.route('/api/v1/simplex', methods=['POST'])
+def api_simplex():
+    """
+    Simplex paso a paso en JSON: pasos (con sus tablas como listas) y
+    resultado_final. La vista combinada de la Gran M, que solo usan las
+    plantillas, no se incluye.
+
+    Con ?paso=k devuelve solo el paso k con sus tablas, reconstruidas si el
+    modo de traza ("iteraciones" o "pivotes") no las guardó (ver paso_con_tablas).
+    """
+    try:
+        indice_paso = request.args.get('paso')
+        if indice_paso is not None:
+            try:
+                indice_paso = int(indice_paso)
+            except ValueError:
+                raise ValueError("El parámetro paso debe ser un número entero")
+        datos_modelo = leer_modelo_json(request.get_json(silent=True))
+        resultados = ejecutar_en_cache('pasos', resolver_simplex_paso_a_paso, datos_modelo,
+                                       directo=es_pequeno(datos_modelo))
+        if indice_paso is not None:
+            paso = paso_con_tablas(resultados, indice_paso)
+            paso.pop('Tabla_combinado', None)
+            return jsonify(a_json(paso))
+    except (ValueError, TypeError) as e:
+        return error_api(str(e))
+
+    return jsonify(simplex_a_json(resultados))
+
+def simplex_a_json(resultados):
+    # La vista combinada de la Gran M solo la usan las plantillas
+    for paso in resultados.get('pasos', []):
+        paso.pop('Tabla_combinado', None)
+    return a_json(resultados)
+
+@app.route('/api/v1/cache', methods=['GET'])
+def api_estadisticas_cache():
+    """
+    Entradas, bytes ocupados y aciertos/fallos de la caché por tipo de entrada.
+    """
+    if cache is None:
+        return jsonify({'activa': False})
+    return jsonify(dict(cache.estadisticas(), activa=True))
+
+# Tipos de trabajo: función de resolución y conversión del resultado a JSON
+TIPOS_TRABAJO = {
+    'solve': (resolver_modelo_lineal, a_json),
+    'simplex': (resolver_simplex_paso_a_paso, simplex_a_json)
+}
+
+@app.route('/api/v1/jobs', methods=['POST'])
+def api_enviar_trabajo():
+    """
+    Encola una resolución larga y responde 202 con su id. El cuerpo es el de
+    /api/v1/solve con "tipo": "solve" (por defecto) o "simplex".
+    """
+    cuerpo = request.get_json(silent=True)
+    try:
+        datos_modelo = leer_modelo_json(cuerpo)
+        tipo = cuerpo.get('tipo', 'solve')
+        if tipo not in TIPOS_TRABAJO:
+            raise ValueError(f"Tipo de trabajo desconocido: {tipo}")
+    except (ValueError, TypeError) as e:
+        return error_api(str(e))
+
+    funcion, convertir = TIPOS_TRABAJO[tipo]
+    id_trabajo = trabajos.enviar(tipo, funcion, datos_modelo, convertir)
+    respuesta = jsonify({'id': id_trabajo, 'estado': 'pendiente',
+                         'url': url_for('api_consultar_trabajo', id_trabajo=id_trabajo)})
+    respuesta.status_code = 202
+    respuesta.headers['Location'] = url_for('api_consultar_trabajo', id_trabajo=id_trabajo)
+    return respuesta
+
+@app.route('/api/v1/jobs/<id_trabajo>', methods=['GET'])
+def api_consultar_trabajo(id_trabajo):
+    """
+    Estado del trabajo y progreso: iteración del Simplex en curso y valor
+    del objetivo hasta el momento (None mientras la base no es factible).
+    """
+    trabajo = trabajos.consultar(id_trabajo)
+    if trabajo is None:
+        return error_api('Trabajo no encontrado', 404)
+    if trabajo['estado'] == 'terminado':
+        trabajo['url_resultado'] = url_for('api_resultado_trabajo', id_trabajo=id_trabajo)
+    return jsonify(trabajo)
+
+@app.route('/api/v1/jobs/<id_trabajo>/resultado', methods=['GET'])
+def api_resultado_trabajo(id_trabajo):
+    """
+    Resultado de un trabajo terminado (el de /api/v1/solve o /api/v1/simplex);
+    202 con el estado si aún no ha terminado.
+    """
+    trabajo = trabajos.resultado(id_trabajo)
+    if trabajo is None:
+        return error_api('Trabajo no encontrado', 404)
+    if trabajo['estado'] == 'error':
+        return error_api(trabajo['error'])
+    if trabajo['estado'] != 'terminado':
+        return jsonify({'id': id_trabajo, 'estado': trabajo['estado']}), 202
+    return jsonify(trabajo['resultado'])
+
 if __name__ == '__main__':
     app.run(debug=True)
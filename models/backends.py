@@ -0,0 +1,211 @@
+from pulp import (LpProblem, LpVariable, LpAffineExpression, LpMinimize, LpMaximize, PULP_CBC_CMD, value,
+                  LpSolutionNoSolutionFound, LpSolutionIntegerFeasible)
+from models.dispersa import coeficientes_fila
+from models.simplex import resolver_simplex_paso_a_paso
+
+# Tamaño máximo (variables y restricciones) para el que el backend NumPy es la opción por defecto
+MAX_VARIABLES_NUMPY = 20
+MAX_RESTRICCIONES_NUMPY = 20
+
+# Códigos de estado compatibles con los de PuLP (LpStatus)
+ESTADOS_SIMPLEX = {
+    "Óptimo": 1,
+    "Número máximo de iteraciones alcanzado": 0,
+    "Problema sin solución factible": -1,
+    "Problema no acotado": -2,
+    "Tiempo límite alcanzado": 0,
+}
+
+def resolver_con_cbc(datos):
+    """
+    Resuelve el modelo con PuLP lanzando el binario CBC como proceso externo.
+    Si datos incluye tiempo_limite, CBC se detiene al agotarlo y devuelve la
+    mejor solución hallada.
+
+    Args:
+        datos: Diccionario con los datos del modelo (ver resolver_modelo_lineal)
+
+    Returns:
+        Diccionario con status, status_text, valor_objetivo, variables y, si es
+        óptimo, sensibilidad con los precios sombra y costos reducidos de CBC
+        (sin los rangos, que CBC no calcula)
+    """
+    prob, variables, _ = _construir_modelo_cbc(datos)
+    return _resolver_modelo_cbc(prob, variables, datos.get("tiempo_limite"))
+
+def reutilizar_modelo_cbc():
+    """
+    Devuelve un backend CBC para instancias que comparten coef_restricciones y
+    operadores (las variaciones de un lote). El modelo PuLP se construye con la
+    primera instancia; en las siguientes solo se cambian el objetivo, el sentido
+    de la optimización y los lados derechos.
+    """
+    modelo = {}
+
+    def resolver(datos):
+        # El presolve puede dar a una variante una estructura distinta: entonces se reconstruye
+        if not modelo or modelo["coef"] is not datos["coef_restricciones"] or modelo["operadores"] != datos["operadores"]:
+            modelo["prob"], modelo["variables"], modelo["restricciones"] = _construir_modelo_cbc(datos)
+            modelo["coef"], modelo["operadores"] = datos["coef_restricciones"], list(datos["operadores"])
+        else:
+            prob, variables = modelo["prob"], modelo["variables"]
+            prob.sense = LpMaximize if datos["tipo_operacion"] == "maximizar" else LpMinimize
+            prob.setObjective(LpAffineExpression(zip(variables, datos["coef_objetivo"])))
+            for restriccion, lado_derecho in zip(modelo["restricciones"], datos["lados_derechos"]):
+                restriccion.constant = -lado_derecho
+        return _resolver_modelo_cbc(modelo["prob"], modelo["variables"], datos.get("tiempo_limite"))
+
+    return resolver
+
+def _construir_modelo_cbc(datos):
+    """
+    Construye el problema PuLP y devuelve (problema, variables, restricciones).
+    """
+    # Crear el problema
+    if datos["tipo_operacion"] == "maximizar":
+        prob = LpProblem("Problema_PL", LpMaximize)
+    else:
+        prob = LpProblem("Problema_PL", LpMinimize)
+
+    # Crear variables
+    num_vars = datos["num_variables"]
+    variables = [LpVariable(f"x{i}", lowBound=0) for i in range(1, num_vars + 1)]
+
+    # Definir función objetivo
+    coef_obj = datos["coef_objetivo"]
+    prob += sum(coef_obj[i] * variables[i] for i in range(num_vars))
+
+    # Añadir restricciones (solo con los coeficientes no nulos de cada fila)
+    restricciones = []
+    for i in range(datos["num_restricciones"]):
+        indices, valores = coeficientes_fila(datos["coef_restricciones"], i)
+        operador = datos["operadores"][i]
+        lado_derecho = datos["lados_derechos"][i]
+
+        expresion = LpAffineExpression([(variables[j], float(v)) for j, v in zip(indices, valores)])
+
+        if operador == "<=":
+            restriccion = (expresion <= lado_derecho)
+        elif operador == ">=":
+            restriccion = (expresion >= lado_derecho)
+        else:  # operador == "="
+            restriccion = (expresion == lado_derecho)
+        prob += restriccion
+        restricciones.append(restriccion)
+
+    return prob, variables, restricciones
+
+def _resolver_modelo_cbc(prob, variables, tiempo_limite):
+    # Resolver el problema
+    prob.solve(PULP_CBC_CMD(msg=False, timeLimit=tiempo_limite))
+    num_vars = len(variables)
+
+    # CBC detenido por tiempo: "Solution Found" (sin probar optimalidad) o ninguna solución
+    if tiempo_limite is not None and prob.sol_status in [LpSolutionIntegerFeasible, LpSolutionNoSolutionFound]:
+        return {
+            "status": 0,
+            "status_text": "Tiempo límite alcanzado",
+            "valor_objetivo": value(prob.objective),
+            "variables": [{"nombre": f"x{i+1}", "valor": value(variables[i])} for i in range(num_vars)]
+        }
+
+    valor_objetivo = value(prob.objective)
+    if prob.status == 1 and valor_objetivo is None:
+        valor_objetivo = 0.0  # Objetivo sin términos (p. ej. el de un modelo reducido por el presolve)
+    resultado = {
+        "status": prob.status,
+        "status_text": prob.status == 1 and "Óptimo" or "No óptimo",
+        "valor_objetivo": valor_objetivo,
+        "variables": [{"nombre": f"x{i+1}", "valor": value(variables[i])} for i in range(num_vars)]
+    }
+    if prob.status == 1:
+        resultado["sensibilidad"] = _sensibilidad_cbc(prob, variables)
+    return resultado
+
+def _sensibilidad_cbc(prob, variables):
+    """
+    Precios sombra (pi) y costos reducidos (dj) que devuelve CBC, con el mismo
+    formato que analisis_sensibilidad (models/sensibilidad.py) y sin rangos.
+    """
+    operadores = {-1: "<=", 1: ">=", 0: "="}
+    # CBC no informa de las columnas y filas vacías: su costo reducido es el coeficiente y su precio sombra 0
+    return {
+        "variables": [{
+            "nombre": f"x{i+1}",
+            "valor": value(variable) or 0.0,
+            "coeficiente": float(prob.objective.get(variable, 0.0)),
+            "costo_reducido": (float(prob.objective.get(variable, 0.0)) if variable.dj is None else variable.dj) + 0.0,
+            "rango_coeficiente": None
+        } for i, variable in enumerate(variables)],
+        "restricciones": [{
+            "restriccion": i + 1,
+            "operador": operadores[restriccion.sense],
+            "lado_derecho": -restriccion.constant,
+            # value() de la restricción es lado izquierdo - lado derecho
+            "holgura": abs(restriccion.value()),
+            "precio_sombra": (restriccion.pi or 0.0) + 0.0,
+            "rango_lado_derecho": None
+        } for i, restriccion in enumerate(prob.constraints.values())]
+    }
+
+def resolver_con_numpy(datos):
+    """
+    Resuelve el modelo en el propio proceso con el método Simplex tabular de models/simplex.py.
+
+    Args:
+        datos: Diccionario con los datos del modelo (ver resolver_modelo_lineal)
+
+    Returns:
+        Diccionario con status, status_text, valor_objetivo, variables, iteraciones
+        base (la base final, que admite como base_inicial una nueva resolución)
+        y, si es óptimo, sensibilidad (ver models/sensibilidad.py)
+    """
+    # Solo interesa el resultado final: no se guardan copias de la tabla en cada paso
+    resultado = resolver_simplex_paso_a_paso(dict(datos, modo_traza="pivotes"))["resultado_final"]
+    status = ESTADOS_SIMPLEX.get(resultado["status_text"], 0)
+
+    variables = None
+    if resultado["variables"] is not None:
+        variables = [{"nombre": var["nombre"], "valor": float(var["valor"])} for var in resultado["variables"]]
+
+    return {
+        "status": status,
+        "status_text": resultado["status_text"],
+        "valor_objetivo": float(resultado["valor_objetivo"]) if resultado["valor_objetivo"] is not None else None,
+        "variables": variables,
+        "iteraciones": resultado.get("iteraciones"),
+        "base": resultado.get("base"),
+        "arranque_en_caliente": resultado.get("arranque_en_caliente", False),
+        "sensibilidad": resultado.get("sensibilidad")
+    }
+
+# Registro de backends disponibles: nombre -> función que recibe datos y devuelve el resultado
+BACKENDS = {
+    "numpy": resolver_con_numpy,
+    "cbc": resolver_con_cbc,
+}
+
+def registrar_backend(nombre, funcion):
+    """
+    Registra un nuevo backend de resolución bajo el nombre indicado.
+    """
+    BACKENDS[nombre] = funcion
+
+def seleccionar_backend(datos):
+    """
+    Elige el backend a usar: el indicado en datos["backend"] o, en modo "auto",
+    NumPy para modelos pequeños y CBC para el resto. Con una base_inicial se usa
+    NumPy a cualquier tamaño, porque CBC no arranca desde una base previa.
+    """
+    nombre = datos.get("backend", "auto")
+
+    if nombre != "auto":
+        if nombre not in BACKENDS:
+            raise ValueError(f"Backend desconocido: {nombre}")
+        return nombre
+
+    if datos.get("base_inicial") is not None:
+        return "numpy"
+    if datos["num_variables"] <= MAX_VARIABLES_NUMPY and datos["num_restricciones"] <= MAX_RESTRICCIONES_NUMPY:
+        return "numpy"
+    return "cbc"
@@ -0,0 +1,160 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from models.dispersa import normalizar_coeficientes, tripletas
+
+# Opciones que cambian el resultado de cada tipo de entrada (además del propio modelo);
+# base_inicial cambia las iteraciones y arranque_en_caliente aunque la solución sea la misma
+OPCIONES_CACHE = {
+    "resultado": ("backend", "metodo", "regla_precio", "max_iteraciones", "presolve", "escalado", "base_inicial"),
+    "pasos": ("metodo", "modo_traza", "regla_precio", "max_iteraciones", "escalado", "base_inicial"),
+    "grafico": ("escalado", "modo_grafico"),
+    "imagen": ("escalado", "formato_imagen", "dpi")
+}
+
+def huella_modelo(datos, espacio):
+    """
+    Hash canónico (SHA-256) de un modelo y de las opciones que afectan a la
+    entrada de tipo espacio. Los coeficientes se comparan como float (sin
+    distinguir 0.0 de -0.0), y una matriz dispersa da la misma huella que la
+    densa equivalente.
+
+    Args:
+        datos: Datos del modelo (ver resolver_modelo_lineal)
+        espacio: Tipo de entrada, una de las claves de OPCIONES_CACHE
+    """
+    datos = normalizar_coeficientes(datos)
+    num_rest, num_vars = datos["num_restricciones"], datos["num_variables"]
+    filas, columnas, valores = tripletas(datos["coef_restricciones"], num_rest, num_vars)
+
+    canonico = {
+        "espacio": espacio,
+        "forma": [num_rest, num_vars],
+        "tipo_operacion": datos["tipo_operacion"],
+        "coef_objetivo": [float(c) + 0.0 for c in datos["coef_objetivo"]],
+        "restricciones": [filas.tolist(), columnas.tolist(), [float(v) + 0.0 for v in valores]],
+        "operadores": list(datos["operadores"]),
+        "lados_derechos": [float(b) + 0.0 for b in datos["lados_derechos"]],
+        "opciones": {opcion: datos.get(opcion) for opcion in OPCIONES_CACHE[espacio]}
+    }
+    texto = json.dumps(canonico, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+class CacheResultados:
+    """
+    Caché LRU de resultados direccionada por contenido (ver huella_modelo),
+    con un espacio de claves por tipo de entrada: "resultado" (solver),
+    "pasos" (Simplex paso a paso), "grafico" (método gráfico) e "imagen" (su
+    imagen en un formato y resolución).
+
+    Los valores se guardan serializados con pickle: el límite max_bytes se
+    aplica a su tamaño real y cada lectura devuelve una copia independiente
+    que el llamador puede modificar. Con directorio, las entradas se escriben
+    también en disco (hasta max_bytes_disco) y sobreviven a un reinicio.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, directorio=None, max_bytes_disco=None):
+        self.max_bytes = max_bytes
+        self.directorio = directorio
+        self.max_bytes_disco = max_bytes if max_bytes_disco is None else max_bytes_disco
+        self._entradas = OrderedDict()
+        self._bytes = 0
+        self._contadores = {espacio: {"aciertos": 0, "fallos": 0} for espacio in OPCIONES_CACHE}
+        self._cerrojo = threading.Lock()
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+
+    def obtener(self, espacio, clave):
+        """
+        Devuelve una copia del valor guardado, o None si no está.
+        """
+        with self._cerrojo:
+            contenido = self._entradas.get(clave)
+            if contenido is not None:
+                self._entradas.move_to_end(clave)
+        if contenido is None and self.directorio:
+            contenido = self._leer_disco(clave)
+            if contenido is not None:
+                self._guardar_memoria(clave, contenido)
+
+        with self._cerrojo:
+            self._contadores[espacio]["aciertos" if contenido is not None else "fallos"] += 1
+        return pickle.loads(contenido) if contenido is not None else None
+
+    def guardar(self, espacio, clave, valor):
+        contenido = pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL)
+        self._guardar_memoria(clave, contenido)
+        if self.directorio:
+            self._escribir_disco(clave, contenido)
+
+    def estadisticas(self):
+        with self._cerrojo:
+            return {
+                "entradas": len(self._entradas),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "espacios": {espacio: dict(contadores) for espacio, contadores in self._contadores.items()}
+            }
+
+    def vaciar(self):
+        with self._cerrojo:
+            self._entradas.clear()
+            self._bytes = 0
+
+    def _guardar_memoria(self, clave, contenido):
+        # Un valor mayor que toda la caché no se guarda (vaciaría el resto)
+        if len(contenido) > self.max_bytes:
+            return
+        with self._cerrojo:
+            anterior = self._entradas.pop(clave, None)
+            if anterior is not None:
+                self._bytes -= len(anterior)
+            self._entradas[clave] = contenido
+            self._bytes += len(contenido)
+            while self._bytes > self.max_bytes:
+                _, expulsado = self._entradas.popitem(last=False)
+                self._bytes -= len(expulsado)
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, f"{clave}.pkl")
+
+    def _leer_disco(self, clave):
+        try:
+            with open(self._ruta(clave), "rb") as archivo:
+                contenido = archivo.read()
+            os.utime(self._ruta(clave))  # La fecha de modificación hace de orden LRU en disco
+            return contenido
+        except OSError:
+            return None
+
+    def _escribir_disco(self, clave, contenido):
+        if len(contenido) > self.max_bytes_disco:
+            return
+        # Escritura atómica: otro proceso nunca lee un archivo a medias
+        temporal = f"{self._ruta(clave)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporal, "wb") as archivo:
+            archivo.write(contenido)
+        os.replace(temporal, self._ruta(clave))
+        self._recortar_disco()
+
+    def _recortar_disco(self):
+        archivos = []
+        for nombre in os.listdir(self.directorio):
+            if nombre.endswith(".pkl"):
+                try:
+                    estado = os.stat(os.path.join(self.directorio, nombre))
+                except OSError:
+                    continue
+                archivos.append((estado.st_mtime, estado.st_size, nombre))
+        total = sum(tamano for _, tamano, _ in archivos)
+        for _, tamano, nombre in sorted(archivos):
+            if total <= self.max_bytes_disco:
+                break
+            try:
+                os.remove(os.path.join(self.directorio, nombre))
+            except OSError:
+                pass
+            total -= tamano
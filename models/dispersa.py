@@ -0,0 +1,201 @@
+import numpy as np
+
+class MatrizDispersa:
+    """
+    Matriz de coeficientes en formato CSR (filas comprimidas).
+
+    Solo almacena los elementos distintos de cero, de modo que la memoria crece
+    con el número de no ceros y no con filas × columnas. Indexar una fila
+    (matriz[i]) devuelve la fila densa, lo que permite usarla donde antes se
+    esperaba una lista de listas (plantillas, método gráfico).
+    """
+
+    def __init__(self, indptr, indices, valores, forma):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.valores = np.asarray(valores, dtype=float)
+        self.forma = (int(forma[0]), int(forma[1]))
+        self._csc = None
+        self._filas = None
+
+    @classmethod
+    def desde_coo(cls, filas, columnas, valores, forma):
+        """
+        Construye la matriz a partir de tripletas (fila, columna, valor).
+        Las tripletas repetidas se suman y los ceros se descartan.
+        """
+        filas = np.asarray(filas, dtype=np.int64)
+        columnas = np.asarray(columnas, dtype=np.int64)
+        valores = np.asarray(valores, dtype=float)
+        num_filas, num_cols = forma
+
+        if len(filas) and (filas.min() < 0 or filas.max() >= num_filas or
+                           columnas.min() < 0 or columnas.max() >= num_cols):
+            raise ValueError("Índices de la matriz dispersa fuera de rango")
+
+        # Ordenar por (fila, columna) y sumar duplicados
+        orden = np.lexsort((columnas, filas))
+        filas, columnas, valores = filas[orden], columnas[orden], valores[orden]
+        if len(filas):
+            nuevo = np.ones(len(filas), dtype=bool)
+            nuevo[1:] = (filas[1:] != filas[:-1]) | (columnas[1:] != columnas[:-1])
+            grupos = np.cumsum(nuevo) - 1
+            valores = np.bincount(grupos, weights=valores)
+            filas, columnas = filas[nuevo], columnas[nuevo]
+
+        no_cero = valores != 0
+        filas, columnas, valores = filas[no_cero], columnas[no_cero], valores[no_cero]
+
+        indptr = np.zeros(num_filas + 1, dtype=np.int64)
+        np.cumsum(np.bincount(filas, minlength=num_filas), out=indptr[1:])
+        return cls(indptr, columnas, valores, forma)
+
+    @classmethod
+    def desde_densa(cls, matriz):
+        """
+        Construye la matriz a partir de una lista de listas (o un arreglo 2D).
+        """
+        densa = np.atleast_2d(np.asarray(matriz, dtype=float))
+        filas, columnas = np.nonzero(densa)
+        return cls.desde_coo(filas, columnas, densa[filas, columnas], densa.shape)
+
+    @property
+    def nnz(self):
+        return len(self.valores)
+
+    def __len__(self):
+        return self.forma[0]
+
+    def __getitem__(self, i):
+        fila = np.zeros(self.forma[1])
+        indices, valores = self.fila(i)
+        fila[indices] = valores
+        return fila
+
+    def __iter__(self):
+        for i in range(self.forma[0]):
+            yield self[i]
+
+    def fila(self, i):
+        """
+        Devuelve (indices, valores) de los no ceros de la fila i.
+        """
+        inicio, fin = self.indptr[i], self.indptr[i + 1]
+        return self.indices[inicio:fin], self.valores[inicio:fin]
+
+    def filas_coo(self):
+        """
+        Índice de fila de cada no cero (complemento de self.indices).
+        """
+        if self._filas is None:
+            self._filas = np.repeat(np.arange(self.forma[0]), np.diff(self.indptr))
+        return self._filas
+
+    def a_coo(self):
+        return self.filas_coo().copy(), self.indices.copy(), self.valores.copy()
+
+    def a_densa(self):
+        densa = np.zeros(self.forma)
+        densa[self.filas_coo(), self.indices] = self.valores
+        return densa
+
+    def _columnas_comprimidas(self):
+        # Versión CSC (columnas comprimidas) construida bajo demanda para extraer columnas
+        if self._csc is None:
+            filas = self.filas_coo()
+            orden = np.argsort(self.indices, kind="stable")
+            colptr = np.zeros(self.forma[1] + 1, dtype=np.int64)
+            np.cumsum(np.bincount(self.indices, minlength=self.forma[1]), out=colptr[1:])
+            self._csc = (colptr, filas[orden], self.valores[orden])
+        return self._csc
+
+    def columna(self, j):
+        """
+        Devuelve la columna j como vector denso.
+        """
+        colptr, filas, valores = self._columnas_comprimidas()
+        col = np.zeros(self.forma[0])
+        col[filas[colptr[j]:colptr[j + 1]]] = valores[colptr[j]:colptr[j + 1]]
+        return col
+
+    def producto(self, x):
+        """
+        Calcula A·x.
+        """
+        x = np.asarray(x, dtype=float)
+        return np.bincount(self.filas_coo(), weights=self.valores * x[self.indices], minlength=self.forma[0])
+
+    def producto_transpuesto(self, y):
+        """
+        Calcula Aᵀ·y.
+        """
+        y = np.asarray(y, dtype=float)
+        return np.bincount(self.indices, weights=self.valores * y[self.filas_coo()], minlength=self.forma[1])
+
+    def escalar_filas(self, factores):
+        """
+        Devuelve una nueva matriz con cada fila i multiplicada por factores[i].
+        """
+        factores = np.asarray(factores, dtype=float)
+        return MatrizDispersa(self.indptr.copy(), self.indices.copy(),
+                              self.valores * factores[self.filas_coo()], self.forma)
+
+def es_dispersa(coef):
+    return isinstance(coef, (MatrizDispersa, dict))
+
+def matriz_desde_datos(coef, num_filas, num_cols):
+    """
+    Convierte coef_restricciones a MatrizDispersa. Acepta:
+        - una MatrizDispersa
+        - un diccionario COO: {"filas": [...], "columnas": [...], "valores": [...]}
+        - un diccionario CSR: {"indptr": [...], "indices": [...], "valores": [...]}
+        - una lista de listas densa
+    """
+    if isinstance(coef, MatrizDispersa):
+        return coef
+    if isinstance(coef, dict):
+        if "indptr" in coef:
+            # Se pasa por COO para ordenar columnas, sumar duplicados y validar índices
+            indptr = np.asarray(coef["indptr"], dtype=np.int64)
+            if len(indptr) != num_filas + 1:
+                raise ValueError("indptr debe tener num_restricciones + 1 elementos")
+            filas = np.repeat(np.arange(num_filas), np.diff(indptr))
+            return MatrizDispersa.desde_coo(filas, coef["indices"], coef["valores"], (num_filas, num_cols))
+        return MatrizDispersa.desde_coo(coef["filas"], coef["columnas"], coef["valores"], (num_filas, num_cols))
+    if num_filas == 0:
+        return MatrizDispersa.desde_coo([], [], [], (0, num_cols))
+    return MatrizDispersa.desde_densa(coef)
+
+def normalizar_coeficientes(datos):
+    """
+    Si coef_restricciones llega en formato disperso (diccionario COO/CSR) lo
+    convierte a MatrizDispersa; las listas de listas densas se dejan tal cual.
+    """
+    if isinstance(datos["coef_restricciones"], dict):
+        datos = dict(datos)
+        datos["coef_restricciones"] = matriz_desde_datos(
+            datos["coef_restricciones"], datos["num_restricciones"], datos["num_variables"])
+    return datos
+
+def coeficientes_fila(coef, i):
+    """
+    Devuelve (indices, valores) de los coeficientes no nulos de la fila i,
+    tanto para matrices dispersas como para listas de listas.
+    """
+    if isinstance(coef, MatrizDispersa):
+        return coef.fila(i)
+    fila = coef[i]
+    indices = [j for j, v in enumerate(fila) if v != 0]
+    return indices, [fila[j] for j in indices]
+
+def tripletas(coef, num_filas, num_cols):
+    """
+    Devuelve (filas, columnas, valores) de los no ceros como arreglos NumPy.
+    """
+    if isinstance(coef, MatrizDispersa):
+        return coef.a_coo()
+    if num_filas == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+    densa = np.asarray(coef, dtype=float).reshape(num_filas, num_cols)
+    filas, columnas = np.nonzero(densa)
+    return filas, columnas, densa[filas, columnas]
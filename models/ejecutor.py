@@ -0,0 +1,88 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from models.registro import configurar_registro, ejecutar_con_id, id_peticion_actual
+
+class PoolSaturado(Exception):
+    """
+    Todos los procesos están ocupados y la cola de espera está llena.
+    """
+
+    def __init__(self, mensaje, reintentar_en=1):
+        super().__init__(mensaje)
+        self.reintentar_en = reintentar_en
+
+class EjecutorResoluciones:
+    """
+    Ejecuta resoluciones y renderizados (tareas de CPU) en un pool acotado de
+    procesos, para que los hilos que atienden peticiones no queden bloqueados.
+
+    Admite como máximo tamano tareas en ejecución más max_cola esperando; con
+    todas las plazas ocupadas, ejecutar() lanza PoolSaturado en lugar de
+    encolar sin límite. Con tamano 0 las tareas se ejecutan en el propio hilo.
+    Las tareas marcadas como directas (modelos pequeños, que tardan menos que
+    el envío a otro proceso) se ejecutan siempre en el hilo y sin ocupar plaza,
+    de modo que su latencia no depende de la carga del pool.
+    """
+
+    def __init__(self, tamano=None, max_cola=None):
+        self.tamano = (os.cpu_count() or 1) if tamano is None else int(tamano)
+        self.max_cola = 2 * max(self.tamano, 1) if max_cola is None else int(max_cola)
+        if self.tamano < 0 or self.max_cola < 0:
+            raise ValueError("El tamaño del pool y la cola no pueden ser negativos")
+
+        self._plazas = threading.BoundedSemaphore(max(self.tamano, 1) + self.max_cola)
+        self._pool = None
+        self._cerrojo = threading.Lock()
+
+    def ejecutar(self, funcion, *args, directo=False, esperar=False):
+        """
+        Ejecuta funcion(*args) en el pool y devuelve su resultado (las
+        excepciones de la tarea se propagan).
+
+        Args:
+            directo: Si es True, se ejecuta en el hilo actual sin pasar por el pool
+            esperar: Si es True, espera a que quede una plaza libre en lugar de
+                lanzar PoolSaturado (trabajos en segundo plano)
+
+        Raises:
+            PoolSaturado: Si no queda ninguna plaza libre
+        """
+        if directo:
+            return funcion(*args)
+        if not self._plazas.acquire(blocking=esperar):
+            raise PoolSaturado("Servidor ocupado: demasiadas resoluciones en curso, inténtelo de nuevo en unos segundos")
+        try:
+            if self.tamano == 0:
+                return funcion(*args)
+            pool = self._obtener_pool()
+            try:
+                # El id de la petición acompaña a la tarea para los mensajes de registro del proceso
+                return pool.submit(ejecutar_con_id, id_peticion_actual(), funcion, *args).result()
+            except BrokenProcessPool:
+                # Un proceso murió (memoria, señal...): se descarta el pool y se crea otro en la próxima tarea
+                with self._cerrojo:
+                    if self._pool is pool:
+                        self._pool = None
+                raise
+        finally:
+            self._plazas.release()
+
+    def cerrar(self):
+        with self._cerrojo:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+    def _obtener_pool(self):
+        # Se crea en la primera tarea (y no al importar) para no heredar el pool en un fork del servidor
+        with self._cerrojo:
+            if self._pool is None:
+                # "spawn": los procesos no heredan hilos ni cerrojos del servidor (ni la
+                # configuración del registro, que cada uno toma de PL_LOG_NIVEL)
+                self._pool = ProcessPoolExecutor(max_workers=self.tamano,
+                                                 mp_context=multiprocessing.get_context("spawn"),
+                                                 initializer=configurar_registro)
+            return self._pool
@@ -0,0 +1,117 @@
+import numpy as np
+from models.dispersa import MatrizDispersa, tripletas
+
+# Pasadas de media geométrica (filas y luego columnas) antes del equilibrado final
+PASADAS_GEOMETRICAS = 4
+
+# Un modelo está bien escalado si sus coeficientes no nulos están en
+# [1/RANGO_ESCALADO, RANGO_ESCALADO] y el mayor no supera al menor en más de ese factor
+RANGO_ESCALADO = 1e4
+
+# Valores de la opción escalado: True escala siempre, False nunca y "auto" solo si hace falta
+MODOS_ESCALADO = (True, False, "auto")
+
+def factores_escalado(filas, columnas, valores, forma):
+    """
+    Factores de escalado de filas (r) y columnas (s) para que R·A·S tenga sus
+    coeficientes cerca de 1: varias pasadas de media geométrica (cada fila y
+    columna se divide por sqrt(mínimo·máximo) de sus valores absolutos) y un
+    equilibrado final (el máximo de cada fila y luego de cada columna pasa a 1).
+    Los factores se redondean a potencias de 2, que no añaden error de redondeo.
+
+    Args:
+        filas, columnas, valores: No ceros de la matriz (ver tripletas)
+        forma: (número de filas, número de columnas)
+
+    Returns:
+        Tupla (r, s) de arreglos NumPy; las filas y columnas vacías tienen factor 1
+    """
+    num_filas, num_cols = forma
+    filas, columnas = np.asarray(filas, dtype=np.int64), np.asarray(columnas, dtype=np.int64)
+    valores = np.asarray(valores, dtype=float)
+    no_nulos = valores != 0
+    filas, columnas = filas[no_nulos], columnas[no_nulos]
+    # Se trabaja con logaritmos en base 2: escalar es sumar
+    logaritmos = np.log2(np.abs(valores[no_nulos]))
+    log_r, log_s = np.zeros(num_filas), np.zeros(num_cols)
+    if len(logaritmos) == 0:
+        return np.ones(num_filas), np.ones(num_cols)
+
+    def extremos(indices, escalados, tamano):
+        maximo = np.full(tamano, -np.inf)
+        minimo = np.full(tamano, np.inf)
+        np.maximum.at(maximo, indices, escalados)
+        np.minimum.at(minimo, indices, escalados)
+        vacias = np.isinf(maximo)
+        maximo[vacias] = minimo[vacias] = 0.0
+        return minimo, maximo
+
+    for _ in range(PASADAS_GEOMETRICAS):
+        minimo, maximo = extremos(filas, logaritmos + log_r[filas] + log_s[columnas], num_filas)
+        log_r -= (minimo + maximo) / 2
+        minimo, maximo = extremos(columnas, logaritmos + log_r[filas] + log_s[columnas], num_cols)
+        log_s -= (minimo + maximo) / 2
+
+    _, maximo = extremos(filas, logaritmos + log_r[filas] + log_s[columnas], num_filas)
+    log_r -= maximo
+    _, maximo = extremos(columnas, logaritmos + log_r[filas] + log_s[columnas], num_cols)
+    log_s -= maximo
+    return np.exp2(np.round(log_r)), np.exp2(np.round(log_s))
+
+def necesita_escalado(valores):
+    """
+    Si los coeficientes no nulos valores se salen del rango de un modelo bien escalado.
+    """
+    absolutos = np.abs(np.asarray(valores, dtype=float))
+    absolutos = absolutos[absolutos > 0]
+    if len(absolutos) == 0:
+        return False
+    menor, mayor = absolutos.min(), absolutos.max()
+    return menor < 1 / RANGO_ESCALADO or mayor > RANGO_ESCALADO or mayor / menor > RANGO_ESCALADO
+
+def escalar_modelo(datos):
+    """
+    Escala las restricciones y el objetivo del modelo según la opción escalado:
+    A' = R·A·S, b' = R·b y c' = S·c, con x = S·x' y el mismo valor objetivo.
+
+    Args:
+        datos: Datos del modelo, con los coeficientes normalizados; escalado
+            (opcional) es "auto" (por defecto), True o False
+
+    Returns:
+        Tupla (datos_escalados, factores). Si no se escala, datos_escalados es el
+        propio datos y factores None; si no, factores es {"filas": r, "columnas": s}
+
+    Raises:
+        ValueError: Si la opción escalado no es válida
+    """
+    modo = datos.get("escalado", "auto")
+    if modo not in MODOS_ESCALADO:
+        raise ValueError(f"Opción de escalado desconocida: {modo}")
+    num_vars, num_rest = datos["num_variables"], datos["num_restricciones"]
+    filas, columnas, valores = tripletas(datos["coef_restricciones"], num_rest, num_vars)
+    if modo is False or (modo == "auto" and not necesita_escalado(valores)):
+        return datos, None
+
+    r, s = factores_escalado(filas, columnas, valores, (num_rest, num_vars))
+    if (r == 1).all() and (s == 1).all():
+        return datos, None
+    escalados = dict(datos,
+                     coef_objetivo=(np.asarray(datos["coef_objetivo"], dtype=float) * s).tolist(),
+                     coef_restricciones=MatrizDispersa.desde_coo(
+                         filas, columnas, valores * r[filas] * s[columnas], (num_rest, num_vars)),
+                     lados_derechos=(np.asarray(datos["lados_derechos"], dtype=float) * r).tolist())
+    return escalados, {"filas": r, "columnas": s}
+
+def desescalar_resultado(resultado, factores):
+    """
+    Devuelve los valores de las variables de un resultado_final del modelo
+    escalado a las unidades originales (x = S·x'). El valor objetivo y la base
+    no cambian.
+    """
+    if resultado.get("variables") is not None:
+        s = factores["columnas"]
+        resultado["variables"] = [{"nombre": var["nombre"], "valor": float(var["valor"]) * s[j]}
+                                  for j, var in enumerate(resultado["variables"])]
+    resultado["escalado"] = {"filas": factores["filas"].tolist(), "columnas": factores["columnas"].tolist()}
+    return resultado
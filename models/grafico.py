@@ -1,45 +1,287 @@
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')  # Para usar matplotlib sin interfaz gráfica
 import io
 import base64
-from itertools import combinations
+import threading
+import logging
+# API orientada a objetos: sin el estado global de pyplot, que no es seguro entre hilos
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.patches import Polygon
+from models.dispersa import normalizar_coeficientes
+from models.escalado import escalar_modelo
 
-def calcular_interseccion(a1, b1, c1, a2, b2, c2):
+registro = logging.getLogger(__name__)
+
+# Tolerancia relativa para decidir si un punto cumple una restricción
+TOLERANCIA = 1e-9
+
+# Tamaño y resolución de la imagen del método gráfico
+TAMANO_FIGURA = (10, 8)
+DPI_FIGURA = 100
+
+# Formatos de generar_imagen_grafico (con su tipo MIME) y resoluciones admitidas
+FORMATOS_IMAGEN = {"png": "image/png", "svg": "image/svg+xml", "webp": "image/webp"}
+DPI_MINIMO = 50
+DPI_MAXIMO = 300
+
+# Modos del método gráfico: "imagen" devuelve el PNG dibujado en el servidor y
+# "cliente" solo la geometría, para que la dibuje el navegador
+MODOS_GRAFICO = ("imagen", "cliente")
+
+# Plantilla de figura de cada hilo: se limpia y se reutiliza en cada gráfico
+_plantillas = threading.local()
+
+def figura_del_hilo():
+    """
+    Devuelve (figura, ejes) de la plantilla del hilo actual, con los ejes
+    limpios. Cada hilo dibuja en su propia Figure con lienzo Agg, así que varias
+    peticiones pueden generar gráficos a la vez sin interferir
+    """
+    if getattr(_plantillas, "figura", None) is None:
+        figura = Figure(figsize=TAMANO_FIGURA, dpi=DPI_FIGURA)
+        FigureCanvasAgg(figura)
+        _plantillas.figura, _plantillas.ejes = figura, figura.add_subplot()
+        _plantillas.margenes = dict(vars(figura.subplotpars))
+    else:
+        # tight_layout parte de los márgenes actuales: se vuelve a los iniciales para
+        # que la imagen no dependa del gráfico anterior
+        _plantillas.ejes.clear()
+        _plantillas.figura.subplots_adjust(**_plantillas.margenes)
+    return _plantillas.figura, _plantillas.ejes
+
+def semiplanos(restricciones):
+    """
+    Convierte las restricciones (a, b, c, operador) en semiplanos a*x + b*y <= c
+    (las de igualdad dan dos). Retorna (normales k×2, lados derechos k)
+    """
+    normales, lados = [], []
+    for a, b, c, op in restricciones:
+        if op in ("<=", "="):
+            normales.append((a, b))
+            lados.append(c)
+        if op in (">=", "="):
+            normales.append((-a, -b))
+            lados.append(-c)
+    return np.array(normales, dtype=float).reshape(-1, 2), np.array(lados, dtype=float)
+
+def calcular_intersecciones(normales1, lados1, normales2, lados2):
+    """
+    Calcula los puntos de intersección de cada par de rectas:
+    normales1[i]·p = lados1[i]
+    normales2[i]·p = lados2[i]
+    
+    Retorna un arreglo k×2, con NaN en los pares (prácticamente) paralelos
+    """
+    det = normales1[:, 0] * normales2[:, 1] - normales2[:, 0] * normales1[:, 1]
+    # Con <=, una normal nula (0x + 0y) también cuenta como paralela
+    paralelas = np.abs(det) <= 1e-10 * np.linalg.norm(normales1, axis=1) * np.linalg.norm(normales2, axis=1)
+    det = np.where(paralelas, 1.0, det)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x = (lados1 * normales2[:, 1] - lados2 * normales1[:, 1]) / det
+        y = (normales1[:, 0] * lados2 - normales2[:, 0] * lados1) / det
+    puntos = np.column_stack([x, y])
+    puntos[paralelas] = np.nan
+    return puntos
+
+def interseccion_semiplanos(normales, lados):
+    """
+    Polígono convexo {p : normales·p <= lados}: se recorta un cuadrado que
+    contiene todos los vértices con cada semiplano (Sutherland-Hodgman). El
+    polígono se guarda como lista cíclica de rectas (el vértice i es la
+    intersección de las rectas i e i+1), y cada vértice nuevo se calcula con
+    sus dos rectas, sin acumular errores de recorte.
+    
+    Retorna (vertices, reales): los vértices en sentido antihorario sin repetir y,
+    para cada uno, si lo definen dos restricciones (y no el cuadrado auxiliar).
+    Si la región no es factible, ambos están vacíos
     """
-    Calcula el punto de intersección entre dos líneas:
-    a1*x + b1*y = c1
-    a2*x + b2*y = c2
+    vacio = (np.zeros((0, 2)), np.zeros(0, dtype=bool))
+    # Los semiplanos 0x + 0y <= c no tienen recta: se cumplen siempre (c >= 0) o nunca
+    nulos = (normales == 0).all(axis=1)
+    if (lados[nulos] < -TOLERANCIA).any():
+        return vacio
+    normales, lados = normales[~nulos], lados[~nulos]
+    
+    k = len(lados)
+    # Todos los vértices posibles (intersecciones de pares de rectas) caben en el cuadrado
+    i, j = np.triu_indices(k, 1)
+    puntos = calcular_intersecciones(normales[i], lados[i], normales[j], lados[j])
+    limite = 2 * max(1.0, np.abs(puntos[np.isfinite(puntos).all(axis=1)]).max(initial=0))
+    # Rectas del cuadrado: x <= L, y <= L, -x <= L, -y <= L
+    normales = np.vstack([normales, [[1, 0], [0, 1], [-1, 0], [0, -1]]])
+    lados = np.concatenate([lados, [limite] * 4])
     
-    Retorna (x, y) o None si son paralelas
+    aristas = np.array([k + 3, k, k + 1, k + 2])
+    vertices = np.array([[limite, -limite], [limite, limite], [-limite, limite], [-limite, -limite]])
+    
+    for h in range(k):
+        holgura = vertices @ normales[h] - lados[h]
+        dentro = holgura <= TOLERANCIA * (1 + abs(lados[h]) + np.abs(vertices) @ np.abs(normales[h]))
+        if dentro.all():
+            continue
+        if not dentro.any():
+            return vacio
+        # Los vértices que cumplen el semiplano son consecutivos (el polígono es convexo)
+        n = len(aristas)
+        inicio = np.nonzero(dentro & ~np.roll(dentro, 1))[0][0]
+        finales = np.nonzero(dentro & ~np.roll(dentro, -1))[0]
+        fin = finales[np.argmin((finales - inicio) % n)]
+        racha = (inicio + np.arange((fin - inicio) % n + 1)) % n
+        # Rectas inicio..fin+1 y la nueva: vértices de la racha y los cortes de la nueva recta
+        salida, entrada = aristas[(fin + 1) % n], aristas[inicio]
+        cortes = calcular_intersecciones(normales[[salida, h]], lados[[salida, h]],
+                                         normales[[h, entrada]], lados[[h, entrada]])
+        # (si el corte es con una recta paralela, el vértice de la racha ya está sobre la nueva)
+        cortes = np.where(np.isnan(cortes), vertices[[fin, inicio]], cortes)
+        aristas = np.concatenate([aristas[racha], [salida, h]])
+        vertices = np.vstack([vertices[racha], cortes])
+    
+    # Vértices repetidos (rectas concurrentes, igualdades): son consecutivos en el polígono.
+    # Queda uno por grupo, real si lo es alguna de sus copias
+    reales = (aristas < k) & (np.roll(aristas, -1) < k)
+    escala = TOLERANCIA * (1 + np.abs(vertices).max(axis=1))
+    nuevo = np.linalg.norm(vertices - np.roll(vertices, 1, axis=0), axis=1) >= escala
+    if not nuevo.any():
+        return vertices[:1], reales.any(keepdims=True)
+    primero = np.argmax(nuevo)
+    vertices, reales, nuevo = (np.roll(v, -primero, axis=0) for v in (vertices, reales, nuevo))
+    grupo = np.cumsum(nuevo) - 1
+    reales_grupo = np.zeros(grupo[-1] + 1, dtype=bool)
+    np.logical_or.at(reales_grupo, grupo, reales)
+    return vertices[nuevo], reales_grupo
+
+def escalar_restricciones(restricciones, modo="auto"):
+    """
+    Escala las restricciones (a, b, c, operador) para buscar los vértices (ver
+    models/escalado.py). Retorna (restricciones escaladas, (s1, s2)): el punto
+    (x, y) del modelo escalado es (s1*x, s2*y) en el original
     """
-    # Verificar si son paralelas
-    det = a1*b2 - a2*b1
-    if abs(det) < 1e-10:  # Prácticamente paralelas
+    escalados, factores = escalar_modelo({
+        "num_variables": 2,
+        "num_restricciones": len(restricciones),
+        "coef_objetivo": [0.0, 0.0],
+        "coef_restricciones": [[a, b] for a, b, _, _ in restricciones],
+        "operadores": [op for _, _, _, op in restricciones],
+        "lados_derechos": [c for _, _, c, _ in restricciones],
+        "escalado": modo
+    })
+    if factores is None:
+        return restricciones, (1.0, 1.0)
+    coef = escalados["coef_restricciones"].a_densa()
+    escaladas = [(coef[i, 0], coef[i, 1], escalados["lados_derechos"][i], op)
+                 for i, (_, _, _, op) in enumerate(restricciones)]
+    return escaladas, tuple(factores["columnas"])
+
+def segmento_en_ejes(a, b, c, minimo, maximo):
+    """
+    Tramo de la recta a*x + b*y = c dentro del cuadrado [minimo, maximo]².
+    Retorna [[x0, y0], [x1, y1]], o None si la recta no cruza el cuadrado
+    """
+    puntos = []
+    if abs(b) > 1e-10:
+        puntos += [(x, (c - a*x) / b) for x in (minimo, maximo)]
+    if abs(a) > 1e-10:
+        puntos += [((c - b*y) / a, y) for y in (minimo, maximo)]
+    holgura = 1e-9 * (maximo - minimo)
+    puntos = sorted((float(x), float(y)) for x, y in puntos
+                    if minimo - holgura <= x <= maximo + holgura and minimo - holgura <= y <= maximo + holgura)
+    if len(puntos) < 2:
         return None
+    return [list(puntos[0]), list(puntos[-1])]
+
+def dibujar_grafico(geometria, puntos_esquina, punto_optimo, formato="png", dpi=DPI_FIGURA):
+    """
+    Dibuja en el servidor la geometría de generar_metodo_grafico (el equivalente
+    de static/js/plotter.js) y retorna el contenido de la imagen en el formato
+    (uno de FORMATOS_IMAGEN) y la resolución indicados
+    """
+    figura, ejes = figura_del_hilo()
+    min_limit, max_limit = geometria["limites"]
+    ejes.set_xlim(min_limit, max_limit)
+    ejes.set_ylim(min_limit, max_limit)
+    
+    # Graficar cada restricción
+    for restriccion in geometria["restricciones"]:
+        if restriccion["segmento"] is not None:
+            (x0, y0), (x1, y1) = restriccion["segmento"]
+            ejes.plot([x0, x1], [y0, y1], label=restriccion["etiqueta"], linestyle='--')
     
-    # Calcular el punto de intersección
-    x = (c1*b2 - c2*b1) / det
-    y = (a1*c2 - a2*c1) / det
+    # Sombrear la región factible
+    if geometria["region"]:
+        ejes.add_patch(Polygon(geometria["region"], alpha=0.2, color='green', label='Región Factible'))
     
-    return (x, y)
+    # Graficar los puntos esquina
+    for i, punto in enumerate(puntos_esquina):
+        x, y = punto["x"], punto["y"]
+        ejes.plot(x, y, 'o', color='blue')
+        ejes.annotate(f'P{i+1}({x:.2f}, {y:.2f})', (x, y), 
+                     textcoords="offset points", xytext=(0,10), ha='center')
+    
+    # Destacar el punto óptimo
+    if punto_optimo:
+        x_opt, y_opt = punto_optimo["x"], punto_optimo["y"]
+        ejes.plot(x_opt, y_opt, 'o', color='red', markersize=10)
+        ejes.annotate(f'Óptimo ({x_opt:.2f}, {y_opt:.2f})', 
+                     (x_opt, y_opt), 
+                     textcoords="offset points", 
+                     xytext=(0,15), 
+                     ha='center',
+                     bbox=dict(boxstyle="round,pad=0.3", fc="yellow", alpha=0.3))
+    
+    # Líneas de nivel de la función objetivo (la óptima destacada)
+    for linea in geometria["lineas_nivel"]:
+        if linea["segmento"] is None:
+            continue
+        (x0, y0), (x1, y1) = linea["segmento"]
+        if linea["optima"]:
+            ejes.plot([x0, x1], [y0, y1], 'g-', alpha=0.7, linewidth=2, label=f'F.O. = {linea["valor"]:.2f}')
+        else:
+            ejes.plot([x0, x1], [y0, y1], 'g-', alpha=0.3, linewidth=1)
+    
+    # Configurar etiquetas y leyenda
+    ejes.set_xlabel('x₁')
+    ejes.set_ylabel('x₂')
+    ejes.grid(True)
+    ejes.set_title(geometria["titulo"])
+    ejes.legend(loc='upper right', bbox_to_anchor=(1.1, 1.1))
+    figura.tight_layout()
+    # tight_layout deja un motor de maquetación con el que savefig dibujaría dos veces
+    figura.set_layout_engine(None)
+    
+    buf = io.BytesIO()
+    figura.savefig(buf, format=formato, dpi=dpi)
+    return buf.getvalue()
 
-def evaluar_restriccion(punto, a, b, c, operador):
+def generar_imagen_grafico(datos):
     """
-    Evalúa si un punto (x, y) satisface una restricción a*x + b*y operador c
-    Retorna True si satisface, False en caso contrario
+    Genera solo la imagen del método gráfico, para servirla aparte de la página.
+    
+    Args:
+        datos: Datos del problema (ver generar_metodo_grafico), con:
+            - formato_imagen (opcional): Una de las claves de FORMATOS_IMAGEN ("png" por defecto)
+            - dpi (opcional): Resolución, entre DPI_MINIMO y DPI_MAXIMO (DPI_FIGURA por defecto)
+    
+    Returns:
+        Un diccionario con contenido (los bytes de la imagen), tipo (su tipo MIME)
+        y error, o solo error si no se puede generar
     """
-    x, y = punto
-    valor = a*x + b*y
+    formato = datos.get("formato_imagen", "png")
+    dpi = datos.get("dpi", DPI_FIGURA)
+    if formato not in FORMATOS_IMAGEN:
+        return {"error": f"Formato de imagen desconocido: {formato}"}
+    if not DPI_MINIMO <= dpi <= DPI_MAXIMO:
+        return {"error": f"La resolución debe estar entre {DPI_MINIMO} y {DPI_MAXIMO} dpi"}
     
-    if operador == "<=":
-        return valor <= c + 1e-10  # Pequeña tolerancia numérica
-    elif operador == ">=":
-        return valor >= c - 1e-10  # Pequeña tolerancia numérica
-    else:  # operador == "="
-        return abs(valor - c) < 1e-10
+    grafico = generar_metodo_grafico(dict(datos, modo_grafico="cliente"))
+    if grafico.get("error"):
+        return grafico
+    try:
+        contenido = dibujar_grafico(grafico["geometria"], grafico["puntos_esquina"], grafico["punto_optimo"],
+                                    formato, dpi)
+    except Exception as e:
+        registro.warning("Error al dibujar el método gráfico: %s", e, exc_info=True)
+        return {"error": f"Error al dibujar el método gráfico: {str(e)}"}
+    return {"contenido": contenido, "tipo": FORMATOS_IMAGEN[formato], "error": None}
 
 def generar_metodo_grafico(datos):
     """
@@ -52,34 +294,36 @@ def generar_metodo_grafico(datos):
             - coef_restricciones: Lista de listas con los coeficientes de las restricciones [[a1, b1], [a2, b2], ...]
             - operadores: Lista de operadores ("<=", ">=", "=")
             - lados_derechos: Lista de valores del lado derecho [c1, c2, ...]
+            - modo_grafico (opcional): "imagen" (por defecto) o "cliente"
     
     Returns:
         Un diccionario con:
-            - imagen_base64: La imagen en formato base64
+            - imagen_base64: La imagen en formato base64 (None en modo cliente)
+            - geometria: Solo en modo cliente, lo necesario para dibujar el gráfico:
+              limites, titulo, restricciones (etiqueta y segmento visible), region
+              (vértices del polígono visible en orden) y lineas_nivel (valor,
+              segmento y si es la óptima)
             - puntos_esquina: Lista de puntos en las esquinas de la región factible
             - punto_optimo: El punto óptimo (x*, y*)
             - valor_optimo: El valor óptimo de la función objetivo
             - error: Mensaje de error (si ocurre)
     """
     try:
-        # Información de diagnóstico
-        print("Datos recibidos en generar_metodo_grafico:")
-        print(f"Coeficientes objetivo: {datos['coef_objetivo']}")
-        print(f"Tipo operación: {datos['tipo_operacion']}")
+        datos = normalizar_coeficientes(datos)
+        
+        modo = datos.get("modo_grafico", "imagen")
+        if modo not in MODOS_GRAFICO:
+            return {"error": f"Modo de gráfico desconocido: {modo}"}
         
         if len(datos['coef_objetivo']) != 2:
             return {"error": "El método gráfico solo funciona para problemas con 2 variables"}
         
-        # Configurar la figura
-        plt.figure(figsize=(10, 8))
-        
         # Definir límites iniciales para los ejes
         max_limit = 10
         min_limit = -1
         
         # Extraer coeficientes
         c1, c2 = datos['coef_objetivo']
-        print(f"c1: {c1}, c2: {c2}")
         restricciones = []
         
         for i in range(datos['num_restricciones']):
@@ -95,92 +339,42 @@ def generar_metodo_grafico(datos):
         if all(r[0] != 0 or r[1] != 1 or r[3] != ">=" for r in restricciones):
             restricciones.append((0, 1, 0, ">="))  # y >= 0
         
-        # Buscar todos los puntos de intersección
-        puntos_interseccion = []
-        
-        # Agregar el origen si es factible
-        origen = (0, 0)
-        if all(evaluar_restriccion(origen, *rest) for rest in restricciones):
-            puntos_interseccion.append(origen)
-            print("El origen (0,0) es factible")
-        else:
-            print("El origen (0,0) NO es factible")
-        
-        # Intersecciones en los ejes
-        for a, b, c, op in restricciones:
-            if abs(a) > 1e-10:  # Si a != 0
-                punto_x = (c/a, 0)
-                if all(evaluar_restriccion(punto_x, *rest) for rest in restricciones):
-                    puntos_interseccion.append(punto_x)
-            
-            if abs(b) > 1e-10:  # Si b != 0
-                punto_y = (0, c/b)
-                if all(evaluar_restriccion(punto_y, *rest) for rest in restricciones):
-                    puntos_interseccion.append(punto_y)
-        
-        # Intersecciones entre restricciones
-        for (a1, b1, c1, op1), (a2, b2, c2, op2) in combinations(restricciones, 2):
-            punto = calcular_interseccion(a1, b1, c1, a2, b2, c2)
-            if punto and all(evaluar_restriccion(punto, *rest) for rest in restricciones):
-                puntos_interseccion.append(punto)
+        # Los vértices se buscan en el modelo escalado y se devuelven a las unidades originales
+        busqueda, (s1, s2) = escalar_restricciones(restricciones, datos.get("escalado", "auto"))
         
-        # Eliminar duplicados y puntos muy cercanos
-        puntos_esquina = []
-        for punto in puntos_interseccion:
-            if not any(np.linalg.norm(np.array(punto) - np.array(p)) < 1e-8 for p in puntos_esquina):
-                # Verificar que el punto sea no negativo
-                x, y = punto
-                if x >= 0 and y >= 0:
-                    puntos_esquina.append(punto)
+        # Región factible como intersección de semiplanos: los puntos de esquina son
+        # sus vértices (salvo los del cuadrado auxiliar, si no está acotada)
+        poligono, reales = interseccion_semiplanos(*semiplanos(busqueda))
+        poligono = poligono * [s1, s2] + 0.0
+        # Se recorren empezando por el de menor x (y menor y)
+        if reales.any():
+            candidatos = np.nonzero(reales)[0]
+            inicio = candidatos[np.lexsort((poligono[candidatos, 1], poligono[candidatos, 0]))[0]]
+            poligono, reales = np.roll(poligono, -inicio, axis=0), np.roll(reales, -inicio)
+        puntos_esquina = [(x, y) for x, y in poligono[reales].tolist()]
         
-        print(f"Puntos de esquina encontrados: {puntos_esquina}")
+        registro.debug("metodo_grafico %s objetivo=%s restricciones=%d puntos_esquina=%s origen_factible=%s",
+                       datos['tipo_operacion'], [c1, c2], len(restricciones), puntos_esquina,
+                       (0, 0) in puntos_esquina)
         
         # Actualizar límites para los ejes
         if puntos_esquina:
             for x, y in puntos_esquina:
                 max_limit = max(max_limit, x*1.2, y*1.2)
         
-        # Configurar límites de los ejes
-        plt.xlim(min_limit, max_limit)
-        plt.ylim(min_limit, max_limit)
-        
-        # Graficar cada restricción
-        x = np.linspace(min_limit, max_limit, 1000)
-        
-        for i, (a, b, c, op) in enumerate(restricciones):
-            label = f"{a}x + {b}y {op} {c}"
-            
-            if abs(b) < 1e-10:  # Línea vertical b=0
-                if a != 0:
-                    plt.axvline(x=c/a, label=label, linestyle='--')
-            else:
-                y = (c - a*x) / b
-                plt.plot(x, y, label=label, linestyle='--')
-        
-        # Sombrear la región factible si hay puntos factibles
-        if len(puntos_esquina) >= 3:
-            # Ordenar los puntos para formar un polígono convexo
-            def ordenar_puntos_convexos(puntos):
-                # Calcular el centroide
-                centro = np.mean(puntos, axis=0)
-                # Ordenar según el ángulo
-                return sorted(puntos, key=lambda p: np.arctan2(p[1]-centro[1], p[0]-centro[0]))
-            
-            puntos_ordenados = ordenar_puntos_convexos(puntos_esquina)
-            poligono = Polygon(puntos_ordenados, alpha=0.2, color='green', label='Región Factible')
-            plt.gca().add_patch(poligono)
+        # Región factible dentro de los ejes (aunque no esté acotada)
+        marco = [(s1, 0, max_limit, "<="), (0, s2, max_limit, "<="), (s1, 0, min_limit, ">="), (0, s2, min_limit, ">=")]
+        visible, _ = interseccion_semiplanos(*semiplanos(busqueda + marco))
         
         # Encontrar el punto óptimo
         punto_optimo = None
         valor_optimo = float('-inf') if datos['tipo_operacion'] == 'maximizar' else float('inf')
         
-        print("Evaluando puntos de esquina:")
         if puntos_esquina:
             for punto in puntos_esquina:
                 x, y = punto
                 # Asegurarse de usar correctamente los coeficientes de la función objetivo
                 z = float(c1*x + c2*y)
-                print(f"Punto ({x}, {y}): Valor F.O. = {z}")
                 
                 if datos['tipo_operacion'] == 'maximizar':
                     if z > valor_optimo or (abs(z - valor_optimo) < 1e-10 and np.linalg.norm(punto) < np.linalg.norm(punto_optimo or [float('inf'), float('inf')])):
@@ -191,59 +385,35 @@ def generar_metodo_grafico(datos):
                         valor_optimo = z
                         punto_optimo = punto
         
-        if punto_optimo:
-            print(f"Punto óptimo seleccionado: {punto_optimo} con valor {valor_optimo}")
-        
-        # Graficar los puntos esquina
-        for i, (x, y) in enumerate(puntos_esquina):
-            plt.plot(x, y, 'o', color='blue')
-            plt.annotate(f'P{i+1}({x:.2f}, {y:.2f})', (x, y), 
-                         textcoords="offset points", xytext=(0,10), ha='center')
+        registro.debug("metodo_grafico punto_optimo=%s valor_optimo=%s", punto_optimo,
+                       valor_optimo if punto_optimo else None)
         
-        # Destacar el punto óptimo
-        if punto_optimo:
-            x_opt, y_opt = punto_optimo
-            plt.plot(x_opt, y_opt, 'o', color='red', markersize=10)
-            plt.annotate(f'Óptimo ({x_opt:.2f}, {y_opt:.2f})', 
-                         (x_opt, y_opt), 
-                         textcoords="offset points", 
-                         xytext=(0,15), 
-                         ha='center',
-                         bbox=dict(boxstyle="round,pad=0.3", fc="yellow", alpha=0.3))
-        
-        # Graficar algunas líneas de nivel de la función objetivo
-        if punto_optimo:
-            z_vals = np.linspace(valor_optimo * 0.5, valor_optimo * 1.5, 5)
-            
-            for z in z_vals:
-                if abs(c2) > 1e-10:  # Si c2 no es cero
-                    y_obj = (z - c1*x) / c2
-                    plt.plot(x, y_obj, 'g-', alpha=0.3, linewidth=1)
-            
-            # Destacar el nivel óptimo
-            if abs(c2) > 1e-10:  # Si c2 no es cero
-                y_opt_line = (valor_optimo - c1*x) / c2
-                plt.plot(x, y_opt_line, 'g-', alpha=0.7, linewidth=2,
-                        label=f'F.O. = {valor_optimo:.2f}')
-        
-        # Configurar etiquetas y leyenda
-        plt.xlabel('x₁')
-        plt.ylabel('x₂')
-        plt.grid(True)
-        plt.title(f"Método Gráfico - {datos['tipo_operacion'].capitalize()}: {c1}x₁ + {c2}x₂")
-        plt.legend(loc='upper right', bbox_to_anchor=(1.1, 1.1))
-        plt.tight_layout()
+        # Geometría del gráfico, en las unidades del modelo
+        geometria = {
+            "limites": [float(min_limit), float(max_limit)],
+            "titulo": f"Método Gráfico - {datos['tipo_operacion'].capitalize()}: {c1}x₁ + {c2}x₂",
+            "restricciones": [],
+            "region": (visible * [s1, s2] + 0.0).tolist() if len(visible) >= 3 else [],
+            "lineas_nivel": []
+        }
+        for a, b, c, op in restricciones:
+            geometria["restricciones"].append({
+                "etiqueta": f"{a}x + {b}y {op} {c}",
+                "segmento": segmento_en_ejes(a, b, c, min_limit, max_limit)
+            })
         
-        # Convertir la figura a una imagen en base64
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', dpi=100)
-        buf.seek(0)
-        img_base64 = base64.b64encode(buf.getvalue()).decode('utf-8')
-        plt.close()
+        # Algunas líneas de nivel de la función objetivo y la del valor óptimo
+        if punto_optimo and abs(c2) > 1e-10:
+            for z in np.linspace(valor_optimo * 0.5, valor_optimo * 1.5, 5).tolist() + [valor_optimo]:
+                geometria["lineas_nivel"].append({
+                    "valor": float(z),
+                    "segmento": segmento_en_ejes(c1, c2, z, min_limit, max_limit),
+                    "optima": len(geometria["lineas_nivel"]) == 5
+                })
         
         # Preparar resultados para retornar
         resultado = {
-            "imagen_base64": img_base64,
+            "imagen_base64": None,
             "puntos_esquina": [],
             "punto_optimo": {"x": float(punto_optimo[0]), "y": float(punto_optimo[1])} if punto_optimo else None,
             "valor_optimo": float(valor_optimo) if punto_optimo is not None else None,
@@ -259,11 +429,18 @@ def generar_metodo_grafico(datos):
                 "valor": valor_punto
             })
         
+        # En modo cliente el navegador dibuja la geometría (static/js/plotter.js)
+        if modo == "cliente":
+            resultado["geometria"] = geometria
+        else:
+            imagen = dibujar_grafico(geometria, resultado["puntos_esquina"], resultado["punto_optimo"])
+            resultado["imagen_base64"] = base64.b64encode(imagen).decode('utf-8')
+        
         return resultado
     
     except Exception as e:
-        import traceback
+        # La traza va solo al registro: el resultado llega tal cual a las respuestas de la API
+        registro.warning("Error al generar el método gráfico: %s", e, exc_info=True)
         return {
-            "error": f"Error al generar el método gráfico: {str(e)}",
-            "traceback": traceback.format_exc()
+            "error": f"Error al generar el método gráfico: {str(e)}"
         }
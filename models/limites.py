@@ -0,0 +1,76 @@
+import time
+
+# Iteraciones por defecto de los métodos con tabla (la traza crece con cada iteración)
+MAX_ITERACIONES_TABLA = 20
+
+# Segundos mínimos entre dos llamadas a la función de progreso
+INTERVALO_PROGRESO = 0.25
+
+def validar_limites(datos):
+    """
+    Comprueba los presupuestos opcionales de datos: max_iteraciones (entero
+    positivo) y tiempo_limite (segundos, número positivo). None equivale a no indicarlo.
+    """
+    max_iteraciones = datos.get("max_iteraciones")
+    if max_iteraciones is not None and (int(max_iteraciones) != max_iteraciones or max_iteraciones < 1):
+        raise ValueError("max_iteraciones debe ser un entero positivo")
+
+    tiempo_limite = datos.get("tiempo_limite")
+    if tiempo_limite is not None and not tiempo_limite > 0:
+        raise ValueError("tiempo_limite debe ser un número de segundos positivo")
+
+def leer_limites(datos, max_iteraciones_por_defecto):
+    """
+    Devuelve los límites de una resolución a partir de datos.
+
+    Returns:
+        Diccionario con max_iteraciones, instante_limite (valor de
+        time.perf_counter() a partir del cual se detiene, o None sin límite) y
+        los datos de seguimiento de informar_progreso
+    """
+    validar_limites(datos)
+    max_iteraciones = datos.get("max_iteraciones")
+    tiempo_limite = datos.get("tiempo_limite")
+    return {
+        "max_iteraciones": int(max_iteraciones) if max_iteraciones is not None else max_iteraciones_por_defecto,
+        "instante_limite": time.perf_counter() + tiempo_limite if tiempo_limite is not None else None,
+        "progreso": datos.get("progreso"),
+        "minimizar": datos.get("tipo_operacion") == "minimizar",
+        "ultimo_progreso": None
+    }
+
+def limites_restantes(limites, iteraciones_usadas):
+    """
+    Presupuesto que queda tras iteraciones_usadas, como opciones max_iteraciones
+    y tiempo_limite de datos, para continuar la resolución con otro método.
+    """
+    restantes = {"max_iteraciones": limites["max_iteraciones"] - iteraciones_usadas}
+    if limites["instante_limite"] is not None:
+        # Un límite ya agotado se detiene en la primera comprobación del otro método
+        restantes["tiempo_limite"] = max(limites["instante_limite"] - time.perf_counter(), 1e-9)
+    return restantes
+
+def tiempo_agotado(limites):
+    return limites["instante_limite"] is not None and time.perf_counter() >= limites["instante_limite"]
+
+def informar_progreso(limites, iteracion, valor_maximizacion=None):
+    """
+    Llama a datos["progreso"](iteracion, valor_objetivo), si se indicó, como
+    mucho una vez cada INTERVALO_PROGRESO segundos.
+
+    Args:
+        iteracion: Iteración en curso
+        valor_maximizacion: Valor del objetivo en la forma de maximización que
+            usan las tablas, o None si la base aún no es factible
+    """
+    if limites["progreso"] is None:
+        return
+    ahora = time.perf_counter()
+    if limites["ultimo_progreso"] is not None and ahora - limites["ultimo_progreso"] < INTERVALO_PROGRESO:
+        return
+    limites["ultimo_progreso"] = ahora
+
+    valor_objetivo = None
+    if valor_maximizacion is not None:
+        valor_objetivo = -float(valor_maximizacion) if limites["minimizar"] else float(valor_maximizacion)
+    limites["progreso"](iteracion, valor_objetivo)
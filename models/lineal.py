@@ -1,73 +1,95 @@
-from pulp import LpProblem, LpVariable, LpMinimize, LpMaximize, PULP_CBC_CMD, value
-import numpy as np
+import logging
+import time
+from models.backends import BACKENDS, ESTADOS_SIMPLEX, seleccionar_backend, reutilizar_modelo_cbc
+from models.presolve import presolve, postsolve, resultado_presolve
+from models.dispersa import normalizar_coeficientes
+from models.limites import validar_limites
 
-def resolver_modelo_lineal(datos):
+registro = logging.getLogger(__name__)
+
+def resolver_modelo_lineal(datos, backends=None):
     """
     Resuelve un problema de programación lineal con los datos proporcionados.
-    
+
     Args:
         datos: Diccionario con los siguientes campos:
             - num_variables: Número de variables de decisión (2-5)
             - num_restricciones: Número de restricciones (2-5)
             - coef_objetivo: Lista de coeficientes de la función objetivo
             - tipo_operacion: "maximizar" o "minimizar"
-            - coef_restricciones: Lista de listas con los coeficientes de las restricciones
+            - coef_restricciones: Lista de listas con los coeficientes de las restricciones,
+              o matriz dispersa en formato COO/CSR (ver models/dispersa.py)
             - operadores: Lista con los operadores de las restricciones ("<=", ">=", "=")
             - lados_derechos: Lista con los valores de los lados derechos de las restricciones
-    
+            - backend: (opcional) "auto" (por defecto), "numpy" o "cbc"
+            - regla_precio: (opcional) regla de precio del backend NumPy (ver models/precios.py)
+            - max_iteraciones: (opcional) límite de iteraciones del backend NumPy
+            - tiempo_limite: (opcional) segundos para toda la resolución (incluido el
+              paso a CBC en modo automático)
+            - base_inicial: (opcional) base de un resultado anterior desde la que reoptimizar
+              (ver resolver_simplex_paso_a_paso); en ese caso no se aplica el presolve
+            - presolve: (opcional) False para resolver el modelo sin reducirlo antes
+              (ver models/presolve.py)
+        backends: (opcional) funciones de resolución por nombre de backend; por
+            defecto BACKENDS (resolver_variaciones pasa un CBC que reutiliza el modelo)
+
     Returns:
         Diccionario con los resultados del modelo:
             - status: Estado de la solución
             - valor_objetivo: Valor óptimo de la función objetivo
             - variables: Valores de las variables de decisión
-            - tiempo_ejecucion: Tiempo de ejecución del modelo
+            - backend: Backend que resolvió el modelo
+            - tiempo_ejecucion: Tiempo de ejecución del modelo (segundos)
+            - iteraciones: Iteraciones del Simplex (solo backend NumPy)
+            - base: Base final (solo backend NumPy)
+            - sensibilidad: Si es óptimo, precios sombra de las restricciones y costos
+              reducidos de las variables, con sus rangos (solo backend NumPy; con CBC
+              sin rangos). Ver models/sensibilidad.py
+            - presolve: Filas y variables que eliminó el presolve y por qué
             - error: Mensaje de error (si ocurre)
     """
     try:
-        # Crear el problema
-        if datos["tipo_operacion"] == "maximizar":
-            prob = LpProblem("Problema_PL", LpMaximize)
+        datos = normalizar_coeficientes(datos)
+        validar_limites(datos)
+        backends = BACKENDS if backends is None else backends
+
+        inicio = time.perf_counter()
+        # El presolve reduce el modelo para cualquier backend (una base previa es del modelo completo)
+        reducido, reduccion = datos, None
+        if datos.get("presolve", True) and datos.get("base_inicial") is None:
+            reducido, reduccion = presolve(datos)
+        backend = seleccionar_backend(reducido)
+
+        if reduccion is not None and reduccion["estado"] is not None:
+            backend = "presolve"
+            resultados = resultado_presolve(reduccion, ESTADOS_SIMPLEX)
         else:
-            prob = LpProblem("Problema_PL", LpMinimize)
-        
-        # Crear variables
-        num_vars = datos["num_variables"]
-        variables = [LpVariable(f"x{i}", lowBound=0) for i in range(1, num_vars + 1)]
-        
-        # Definir función objetivo
-        coef_obj = datos["coef_objetivo"]
-        prob += sum(coef_obj[i] * variables[i] for i in range(num_vars))
-        
-        # Añadir restricciones
-        for i in range(datos["num_restricciones"]):
-            coefs = datos["coef_restricciones"][i]
-            operador = datos["operadores"][i]
-            lado_derecho = datos["lados_derechos"][i]
-            
-            expresion = sum(coefs[j] * variables[j] for j in range(num_vars))
-            
-            if operador == "<=":
-                prob += (expresion <= lado_derecho)
-            elif operador == ">=":
-                prob += (expresion >= lado_derecho)
-            else:  # operador == "="
-                prob += (expresion == lado_derecho)
-        
-        # Resolver el problema
-        prob.solve(PULP_CBC_CMD(msg=False))
-        
-        # Preparar resultados
-        resultados = {
-            "status": prob.status,
-            "status_text": prob.status == 1 and "Óptimo" or "No óptimo",
-            "valor_objetivo": value(prob.objective),
-            "variables": [{"nombre": f"x{i+1}", "valor": value(variables[i])} for i in range(num_vars)],
-            "error": None
-        }
-        
+            resultados = backends[backend](reducido)
+
+        # En modo automático, si el Simplex en proceso agota las iteraciones se recurre
+        # a CBC con el tiempo que quede (si se agotó el tiempo, no queda nada que darle)
+        if datos.get("backend", "auto") == "auto" and backend == "numpy" and resultados["status"] == 0 \
+                and resultados["status_text"] != "Tiempo límite alcanzado":
+            backend = "cbc"
+            if reducido.get("tiempo_limite") is not None:
+                restante = reducido["tiempo_limite"] - (time.perf_counter() - inicio)
+                reducido = dict(reducido, tiempo_limite=max(restante, 0.01))
+            resultados = backends[backend](reducido)
+
+        if reduccion is not None:
+            resultados = postsolve(datos, reduccion, resultados)
+        resultados["backend"] = backend
+        resultados["tiempo_ejecucion"] = time.perf_counter() - inicio
+        resultados["error"] = None
+        registro.debug("modelo resuelto backend=%s estado=%s iteraciones=%s tamano=%dx%d ms=%.2f",
+                       backend, resultados["status"], resultados.get("iteraciones"),
+                       datos["num_restricciones"], datos["num_variables"], resultados["tiempo_ejecucion"] * 1000)
+
         return resultados
-    
+
     except Exception as e:
+        # Suelen ser datos no válidos del cliente: la traza solo con DEBUG
+        registro.info("Error al resolver el modelo: %s", e, exc_info=registro.isEnabledFor(logging.DEBUG))
         return {
             "status": -1,
             "status_text": "Error",
@@ -75,3 +97,86 @@ def resolver_modelo_lineal(datos):
             "variables": None,
             "error": str(e)
         }
+
+# Campos que puede cambiar cada variación de un lote; el resto (coef_restricciones,
+# operadores, backend) se comparte con el modelo base
+CAMPOS_VARIACION = ("coef_objetivo", "lados_derechos", "tipo_operacion",
+                    "regla_precio", "max_iteraciones", "tiempo_limite")
+
+# Instancias máximas por lote
+MAX_INSTANCIAS_LOTE = 1000
+
+def aplicar_variacion(datos, variacion):
+    """
+    Devuelve una copia de datos con los campos de la variación aplicados. La
+    matriz de restricciones no se copia: todas las variaciones la comparten.
+
+    Raises:
+        ValueError: Si la variación cambia campos no admitidos o dimensiones
+    """
+    no_admitidos = sorted(set(variacion) - set(CAMPOS_VARIACION))
+    if no_admitidos:
+        raise ValueError(f"Campos no admitidos en una variación: {', '.join(no_admitidos)}")
+    if "coef_objetivo" in variacion and len(variacion["coef_objetivo"]) != datos["num_variables"]:
+        raise ValueError("coef_objetivo de la variación no coincide con num_variables")
+    if "lados_derechos" in variacion and len(variacion["lados_derechos"]) != datos["num_restricciones"]:
+        raise ValueError("lados_derechos de la variación no coincide con num_restricciones")
+    return dict(datos, **variacion)
+
+def resolver_lote(instancias):
+    """
+    Resuelve una lista de modelos independientes.
+
+    Args:
+        instancias: Lista de diccionarios de datos (ver resolver_modelo_lineal)
+
+    Returns:
+        Diccionario con resultados (uno por instancia, en el mismo orden),
+        num_instancias, tiempo_total (segundos) e instancias_por_segundo
+    """
+    _validar_tamano_lote(instancias)
+    inicio = time.perf_counter()
+    resultados = [resolver_modelo_lineal(datos) for datos in instancias]
+    return _resumen_lote(resultados, inicio)
+
+def resolver_variaciones(datos_base, variaciones):
+    """
+    Resuelve muchas variantes de un mismo modelo (distinto objetivo, lados
+    derechos, sentido o límites). La matriz de restricciones se normaliza una
+    sola vez y, si el backend es CBC, el modelo PuLP se construye una vez y se
+    actualiza en cada variante.
+
+    Args:
+        datos_base: Datos del modelo base (ver resolver_modelo_lineal)
+        variaciones: Lista de diccionarios con los campos de CAMPOS_VARIACION a cambiar
+
+    Returns:
+        Igual que resolver_lote
+
+    Raises:
+        ValueError: Si el modelo base o alguna variación no son válidos
+    """
+    _validar_tamano_lote(variaciones)
+    inicio = time.perf_counter()
+    datos_base = normalizar_coeficientes(datos_base)
+    validar_limites(datos_base)
+    instancias = [aplicar_variacion(datos_base, variacion) for variacion in variaciones]
+
+    backends = dict(BACKENDS, cbc=reutilizar_modelo_cbc())
+    resultados = [resolver_modelo_lineal(datos, backends) for datos in instancias]
+    return _resumen_lote(resultados, inicio)
+
+def _validar_tamano_lote(instancias):
+    if len(instancias) == 0:
+        raise ValueError("El lote no tiene instancias")
+    if len(instancias) > MAX_INSTANCIAS_LOTE:
+        raise ValueError(f"El lote admite como máximo {MAX_INSTANCIAS_LOTE} instancias")
+
+def _resumen_lote(resultados, inicio):
+    tiempo_total = time.perf_counter() - inicio
+    return {
+        "resultados": resultados,
+        "num_instancias": len(resultados),
+        "tiempo_total": tiempo_total,
+        "instancias_por_segundo": len(resultados) / tiempo_total if tiempo_total > 0 else None
+    }
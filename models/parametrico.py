@@ -0,0 +1,196 @@
+import numpy as np
+from models.dispersa import MatrizDispersa, normalizar_coeficientes, tripletas
+from models.simplex import resolver_simplex_paso_a_paso
+
+# Tipos de parámetro: un lado derecho (índice de restricción) o un coeficiente del objetivo (de variable)
+TIPOS_PARAMETRO = ("lado_derecho", "coef_objetivo")
+
+# Máximo de segmentos de la curva (cada uno cuesta una reoptimización)
+MAX_SEGMENTOS = 500
+
+def analisis_parametrico(datos, parametro):
+    """
+    Análisis paramétrico: valor óptimo en función de un lado derecho o de un
+    coeficiente del objetivo que recorre un intervalo. Esa función es lineal a
+    trozos; se parte de la base óptima de resolver_simplex_paso_a_paso y, en vez
+    de resolver en muchos puntos, se salta de un punto de ruptura al siguiente con
+    los rangos del análisis de sensibilidad (ver models/sensibilidad.py),
+    reoptimizando en cada uno desde la base anterior (ver metodo_simplex_revisado).
+
+    Args:
+        datos: Datos del modelo (ver resolver_modelo_lineal)
+        parametro: Diccionario con:
+            - tipo: "lado_derecho" o "coef_objetivo"
+            - indice: Restricción o variable (desde 1)
+            - desde, hasta: Intervalo de valores del parámetro
+
+    Returns:
+        Diccionario con:
+            - parametro: El parámetro analizado
+            - segmentos: Tramos en orden creciente del parámetro, cada uno con desde,
+              hasta, status_text y, si es óptimo, valor_desde, valor_hasta, pendiente
+              (precio sombra o valor de la variable) y la base del tramo
+            - puntos: Puntos de ruptura (valor_parametro, valor_objetivo) de la curva
+            - resoluciones: Número de resoluciones del Simplex
+            - truncado: True si se alcanzó MAX_SEGMENTOS antes de llegar al final
+
+    Raises:
+        ValueError: Si el parámetro no es válido
+    """
+    datos = normalizar_coeficientes(datos)
+    tipo, k, desde, hasta = _leer_parametro(datos, parametro)
+    es_rhs = tipo == "lado_derecho"
+    campo = "lados_derechos" if es_rhs else "coef_objetivo"
+    # Separación mínima entre tramos: al reoptimizar justo después de un punto de ruptura
+    paso = 1e-7 * max(1.0, abs(hasta - desde), abs(desde), abs(hasta))
+
+    def resolver(valor, base=None):
+        valores = list(datos[campo])
+        valores[k] = valor
+        variante = dict(datos, **{campo: valores}, modo_traza="pivotes")
+        if base is not None:
+            variante.pop("metodo", None)
+            variante["base_inicial"] = base
+        return resolver_simplex_paso_a_paso(variante)["resultado_final"]
+
+    # Al minimizar, el problema no acotado para un coeficiente c_k lo sigue siendo al
+    # bajarlo (y al maximizar, al subirlo): se recorre desde el extremo acotado
+    sentido = -1 if not es_rhs and datos["tipo_operacion"] == "minimizar" else 1
+    inicio, fin = (desde, hasta) if sentido > 0 else (hasta, desde)
+
+    segmentos = []
+    resoluciones = 1
+    theta = inicio
+    final = resolver(theta)
+
+    # Con un lado derecho, los valores factibles forman un intervalo que puede no empezar en desde
+    if es_rhs and final["status_text"] == "Problema sin solución factible":
+        primero = _extremo_factible(datos, k, desde, hasta)
+        resoluciones += 1
+        if primero is not None and primero > desde:
+            segmentos.append(_segmento_sin_optimo(desde, primero, final["status_text"]))
+            theta = primero
+            final = resolver(theta)
+            resoluciones += 1
+
+    truncado = False
+    origen = theta
+    while True:
+        if final["status_text"] != "Óptimo":
+            # Fuera del óptimo (sin solución factible, no acotado o límites) no hay base que seguir
+            segmentos.append(_segmento_sin_optimo(origen, fin, final["status_text"]))
+            break
+        if len(segmentos) >= MAX_SEGMENTOS:
+            truncado = True
+            break
+
+        sensibilidad = final["sensibilidad"]
+        if es_rhs:
+            fila = sensibilidad["restricciones"][k]
+            pendiente, rango = fila["precio_sombra"], fila["rango_lado_derecho"]
+        else:
+            fila = sensibilidad["variables"][k]
+            pendiente, rango = fila["valor"], fila["rango_coeficiente"]
+
+        # La base es óptima hasta el extremo de su rango (al menos en theta, salvo ruido numérico)
+        limite = rango[1] if sentido > 0 else rango[0]
+        extremo = theta if (limite - theta) * sentido < 0 else limite
+        if (extremo - fin) * sentido >= 0:
+            extremo = fin
+        # El tramo empieza en el punto de ruptura anterior, aunque se resolviera un poco después
+        valor = final["valor_objetivo"]
+        segmentos.append({
+            "desde": min(origen, extremo),
+            "hasta": max(origen, extremo),
+            "status_text": final["status_text"],
+            "valor_desde": valor + pendiente * (min(origen, extremo) - theta),
+            "valor_hasta": valor + pendiente * (max(origen, extremo) - theta),
+            "pendiente": pendiente,
+            "base": final["base"]
+        })
+        if extremo == fin:
+            break
+
+        origen = extremo
+        theta = extremo + sentido * paso
+        if (theta - fin) * sentido > 0:
+            theta = fin
+        final = resolver(theta, final["base"])
+        resoluciones += 1
+
+    if sentido < 0:
+        segmentos.reverse()
+    puntos = []
+    for segmento in segmentos:
+        if segmento["status_text"] == "Óptimo":
+            if not puntos or puntos[-1]["valor_parametro"] != segmento["desde"]:
+                puntos.append({"valor_parametro": segmento["desde"], "valor_objetivo": segmento["valor_desde"]})
+            puntos.append({"valor_parametro": segmento["hasta"], "valor_objetivo": segmento["valor_hasta"]})
+
+    return {
+        "parametro": {"tipo": tipo, "indice": k + 1, "desde": desde, "hasta": hasta},
+        "segmentos": segmentos,
+        "puntos": puntos,
+        "resoluciones": resoluciones,
+        "truncado": truncado
+    }
+
+def _leer_parametro(datos, parametro):
+    if not isinstance(parametro, dict):
+        raise ValueError("El parámetro debe ser un diccionario con tipo, indice, desde y hasta")
+    tipo = parametro.get("tipo")
+    if tipo not in TIPOS_PARAMETRO:
+        raise ValueError(f"Tipo de parámetro desconocido: {tipo}")
+    for campo in ("indice", "desde", "hasta"):
+        if campo not in parametro:
+            raise ValueError(f"Falta el campo {campo} del parámetro")
+    limite = datos["num_restricciones"] if tipo == "lado_derecho" else datos["num_variables"]
+    indice = int(parametro["indice"])
+    if not 1 <= indice <= limite:
+        raise ValueError(f"indice debe estar entre 1 y {limite}")
+    desde, hasta = float(parametro["desde"]), float(parametro["hasta"])
+    if not (np.isfinite(desde) and np.isfinite(hasta)) or desde > hasta:
+        raise ValueError("El intervalo del parámetro debe ser finito y con desde <= hasta")
+    return tipo, indice - 1, desde, hasta
+
+def _segmento_sin_optimo(desde, hasta, status_text):
+    return {
+        "desde": min(desde, hasta),
+        "hasta": max(desde, hasta),
+        "status_text": status_text,
+        "valor_desde": None,
+        "valor_hasta": None,
+        "pendiente": None,
+        "base": None
+    }
+
+def _extremo_factible(datos, k, desde, hasta):
+    """
+    Menor lado derecho b_k en [desde, hasta] con el que el modelo es factible, o
+    None si no hay ninguno. Se resuelve un modelo auxiliar con una variable más,
+    t = b_k - desde, que se minimiza.
+    """
+    num_vars, num_rest = datos["num_variables"], datos["num_restricciones"]
+    filas, columnas, valores = tripletas(datos["coef_restricciones"], num_rest, num_vars)
+    # Fila k: a_k·x - t (op) desde, y una fila más: t <= hasta - desde
+    filas = np.concatenate([filas, [k, num_rest]])
+    columnas = np.concatenate([columnas, [num_vars, num_vars]])
+    valores = np.concatenate([valores, [-1.0, 1.0]])
+    lados_derechos = list(datos["lados_derechos"]) + [hasta - desde]
+    lados_derechos[k] = desde
+
+    auxiliar = {
+        "num_variables": num_vars + 1,
+        "num_restricciones": num_rest + 1,
+        "coef_objetivo": [0.0] * num_vars + [1.0],
+        "tipo_operacion": "minimizar",
+        "coef_restricciones": MatrizDispersa.desde_coo(filas, columnas, valores, (num_rest + 1, num_vars + 1)),
+        "operadores": list(datos["operadores"]) + ["<="],
+        "lados_derechos": lados_derechos,
+        "metodo": "revisado",
+        "modo_traza": "pivotes"
+    }
+    final = resolver_simplex_paso_a_paso(auxiliar)["resultado_final"]
+    if final["status_text"] != "Óptimo":
+        return None
+    return desde + float(final["valor_objetivo"])
@@ -0,0 +1,118 @@
+import numpy as np
+
+# Reglas de precio (pricing) para elegir la variable que entra a la base:
+#   - "dantzig": el costo reducido más negativo
+#   - "steepest_edge": el mayor descenso por unidad de longitud de la arista, d_j / sqrt(γ_j)
+#   - "devex": aproximación de steepest edge con pesos de referencia actualizados en cada pivote
+#   - "bland": la primera columna que mejora (y, en la prueba del cociente, la fila cuya
+#     variable básica tiene menor índice); no cicla nunca
+REGLAS_PRECIO = ("dantzig", "steepest_edge", "devex", "bland")
+
+# Pivotes degenerados seguidos tras los que se pasa a la regla de Bland para evitar ciclos
+MAX_PIVOTES_DEGENERADOS = 10
+
+TOLERANCIA = 1e-10
+
+def validar_regla(regla):
+    if regla not in REGLAS_PRECIO:
+        raise ValueError(f"Regla de precio desconocida: {regla}")
+    return regla
+
+def nuevo_estado(regla, num_columnas, pesos=None):
+    """
+    Estado de la regla de precio a lo largo de las iteraciones (y de las fases).
+
+    Args:
+        regla: Una de REGLAS_PRECIO
+        num_columnas: Número de columnas (pesos de referencia de Devex / steepest edge)
+        pesos: (opcional) pesos iniciales; por defecto todos 1
+    """
+    return {
+        "regla": validar_regla(regla),
+        "pesos": np.ones(num_columnas) if pesos is None else np.asarray(pesos, dtype=float),
+        "degenerados": 0,
+        "cambio_a_bland": False
+    }
+
+def regla_activa(estado):
+    return "bland" if estado["cambio_a_bland"] else estado["regla"]
+
+def elegir_entrada(regla, costos, pesos=None, tolerancia=TOLERANCIA):
+    """
+    Elige la variable que entra entre las candidatas.
+
+    Args:
+        regla: Regla de precio activa
+        costos: Costos reducidos de las candidatas (minimización: entra uno negativo)
+        pesos: Pesos γ_j de las candidatas para "steepest_edge" y "devex"
+
+    Returns:
+        Posición dentro de costos de la que entra, o None si ninguna mejora el objetivo
+    """
+    negativos = costos < -tolerancia
+    if not negativos.any():
+        return None
+
+    if regla == "bland":
+        return int(np.argmax(negativos))
+
+    # Dantzig equivale a pesos unitarios: el mayor d_j² es el d_j más negativo
+    puntuacion = costos ** 2 if pesos is None or regla == "dantzig" else costos ** 2 / pesos
+    return int(np.argmax(np.where(negativos, puntuacion, -1.0)))
+
+def elegir_salida(cocientes, indices_base, regla):
+    """
+    Fila que sale de la base: el menor cociente; con la regla de Bland, entre
+    los empatados, la de la variable básica con menor índice.
+    """
+    fila = int(np.argmin(cocientes))
+    if regla == "bland":
+        empatadas = np.nonzero(cocientes <= cocientes[fila] + TOLERANCIA)[0]
+        fila = int(empatadas[np.argmin(np.asarray(indices_base)[empatadas])])
+    return fila
+
+def registrar_pivote(estado, theta):
+    """
+    Lleva la cuenta de pivotes degenerados (paso theta nulo) seguidos y pasa a
+    la regla de Bland cuando se alcanza MAX_PIVOTES_DEGENERADOS.
+    """
+    if theta <= TOLERANCIA:
+        estado["degenerados"] += 1
+        if estado["degenerados"] >= MAX_PIVOTES_DEGENERADOS and estado["regla"] != "bland":
+            estado["cambio_a_bland"] = True
+    else:
+        estado["degenerados"] = 0
+
+def actualizar_devex(pesos, fila_pivote, col_entrada, col_salida):
+    """
+    Actualiza los pesos de referencia de Devex tras un pivote.
+
+    Args:
+        pesos: Pesos de todas las columnas (se modifican en el sitio)
+        fila_pivote: Fila pivote α_r antes del pivote, para todas las columnas
+        col_entrada: Columna que entra (q)
+        col_salida: Columna que sale de la base
+    """
+    alfa_rq = fila_pivote[col_entrada]
+    peso_q = pesos[col_entrada]
+    np.maximum(pesos, (fila_pivote / alfa_rq) ** 2 * peso_q, out=pesos)
+    pesos[col_salida] = max(peso_q / alfa_rq ** 2, 1.0)
+
+def actualizar_steepest_edge(pesos, fila_pivote, producto_w, alfa, col_entrada, col_salida, no_basicas):
+    """
+    Actualización exacta de Goldfarb-Reid de γ_j = 1 + ||B⁻¹a_j||² tras un pivote.
+
+    Args:
+        pesos: γ_j de todas las columnas (se modifican en el sitio)
+        fila_pivote: α_rj = (fila r de B⁻¹)·a_j para todas las columnas
+        producto_w: a_jᵀ·B⁻ᵀ·α_q para todas las columnas
+        alfa: B⁻¹·a_q, la columna que entra en la base actual
+        col_entrada, col_salida: Columnas que entran y salen
+        no_basicas: Máscara de las columnas no básicas tras el pivote
+    """
+    alfa_rq = fila_pivote[col_entrada]
+    peso_q = 1.0 + alfa @ alfa
+    razon = fila_pivote / alfa_rq
+    nuevos = np.maximum(pesos - 2.0 * razon * producto_w + razon ** 2 * peso_q, 1.0 + razon ** 2)
+    pesos[no_basicas] = nuevos[no_basicas]
+    pesos[col_salida] = max(peso_q / alfa_rq ** 2, 1.0)
@@ -0,0 +1,374 @@
+import numpy as np
+from models.dispersa import MatrizDispersa, matriz_desde_datos, tripletas
+from models.sensibilidad import analisis_sensibilidad
+
+TOLERANCIA = 1e-9
+
+# Pasadas máximas: cada reducción puede habilitar otras (una fija vacía una fila, etc.)
+MAX_PASADAS = 20
+
+# Reducciones que se cuentan en el informe
+ACCIONES = ("filas_vacias", "filas_singleton", "filas_duplicadas", "columnas_vacias",
+            "variables_fijas", "cotas_inferiores")
+
+_OPUESTO = {"<=": ">=", ">=": "<=", "=": "="}
+
+def presolve(datos):
+    """
+    Reduce el modelo antes de resolverlo:
+        - filas vacías (0 op b): se comprueban y se eliminan
+        - filas con una sola variable: a·x_j = b fija x_j, a·x_j >= b con b/a > 0
+          se elimina desplazando x_j = b/a + x'_j, a·x_j <= 0 fija x_j = 0 (el
+          resto de cotas superiores se mantienen como fila: el modelo no tiene cotas)
+        - filas paralelas (una múltiplo de otra): se conserva la más restrictiva
+        - variables fijas: se sustituyen en los lados derechos y en el objetivo
+        - columnas vacías: x_j = 0 si no mejora el objetivo (si lo mejora se deja
+          para que el solver detecte el problema no acotado)
+
+    Args:
+        datos: Datos del modelo, con los coeficientes normalizados (ver resolver_modelo_lineal)
+
+    Returns:
+        Tupla (datos_reducidos, reduccion). datos_reducidos es el propio datos si no
+        se elimina nada. reduccion contiene lo necesario para postsolve y un
+        informe; su estado es None, o el status_text si el presolve ya decide el
+        problema (sin solución factible, no acotado u óptimo sin nada que resolver).
+    """
+    num_vars, num_rest = datos["num_variables"], datos["num_restricciones"]
+    filas, columnas, valores = tripletas(datos["coef_restricciones"], num_rest, num_vars)
+    orden = np.lexsort((columnas, filas))
+    filas, columnas, valores = filas[orden], columnas[orden], valores[orden]
+    # Elementos de cada fila (ordenados por columna) y de cada columna
+    inicio_fila = np.searchsorted(filas, np.arange(num_rest + 1))
+    orden_col = np.argsort(columnas, kind="stable")
+    inicio_col = np.searchsorted(columnas[orden_col], np.arange(num_vars + 1))
+
+    b = np.array(datos["lados_derechos"], dtype=float)
+    c = np.array(datos["coef_objetivo"], dtype=float)
+    operadores = list(datos["operadores"])
+    maximizar = datos["tipo_operacion"] == "maximizar"
+
+    fila_activa = np.ones(num_rest, dtype=bool)
+    col_activa = np.ones(num_vars, dtype=bool)
+    desplazamiento = np.zeros(num_vars)
+    fijas = {}
+    constante = 0.0
+    eliminadas = []
+    acciones = dict.fromkeys(ACCIONES, 0)
+
+    def elementos_fila(i):
+        k = np.arange(inicio_fila[i], inicio_fila[i + 1])
+        return k[col_activa[columnas[k]]]
+
+    def sustituir(j, valor):
+        # x_j = valor en todas las filas activas y en el objetivo
+        nonlocal constante
+        k = orden_col[inicio_col[j]:inicio_col[j + 1]]
+        k = k[fila_activa[filas[k]]]
+        b[filas[k]] -= valores[k] * valor
+        constante += c[j] * valor
+
+    def fijar(j, valor, accion="variables_fijas"):
+        sustituir(j, valor)
+        fijas[j] = valor
+        col_activa[j] = False
+        acciones[accion] += 1
+
+    def quitar_fila(i, tipo, variable=None):
+        fila_activa[i] = False
+        eliminadas.append((i, tipo, variable))
+
+    def infactible():
+        return datos, _reduccion(datos, fila_activa, col_activa, desplazamiento, fijas, constante,
+                                 eliminadas, acciones, "Problema sin solución factible")
+
+    for _ in range(MAX_PASADAS):
+        hubo_cambios = False
+        activos = fila_activa[filas] & col_activa[columnas]
+        conteo = np.bincount(filas[activos], minlength=num_rest)
+
+        for i in np.nonzero(fila_activa & (conteo == 0))[0]:
+            if not _cumple(0.0, operadores[i], b[i]):
+                return infactible()
+            quitar_fila(i, "redundante")
+            acciones["filas_vacias"] += 1
+            hubo_cambios = True
+
+        for i in np.nonzero(fila_activa & (conteo == 1))[0]:
+            k = elementos_fila(i)
+            if len(k) != 1:
+                continue  # Su variable se ha fijado en esta pasada: en la siguiente es una fila vacía
+            j, a = columnas[k[0]], valores[k[0]]
+            operador = operadores[i] if a > 0 else _OPUESTO[operadores[i]]
+            cota = b[i] / a
+            escala = TOLERANCIA * (1 + abs(cota))
+            if operador != ">=" and cota < -escala:
+                return infactible()
+            if operador == "=" or (operador == "<=" and cota <= escala):
+                fijar(j, max(cota, 0.0) if operador == "=" else 0.0)
+            elif operador == "<=":
+                continue  # Cota superior: se queda como restricción
+            elif cota > escala:
+                sustituir(j, cota)
+                desplazamiento[j] += cota
+                acciones["cotas_inferiores"] += 1
+            quitar_fila(i, "singleton", j)
+            acciones["filas_singleton"] += 1
+            hubo_cambios = True
+
+        activos = fila_activa[filas] & col_activa[columnas]
+        conteo_cols = np.bincount(columnas[activos], minlength=num_vars)
+        for j in np.nonzero(col_activa & (conteo_cols == 0))[0]:
+            if (c[j] > TOLERANCIA) if maximizar else (c[j] < -TOLERANCIA):
+                continue
+            fijar(j, 0.0, "columnas_vacias")
+            hubo_cambios = True
+
+        resultado = _quitar_paralelas(elementos_fila, fila_activa, columnas, valores, b, operadores, quitar_fila)
+        if resultado is None:
+            return infactible()
+        if resultado:
+            acciones["filas_duplicadas"] += resultado
+            hubo_cambios = True
+
+        if not hubo_cambios:
+            break
+
+    reduccion = _reduccion(datos, fila_activa, col_activa, desplazamiento, fijas, constante, eliminadas, acciones)
+    if not eliminadas and not fijas:
+        return datos, reduccion
+
+    filas_reducidas, columnas_reducidas = reduccion["filas"], reduccion["columnas"]
+    nueva_fila = np.full(num_rest, -1)
+    nueva_fila[filas_reducidas] = np.arange(len(filas_reducidas))
+    nueva_col = np.full(num_vars, -1)
+    nueva_col[columnas_reducidas] = np.arange(len(columnas_reducidas))
+    activos = fila_activa[filas] & col_activa[columnas]
+
+    reducidos = dict(datos,
+                     num_variables=len(columnas_reducidas),
+                     num_restricciones=len(filas_reducidas),
+                     coef_objetivo=c[columnas_reducidas].tolist(),
+                     coef_restricciones=MatrizDispersa.desde_coo(
+                         nueva_fila[filas[activos]], nueva_col[columnas[activos]], valores[activos],
+                         (len(filas_reducidas), len(columnas_reducidas))),
+                     operadores=[operadores[i] for i in filas_reducidas],
+                     lados_derechos=b[filas_reducidas].tolist())
+
+    # Sin restricciones no queda nada que resolver: las columnas que quedan mejoran el objetivo sin límite
+    if len(filas_reducidas) == 0:
+        reduccion["estado"] = "Óptimo" if len(columnas_reducidas) == 0 else "Problema no acotado"
+    return reducidos, reduccion
+
+def resultado_presolve(reduccion, estados):
+    """
+    Resultado (del modelo reducido) cuando el presolve ya decide el problema.
+
+    Args:
+        estados: Código de estado de cada status_text (ver ESTADOS_SIMPLEX)
+    """
+    optimo = reduccion["estado"] == "Óptimo"
+    return {
+        "status": estados[reduccion["estado"]],
+        "status_text": reduccion["estado"],
+        "valor_objetivo": 0.0 if optimo else None,
+        "variables": [] if optimo else None,
+        "base": [] if optimo else None,
+        "sensibilidad": {"variables": [], "restricciones": []} if optimo else None
+    }
+
+def postsolve(datos, reduccion, resultado):
+    """
+    Traduce el resultado del modelo reducido al original: valores de x1..xn,
+    valor objetivo con la parte constante de las variables fijadas y, si es
+    óptimo, una base óptima del modelo original (las filas eliminadas aportan su
+    holgura, o la variable que acotaban si esa cota está activa) con su análisis
+    de sensibilidad. Con CBC, que no devuelve base, se completan los precios
+    sombra y costos reducidos.
+    """
+    resultado = dict(resultado)
+    resultado["presolve"] = reduccion["informe"]
+    if resultado.get("variables") is None:
+        return resultado
+
+    x = reduccion["desplazamiento"].copy()
+    x[reduccion["columnas"]] += [float(v["valor"]) for v in resultado["variables"]]
+    for j, valor in reduccion["fijas"].items():
+        x[j] += valor
+    resultado["variables"] = [{"nombre": f"x{j+1}", "valor": float(x[j])} for j in range(len(x))]
+    if resultado.get("valor_objetivo") is not None:
+        resultado["valor_objetivo"] = float(resultado["valor_objetivo"]) + reduccion["constante"]
+
+    sensibilidad = resultado.get("sensibilidad")
+    if resultado["status_text"] != "Óptimo" or sensibilidad is None:
+        # Una base no óptima del modelo reducido no se traduce
+        if resultado.get("base") is not None:
+            resultado["base"] = None
+        return resultado
+
+    y = np.zeros(datos["num_restricciones"])
+    y[reduccion["filas"]] = [r["precio_sombra"] for r in sensibilidad["restricciones"]]
+
+    if resultado.get("base") is not None:
+        base = []
+        for nombre in resultado["base"]:
+            tipo, k = nombre[0], int(nombre[1:]) - 1
+            base.append(f"x{reduccion['columnas'][k] + 1}" if tipo == "x" else f"{tipo}{reduccion['filas'][k] + 1}")
+        y, nombres = _completar_eliminadas(datos, reduccion, x, y, set(base))
+        base += nombres
+        resultado["base"] = base
+        resultado["sensibilidad"] = analisis_sensibilidad(datos, base)
+    else:
+        y, _ = _completar_eliminadas(datos, reduccion, x, y, None)
+        resultado["sensibilidad"] = _sensibilidad_sin_rangos(datos, x, y)
+    return resultado
+
+def _reduccion(datos, fila_activa, col_activa, desplazamiento, fijas, constante, eliminadas, acciones, estado=None):
+    filas = np.nonzero(fila_activa)[0]
+    columnas = np.nonzero(col_activa)[0]
+    return {
+        "estado": estado,
+        "filas": filas,
+        "columnas": columnas,
+        "desplazamiento": desplazamiento,
+        "fijas": fijas,
+        "constante": constante,
+        "eliminadas": eliminadas,
+        "informe": {
+            "restricciones_eliminadas": sorted(int(i) + 1 for i in np.nonzero(~fila_activa)[0]),
+            "variables_eliminadas": [f"x{j+1}" for j in np.nonzero(~col_activa)[0]],
+            "num_restricciones": len(filas),
+            "num_variables": len(columnas),
+            "acciones": dict(acciones)
+        }
+    }
+
+def _cumple(actividad, operador, lado_derecho):
+    escala = TOLERANCIA * (1 + abs(lado_derecho))
+    if operador == "<=":
+        return actividad <= lado_derecho + escala
+    if operador == ">=":
+        return actividad >= lado_derecho - escala
+    return abs(actividad - lado_derecho) <= escala
+
+def _quitar_paralelas(elementos_fila, fila_activa, columnas, valores, b, operadores, quitar_fila):
+    """
+    Agrupa las filas activas con el mismo patrón de coeficientes salvo un factor
+    y deja en cada grupo la de igualdad, o la cota superior más baja y la
+    inferior más alta. Devuelve el número de filas quitadas, o None si el grupo
+    es incompatible.
+    """
+    grupos = {}
+    for i in np.nonzero(fila_activa)[0]:
+        k = elementos_fila(i)
+        if len(k) < 2:
+            continue
+        escala = valores[k[0]]
+        clave = (columnas[k].tobytes(), (np.round(valores[k] / escala, 9) + 0.0).tobytes())
+        grupos.setdefault(clave, []).append((i, escala))
+
+    quitadas = 0
+    for grupo in grupos.values():
+        if len(grupo) < 2:
+            continue
+        # Cada fila como patrón normalizado (op) cota
+        cotas = {"<=": [], ">=": [], "=": []}
+        for i, escala in grupo:
+            operador = operadores[i] if escala > 0 else _OPUESTO[operadores[i]]
+            cotas[operador].append((b[i] / escala, i))
+
+        if cotas["="]:
+            valor, conservada = cotas["="][0]
+            if not all(_cumple(valor, "=", v) for v, _ in cotas["="]) or \
+                    not all(_cumple(valor, "<=", u) for u, _ in cotas["<="]) or \
+                    not all(_cumple(valor, ">=", l) for l, _ in cotas[">="]):
+                return None
+            conservadas = {conservada}
+        else:
+            conservadas = set()
+            if cotas["<="]:
+                conservadas.add(min(cotas["<="])[1])
+            if cotas[">="]:
+                conservadas.add(max(cotas[">="])[1])
+            if cotas["<="] and cotas[">="] and not _cumple(max(cotas[">="])[0], "<=", min(cotas["<="])[0]):
+                return None
+
+        for i, _ in grupo:
+            if i not in conservadas:
+                quitar_fila(i, "redundante")
+                quitadas += 1
+    return quitadas
+
+def _completar_eliminadas(datos, reduccion, x, y, en_base):
+    """
+    Precios sombra de las filas eliminadas y la columna básica que aporta cada
+    una a la base original. Una fila singleton activa (y las de igualdad) pasa a
+    la base la variable que acota si esta no es ya básica y su valor es positivo
+    o su costo reducido la empujaría a cruzar la cota; su precio sombra absorbe
+    ese costo reducido si el signo corresponde a su operador. El resto aporta su holgura (o su artificial, en las de
+    igualdad) con precio sombra 0.
+
+    Args:
+        en_base: Nombres ya básicos, o None si no hay base (CBC)
+
+    Returns:
+        Tupla (y, nombres) con los precios sombra de todas las filas y las
+        columnas básicas añadidas
+    """
+    num_vars, num_rest = datos["num_variables"], datos["num_restricciones"]
+    A = matriz_desde_datos(datos["coef_restricciones"], num_rest, num_vars)
+    b = np.array(datos["lados_derechos"], dtype=float)
+    c = np.array(datos["coef_objetivo"], dtype=float)
+    maximizar = datos["tipo_operacion"] == "maximizar"
+    holguras = b - A.producto(x)
+    d = c - A.producto_transpuesto(y)
+    basicas = set() if en_base is None else set(en_base)
+
+    nombres = []
+    # En orden inverso al de eliminación: una fila quitada después depende de las fijadas antes
+    for i, tipo, j in reversed(reduccion["eliminadas"]):
+        operador = datos["operadores"][i]
+        activa = abs(holguras[i]) <= 1e-7 * (1 + abs(b[i]))
+        nombre = None
+        if tipo == "singleton" and activa and f"x{j+1}" not in basicas:
+            empuja = d[j] > TOLERANCIA if maximizar else d[j] < -TOLERANCIA
+            precio = d[j] / A[i][j]
+            # Con dos cotas de x_j activas, el costo reducido corresponde a la que tiene el signo correcto
+            signo = precio if maximizar else -precio
+            valido = operador == "=" or (signo >= -TOLERANCIA if operador == "<=" else signo <= TOLERANCIA)
+            if valido and (operador == "=" or x[j] > TOLERANCIA or empuja):
+                nombre = f"x{j+1}"
+                y[i] = precio
+                indices, valores = A.fila(i)
+                d[indices] -= precio * valores
+        if nombre is None:
+            nombre = f"h{i+1}" if operador != "=" else f"a{i+1}"
+        basicas.add(nombre)
+        nombres.append(nombre)
+    return y, nombres
+
+def _sensibilidad_sin_rangos(datos, x, y):
+    # Mismo formato que analisis_sensibilidad, sin los rangos (resultado de CBC)
+    num_vars, num_rest = datos["num_variables"], datos["num_restricciones"]
+    A = matriz_desde_datos(datos["coef_restricciones"], num_rest, num_vars)
+    b = np.array(datos["lados_derechos"], dtype=float)
+    c = np.array(datos["coef_objetivo"], dtype=float)
+    d = c - A.producto_transpuesto(y)
+    actividad = A.producto(x)
+    return {
+        "variables": [{
+            "nombre": f"x{j+1}",
+            "valor": float(x[j]),
+            "coeficiente": float(c[j]),
+            "costo_reducido": 0.0 if abs(d[j]) < TOLERANCIA else float(d[j]),
+            "rango_coeficiente": None
+        } for j in range(num_vars)],
+        "restricciones": [{
+            "restriccion": i + 1,
+            "operador": datos["operadores"][i],
+            "lado_derecho": float(b[i]),
+            "holgura": float(abs(b[i] - actividad[i])),
+            "precio_sombra": float(y[i]) + 0.0,
+            "rango_lado_derecho": None
+        } for i in range(num_rest)]
+    }
@@ -0,0 +1,84 @@
+import contextvars
+import logging
+import os
+import re
+import uuid
+
+# Nivel de registro (PL_LOG_NIVEL: DEBUG, INFO, WARNING, ERROR). Por defecto solo se
+# escriben avisos y errores: en producción no hay una línea por petición
+NIVEL_POR_DEFECTO = "WARNING"
+
+# Cada línea lleva el id de la petición que la originó, también desde los procesos del pool
+FORMATO_REGISTRO = "%(asctime)s %(levelname)s %(name)s [%(id_peticion)s] %(message)s"
+
+# Ids de petición que se aceptan de la cabecera X-Request-ID (el resto se sustituye)
+PATRON_ID_PETICION = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+_id_peticion = contextvars.ContextVar("id_peticion", default="-")
+
+def nuevo_id_peticion(propuesto=None):
+    """
+    Devuelve propuesto si es un id de petición válido (por ejemplo, el de un
+    proxy) o, si no, uno nuevo.
+    """
+    if propuesto and PATRON_ID_PETICION.match(propuesto):
+        return propuesto
+    return uuid.uuid4().hex[:16]
+
+def id_peticion_actual():
+    return _id_peticion.get()
+
+def fijar_id_peticion(id_peticion):
+    """
+    Asocia id_peticion a los mensajes del contexto actual (hilo o tarea).
+    """
+    _id_peticion.set(id_peticion)
+
+def ejecutar_con_id(id_peticion, funcion, *args):
+    """
+    Ejecuta funcion(*args) con id_peticion como id de sus mensajes: las tareas
+    del pool de procesos no heredan el contexto de la petición.
+    """
+    token = _id_peticion.set(id_peticion)
+    try:
+        return funcion(*args)
+    finally:
+        _id_peticion.reset(token)
+
+class FiltroIdPeticion(logging.Filter):
+    """
+    Añade a cada mensaje el id de la petición en curso (id_peticion).
+    """
+
+    def filter(self, registro):
+        registro.id_peticion = _id_peticion.get()
+        return True
+
+def configurar_registro(*nombres, nivel=None):
+    """
+    Configura los registros indicados (por defecto "models"; sus hijos, como
+    "models.grafico", los comparten) para escribir en stderr con el formato
+    FORMATO_REGISTRO. Se puede llamar varias veces: solo se añade un manejador.
+
+    Args:
+        nombres: Nombres de los registros a configurar
+        nivel: Nivel de registro; por defecto, el de PL_LOG_NIVEL o NIVEL_POR_DEFECTO
+
+    Raises:
+        ValueError: Si el nivel no es válido
+    """
+    nivel = (nivel or os.environ.get("PL_LOG_NIVEL") or NIVEL_POR_DEFECTO).upper()
+    if not isinstance(logging.getLevelName(nivel), int):
+        raise ValueError(f"Nivel de registro desconocido: {nivel}")
+
+    for nombre in nombres or ("models",):
+        registro = logging.getLogger(nombre)
+        registro.setLevel(nivel)
+        if not any(isinstance(filtro, FiltroIdPeticion)
+                   for manejador in registro.handlers for filtro in manejador.filters):
+            manejador = logging.StreamHandler()
+            manejador.setFormatter(logging.Formatter(FORMATO_REGISTRO))
+            manejador.addFilter(FiltroIdPeticion())
+            registro.addHandler(manejador)
+        # Con su propio manejador, no se repiten en el del registro raíz
+        registro.propagate = False
@@ -0,0 +1,133 @@
+import numpy as np
+from models.dispersa import matriz_desde_datos
+
+TOLERANCIA = 1e-9
+
+def analisis_sensibilidad(datos, base):
+    """
+    Análisis de sensibilidad de una solución óptima a partir de su base final
+    (ver nombres_base en models/simplex_revisado.py), con los datos originales
+    del modelo en lugar de la tabla final, de modo que sirve para cualquier método.
+
+    Con una solución degenerada los precios sombra no son únicos: se devuelven
+    los de la base final.
+
+    Args:
+        datos: Datos del modelo (ver resolver_modelo_lineal)
+        base: Nombres de las columnas básicas ("x{j}", "h{i}", "a{i}")
+
+    Returns:
+        Diccionario con:
+            - variables: por variable, valor, coeficiente, costo_reducido (c_j - yᵀa_j)
+              y rango_coeficiente, el intervalo en que puede moverse c_j sin que
+              cambie la base óptima
+            - restricciones: por restricción, holgura (o exceso), precio_sombra
+              (variación del objetivo por unidad de lado derecho) y
+              rango_lado_derecho, en el que la base sigue siendo factible
+        Los extremos no acotados son ±inf. None si la base no es válida.
+    """
+    num_vars = datos["num_variables"]
+    num_rest = datos["num_restricciones"]
+    operadores = list(datos["operadores"])
+    A = matriz_desde_datos(datos["coef_restricciones"], num_rest, num_vars).a_densa()
+    b = np.array(datos["lados_derechos"], dtype=float)
+    c = np.array(datos["coef_objetivo"], dtype=float)
+    es_maximizacion = datos["tipo_operacion"] == "maximizar"
+
+    # Columnas con la orientación original de cada fila: holgura +1 en <= y -1 en >=
+    def columna(nombre):
+        tipo, i = nombre[0], int(nombre[1:]) - 1
+        if tipo == "x":
+            return A[:, i], c[i]
+        col = np.zeros(num_rest)
+        col[i] = -1.0 if tipo == "h" and operadores[i] == ">=" else 1.0
+        return col, 0.0
+
+    if len(base) != num_rest:
+        return None
+    columnas_base = [columna(nombre) for nombre in base]
+    B = np.column_stack([col for col, _ in columnas_base]) if num_rest > 0 else np.zeros((0, 0))
+    c_B = np.array([costo for _, costo in columnas_base])
+    try:
+        B_inv = np.linalg.inv(B)
+    except np.linalg.LinAlgError:
+        return None
+
+    x_B = B_inv @ b
+    y = c_B @ B_inv
+
+    # Columnas no básicas que pueden entrar: variables y holguras (las artificiales no)
+    en_base = set(base)
+    no_basicas = [f"x{j+1}" for j in range(num_vars) if f"x{j+1}" not in en_base]
+    no_basicas += [f"h{i+1}" for i, op in enumerate(operadores) if op != "=" and f"h{i+1}" not in en_base]
+    if no_basicas:
+        N = np.column_stack([columna(nombre)[0] for nombre in no_basicas])
+        c_N = np.array([columna(nombre)[1] for nombre in no_basicas])
+    else:
+        N, c_N = np.zeros((num_rest, 0)), np.zeros(0)
+    d_N = c_N - y @ N
+    alfa = B_inv @ N
+
+    # Óptimo: d_N <= 0 al maximizar y >= 0 al minimizar. Cambiar c_j (básica en la
+    # fila r) en δ cambia los costos reducidos a d_N - δ·α_r
+    def rango_basica(fila):
+        alfa_r = alfa[fila]
+        razones = np.divide(d_N, alfa_r, out=np.zeros_like(d_N), where=np.abs(alfa_r) > TOLERANCIA)
+        positivos = alfa_r > TOLERANCIA
+        negativos = alfa_r < -TOLERANCIA
+        if not es_maximizacion:
+            positivos, negativos = negativos, positivos
+        inferior = razones[positivos].max(initial=-np.inf)
+        superior = razones[negativos].min(initial=np.inf)
+        return inferior, superior
+
+    posicion_base = {nombre: k for k, nombre in enumerate(base)}
+    posicion_no_basica = {nombre: k for k, nombre in enumerate(no_basicas)}
+    x = np.zeros(num_vars)
+
+    variables = []
+    for j in range(num_vars):
+        nombre = f"x{j+1}"
+        if nombre in posicion_base:
+            fila = posicion_base[nombre]
+            x[j] = x_B[fila]
+            inferior, superior = rango_basica(fila)
+            costo_reducido = 0.0
+        else:
+            costo_reducido = float(d_N[posicion_no_basica[nombre]])
+            # c_j puede crecer (al maximizar) o bajar (al minimizar) hasta anular su costo reducido
+            inferior, superior = (-np.inf, -costo_reducido) if es_maximizacion else (-costo_reducido, np.inf)
+        variables.append({
+            "nombre": nombre,
+            "valor": _limpiar(x[j]),
+            "coeficiente": float(c[j]),
+            "costo_reducido": _limpiar(costo_reducido),
+            "rango_coeficiente": [float(c[j] + inferior), float(c[j] + superior)]
+        })
+
+    # b_i + Δ mantiene la base factible mientras x_B + Δ·B⁻¹e_i >= 0
+    actividad = A @ x
+    artificiales_base = np.array([nombre[0] == "a" for nombre in base], dtype=bool)
+    restricciones = []
+    for i in range(num_rest):
+        beta = B_inv[:, i]
+        razones = np.divide(-x_B, beta, out=np.zeros_like(x_B), where=np.abs(beta) > TOLERANCIA)
+        inferior = razones[beta > TOLERANCIA].max(initial=-np.inf)
+        superior = razones[beta < -TOLERANCIA].min(initial=np.inf)
+        # Una artificial básica (a nivel 0, fila redundante) no puede dejar de ser 0
+        if np.any(artificiales_base & (np.abs(beta) > TOLERANCIA)):
+            inferior = superior = 0.0
+        restricciones.append({
+            "restriccion": i + 1,
+            "operador": operadores[i],
+            "lado_derecho": float(b[i]),
+            "holgura": _limpiar(abs(b[i] - actividad[i])),
+            "precio_sombra": _limpiar(y[i]),
+            "rango_lado_derecho": [float(b[i] + inferior), float(b[i] + superior)]
+        })
+
+    return {"variables": variables, "restricciones": restricciones}
+
+def _limpiar(valor):
+    # Sin ruido numérico ni -0.0
+    return 0.0 if abs(valor) < TOLERANCIA else float(valor)
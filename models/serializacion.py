@@ -0,0 +1,19 @@
+import math
+import numpy as np
+
+def a_json(valor):
+    """
+    Convierte resultados con tipos NumPy en valores serializables a JSON.
+    Los no finitos (cocientes infinitos, por ejemplo) se devuelven como None.
+    """
+    if isinstance(valor, dict):
+        return {clave: a_json(v) for clave, v in valor.items()}
+    if isinstance(valor, (list, tuple)):
+        return [a_json(v) for v in valor]
+    if isinstance(valor, np.ndarray):
+        return a_json(valor.tolist())
+    if isinstance(valor, np.generic):
+        valor = valor.item()
+    if isinstance(valor, float) and not math.isfinite(valor):
+        return None
+    return valor
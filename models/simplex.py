@@ -1,4 +1,32 @@
+import logging
 import numpy as np
+from models.dispersa import normalizar_coeficientes, tripletas
+from models.simplex_revisado import metodo_simplex_revisado, nombres_base
+from models.sensibilidad import analisis_sensibilidad
+from models.escalado import escalar_modelo, desescalar_resultado
+from models.precios import (validar_regla, nuevo_estado, regla_activa, elegir_entrada,
+                            elegir_salida, registrar_pivote, actualizar_devex)
+from models.limites import (MAX_ITERACIONES_TABLA, validar_limites, leer_limites, limites_restantes,
+                            tiempo_agotado, informar_progreso)
+
+# Tamaño máximo para el que se muestra la traza con tablas completas
+MAX_VARIABLES_TABLA = 50
+MAX_RESTRICCIONES_TABLA = 50
+
+# Modos de traza: tablas en cada operación, una por iteración o solo la inicial
+MODOS_TRAZA = ("completo", "iteraciones", "pivotes")
+
+# Métodos que se pueden pedir con la opción metodo
+METODOS = ("auto", "simplex", "dual", "gran_m", "dos_fases", "revisado")
+
+registro = logging.getLogger(__name__)
+
+# Texto del resultado según cómo terminaron las iteraciones
+TEXTO_ESTADO = {
+    "optimo": "Óptimo",
+    "max_iteraciones": "Número máximo de iteraciones alcanzado",
+    "tiempo": "Tiempo límite alcanzado"
+}
 
 def resolver_simplex_paso_a_paso(datos):
     """
@@ -10,33 +38,128 @@ def resolver_simplex_paso_a_paso(datos):
             - num_restricciones: Número de restricciones
             - coef_objetivo: Lista de coeficientes de la función objetivo
             - tipo_operacion: "maximizar" o "minimizar"
-            - coef_restricciones: Lista de listas con los coeficientes de las restricciones
+            - coef_restricciones: Lista de listas con los coeficientes de las restricciones,
+              o matriz dispersa (ver models/dispersa.py)
             - operadores: Lista con los operadores de las restricciones ("<=", ">=", "=")
             - lados_derechos: Lista con los valores de los lados derechos de las restricciones
+            - metodo: (opcional) "auto" (por defecto), "simplex", "dual", "gran_m", "dos_fases"
+              o "revisado". En modo "auto" se elige según la tabla inicial: Simplex estándar
+              si es factible, dual si es dual factible y Gran M en otro caso
+            - modo_traza: (opcional) qué tablas se guardan en los pasos:
+                "completo" (por defecto) una por operación de fila, "iteraciones" una
+                por iteración, "pivotes" solo la inicial (ver reconstruir_tabla)
+            - regla_precio: (opcional) regla para elegir la variable que entra:
+                "dantzig" (por defecto), "steepest_edge", "devex" o "bland" (ver models/precios.py)
+            - max_iteraciones: (opcional) límite de iteraciones (por defecto 20 en los
+              métodos con tabla y proporcional al tamaño en el revisado)
+            - tiempo_limite: (opcional) segundos; al agotarse se devuelve "Tiempo límite
+              alcanzado" con la mejor base factible hallada (si la hay)
+            - base_inicial: (opcional) "base" de un resultado anterior del mismo modelo con
+              otros lados derechos u objetivo; en modo "auto" se reoptimiza desde ella con
+              el Simplex revisado (ver metodo_simplex_revisado)
+            - escalado: (opcional) "auto" (por defecto) escala filas y columnas si los
+              coeficientes abarcan demasiados órdenes de magnitud, True siempre y False
+              nunca (ver models/escalado.py)
     
     Returns:
         Diccionario con los resultados y pasos del método Simplex:
             - pasos: Lista de pasos con las Tablas intermedias
-            - resultado_final: Resultado final del problema
-            - metodo: "simplex" o "gran_m" según el método utilizado
+            - resultado_final: Resultado final del problema, con el número de
+              iteraciones, la regla de precio, si se pasó a Bland por degeneración
+              y la base final (nombres "x{j}", "h{i}", "a{i}"); decidido_por = "dos_fases"
+              si la Gran M recurrió a la fase 1 de ese método para saber si el problema
+              es factible (ver metodo_gran_m); si es óptimo, también
+              el análisis de sensibilidad (ver models/sensibilidad.py). Si se escaló el
+              modelo, incluye los factores (escalado) y las tablas de los pasos son las
+              del modelo escalado
+            - metodo: "simplex", "dual", "gran_m", "dos_fases" o "revisado" según el método utilizado
+    
+    Raises:
+        ValueError: Si el método, el modo de traza, la regla de precio o los límites no
+            son válidos, o si el método pedido no admite el modelo
     """
-    # Determinar si se necesita el método de la Gran M
-    necesita_gran_m = any(op in [">=", "="] for op in datos["operadores"])
+    datos = normalizar_coeficientes(datos)
+    metodo = datos.get("metodo", "auto")
     
-    if necesita_gran_m:
+    if metodo not in METODOS:
+        raise ValueError(f"Método desconocido: {metodo}")
+    if datos.get("modo_traza", "completo") not in MODOS_TRAZA:
+        raise ValueError(f"Modo de traza desconocido: {datos['modo_traza']}")
+    validar_regla(datos.get("regla_precio", "dantzig"))
+    validar_limites(datos)
+    
+    # Las tolerancias de los métodos son absolutas: se resuelve el modelo escalado y se
+    # devuelven las variables en sus unidades (la base no depende del escalado)
+    escalados, factores = escalar_modelo(datos)
+    resultados = _resolver_con_metodo(escalados, metodo)
+
+    final = resultados["resultado_final"]
+    if factores is not None:
+        desescalar_resultado(final, factores)
+    if final["status_text"] == "Óptimo" and final.get("base") is not None:
+        final["sensibilidad"] = analisis_sensibilidad(datos, final["base"])
+    registro.debug("simplex metodo=%s estado=%s iteraciones=%s escalado=%s pasos=%d",
+                   resultados.get("metodo"), final["status_text"], final.get("iteraciones"),
+                   factores is not None, len(resultados.get("pasos") or []))
+    return resultados
+
+def _resolver_con_metodo(datos, metodo):
+    # Los modelos grandes usan el Simplex revisado (la traza de tablas completas no escala),
+    # igual que las reoptimizaciones desde una base previa (los métodos con tabla parten del origen)
+    if metodo == "revisado" or (metodo == "auto" and (
+            datos["num_variables"] > MAX_VARIABLES_TABLA or datos["num_restricciones"] > MAX_RESTRICCIONES_TABLA
+            or datos.get("base_inicial") is not None)):
+        return metodo_simplex_revisado(datos)
+    if metodo == "simplex":
+        return metodo_simplex_estandar(datos)
+    if metodo == "gran_m":
         return metodo_gran_m(datos)
-    else:
+    if metodo == "dos_fases":
+        return metodo_dos_fases(datos)
+    if metodo == "dual":
+        return metodo_simplex_dual(datos)
+    
+    # Según la factibilidad de la tabla inicial con una holgura por restricción:
+    # primal factible (todas <= con lado derecho no negativo) -> Simplex estándar;
+    # dual factible (sin igualdades ni costos que mejoren el objetivo) -> Simplex dual;
+    # ninguna de las dos -> Gran M
+    necesita_gran_m = any(op in [">=", "="] for op in datos["operadores"]) or \
+        any(b < 0 for b in datos["lados_derechos"])
+    
+    if not necesita_gran_m:
         return metodo_simplex_estandar(datos)
+    if _es_dual_factible(datos):
+        return metodo_simplex_dual(datos)
+    return metodo_gran_m(datos)
+
+def _es_dual_factible(datos):
+    """
+    Si la tabla inicial del Simplex dual (ver metodo_simplex_dual) es dual factible:
+    sin restricciones de igualdad y sin coeficientes del objetivo que lo mejoren
+    (ninguno positivo al maximizar ni negativo al minimizar).
+    """
+    if "=" in datos["operadores"]:
+        return False
+    signo = 1 if datos["tipo_operacion"] == "maximizar" else -1
+    return all(signo * c <= 1e-10 for c in datos["coef_objetivo"])
 
 def metodo_simplex_estandar(datos):
     """
     Aplica el método Simplex estándar para problemas de maximización con restricciones <=
+    
+    Raises:
+        ValueError: Si alguna restricción no es <= o tiene lado derecho negativo (la
+            tabla inicial con las holguras como base no sería factible)
     """
+    if any(op != "<=" for op in datos["operadores"]) or any(b < 0 for b in datos["lados_derechos"]):
+        raise ValueError("El Simplex estándar necesita restricciones <= con lado derecho no negativo: "
+                         "use dual, gran_m o dos_fases")
     num_vars = datos["num_variables"]
     num_rest = datos["num_restricciones"]
-    coef_obj = datos["coef_objetivo"].copy()
-    coef_rest = [row.copy() for row in datos["coef_restricciones"]]
-    lados_derechos = datos["lados_derechos"].copy()
+    coef_obj = list(datos["coef_objetivo"])
+    # Solo los coeficientes no nulos, como tripletas (fila, columna, valor)
+    filas_nz, cols_nz, valores_nz = tripletas(datos["coef_restricciones"], num_rest, num_vars)
+    lados_derechos = list(datos["lados_derechos"])
     tipo_operacion = datos["tipo_operacion"]
     
     # Para minimización, cambiamos el signo de la función objetivo
@@ -59,12 +182,11 @@ def metodo_simplex_estandar(datos):
     for j in range(num_vars):
         Tabla[0, j+1] = -coef_obj[j]  # Coeficientes de X con signo negativo
     
+    # Coeficientes de las variables originales (solo los no nulos)
+    Tabla[filas_nz + 1, cols_nz + 1] = valores_nz
+    
     # Llenar las filas de restricciones
     for i in range(num_rest):
-        # Coeficientes de las variables originales
-        for j in range(num_vars):
-            Tabla[i+1, j+1] = coef_rest[i][j]
-        
         # Variable de holgura (1 en la posición correspondiente)
         Tabla[i+1, num_vars+i+1] = 1
         
@@ -78,96 +200,39 @@ def metodo_simplex_estandar(datos):
     nombres_columnas = ["Z"] + [f"X{j+1}" for j in range(num_vars)] + [f"S{j+1}" for j in range(num_vars_holgura)] + ["Sol"]
     nombres_filas = ["f1"] + [f"f{i+2}" for i in range(num_rest)]
     
-    pasos.append({
+    # La tabla inicial se guarda siempre: a partir de ella se reconstruye cualquier paso
+    modo_traza = datos.get("modo_traza", "completo")
+    tablas = {"Tabla": Tabla}
+    
+    pasos.append(_registrar_tablas({
         "paso": 0,
         "descripcion": "Tabla inicial",
-        "Tabla": Tabla.copy(),
+        "modo_traza": modo_traza,
         "nombres_columnas": nombres_columnas,
         "nombres_filas": nombres_filas
-    })
+    }, tablas, True))
     
-    # Iteraciones del método Simplex
-    iteracion = 1
-    max_iteraciones = 20  # Evitar bucles infinitos
+    # Iteraciones del método Simplex (limitadas para evitar bucles infinitos)
+    limites = leer_limites(datos, MAX_ITERACIONES_TABLA)
+    # Variable básica de cada fila (al inicio, las holguras)
+    base = [None] + [num_vars + i + 1 for i in range(num_rest)]
     
-    while iteracion <= max_iteraciones:
-        # Verificar si ya se alcanzó la solución óptima 
-        # Para maximización: todos los coeficientes deben ser >= 0
-        # Para minimización: como invertimos los signos, la condición es la misma
-        if all(Tabla[0, 1:num_vars+num_vars_holgura+1] >= 0):
-            break
-        
-        # Encontrar la columna pivote:
-        # Para maximización: el valor más negativo en la fila objetivo
-        # Para minimización: como invertimos los signos, la lógica es la misma
-        col_pivote = np.argmin(Tabla[0, 1:num_vars+num_vars_holgura+1]) + 1
-        
-        # Calcular los cocientes para identificar la fila pivote
-        cocientes = []
-        for i in range(1, num_filas):
-            if Tabla[i, col_pivote] <= 0:
-                cocientes.append(float('inf'))
-            else:
-                cocientes.append(Tabla[i, -1] / Tabla[i, col_pivote])
-        
-        if all(c == float('inf') for c in cocientes):
-            return {
-                "pasos": pasos,
-                "metodo": "simplex",
-                "resultado_final": {
-                    "status_text": "Problema no acotado",
-                    "valor_objetivo": None,
-                    "variables": None
-                }
-            }
-        
-        # Encontrar la fila pivote (el menor cociente positivo)
-        fila_pivote = cocientes.index(min(cocientes)) + 1
-        
-        # Registrar la selección de pivote
-        pasos.append({
-            "paso": iteracion,
-            "descripcion": f"Selección de pivote",
-            "columna_pivote": col_pivote,
-            "columna_pivote_nombre": nombres_columnas[col_pivote],
-            "fila_pivote": fila_pivote,
-            "fila_pivote_nombre": nombres_filas[fila_pivote-1],
-            "valor_pivote": Tabla[fila_pivote, col_pivote],
-            "cocientes": cocientes
-        })
-        
-        # Normalizar la fila pivote
-        valor_pivote = Tabla[fila_pivote, col_pivote]
-        Tabla[fila_pivote] = Tabla[fila_pivote] / valor_pivote
-        
-        # Registrar la normalización
-        pasos.append({
-            "paso": iteracion,
-            "descripcion": f"Normalización de la fila pivote",
-            "operacion": f"{nombres_filas[fila_pivote-1]} = {nombres_filas[fila_pivote-1]} / {valor_pivote:.4f}",
-            "Tabla": Tabla.copy(),
-            "nombres_columnas": nombres_columnas,
-            "nombres_filas": nombres_filas
-        })
-        
-        # Hacer ceros en la columna pivote
-        for i in range(num_filas):
-            if i != fila_pivote:
-                factor = Tabla[i, col_pivote]
-                Tabla[i] = Tabla[i] - factor * Tabla[fila_pivote]
-                
-                # Registrar cada operación de fila
-                if abs(factor) > 1e-10:  # Solo registrar si el factor no es prácticamente cero
-                    pasos.append({
-                        "paso": iteracion,
-                        "descripcion": "Operación de fila",
-                        "operacion": f"{nombres_filas[i]} = {nombres_filas[i]} - {factor:.4f} * {nombres_filas[fila_pivote-1]}",
-                        "Tabla": Tabla.copy(),
-                        "nombres_columnas": nombres_columnas,
-                        "nombres_filas": nombres_filas
-                    })
-        
-        iteracion += 1
+    precio = nuevo_estado(datos.get("regla_precio", "dantzig"), num_cols)
+    
+    # Para minimización, como invertimos los signos, el criterio es el mismo que para maximización
+    estado, iteracion = _iterar_tabla(tablas, pasos, np.arange(1, num_vars + num_vars_holgura + 1),
+                                      base, 1, limites, modo_traza, precio)
+    
+    if estado == "no_acotado":
+        return {
+            "pasos": pasos,
+            "metodo": "simplex",
+            "resultado_final": _resumen_iteraciones({
+                "status_text": "Problema no acotado",
+                "valor_objetivo": None,
+                "variables": None
+            }, iteracion, precio)
+        }
     
     # Extraer la solución final
     # Identificar variables básicas (columnas con exactamente un 1 y el resto ceros)
@@ -176,9 +241,11 @@ def metodo_simplex_estandar(datos):
     
     for j in range(1, num_vars + num_vars_holgura + 1):
         col = Tabla[:, j]
-        if (col == 1).sum() == 1 and (col == 0).sum() == num_filas - 1:
+        # (el 1 en la fila objetivo es un costo reducido, no una variable básica)
+        if (np.abs(col - 1) < 1e-10).sum() == 1 and (np.abs(col) < 1e-10).sum() == num_filas - 1 \
+                and abs(col[0] - 1) >= 1e-10:
             # Es una variable básica
-            fila = np.where(col == 1)[0][0]
+            fila = np.where(np.abs(col - 1) < 1e-10)[0][0]
             variables_basicas.append(j)
             valores_basicos.append(Tabla[fila, -1])
         else:
@@ -187,7 +254,7 @@ def metodo_simplex_estandar(datos):
     
     # Preparar el resultado final
     resultado = {
-        "status_text": "Óptimo" if iteracion <= max_iteraciones else "Número máximo de iteraciones alcanzado",
+        "status_text": TEXTO_ESTADO[estado],
         "valor_objetivo": Tabla[0, -1] if not es_minimizacion else -Tabla[0, -1],
         "variables": []
     }
@@ -206,22 +273,30 @@ def metodo_simplex_estandar(datos):
             "valor": valor
         })
     
+    # Base final con nombres independientes del método (para arrancar en caliente)
+    resultado["base"] = nombres_base([j - 1 for j in base[1:]], num_vars, ["<="] * num_rest)
+    
     return {
         "pasos": pasos,
         "metodo": "simplex",
-        "resultado_final": resultado
+        "resultado_final": _resumen_iteraciones(resultado, iteracion, precio)
     }
 
 def metodo_gran_m(datos):
     """
-    Aplica el método de la Gran M para problemas con restricciones mixtas
+    Aplica el método de la Gran M para problemas con restricciones mixtas.
+    
+    Si la columna que entra no tiene cocientes finitos mientras quedan variables
+    artificiales positivas, decide el estado la fase 1 del método de las dos fases,
+    con el presupuesto de iteraciones y tiempo que quede (ver decidido_por).
     """
     num_vars = datos["num_variables"]
     num_rest = datos["num_restricciones"]
-    coef_obj = datos["coef_objetivo"].copy()
-    coef_rest = [row.copy() for row in datos["coef_restricciones"]]
-    operadores = datos["operadores"].copy()
-    lados_derechos = datos["lados_derechos"].copy()
+    coef_obj = list(datos["coef_objetivo"])
+    # Solo los coeficientes no nulos, como tripletas (fila, columna, valor)
+    filas_nz, cols_nz, valores_nz = tripletas(datos["coef_restricciones"], num_rest, num_vars)
+    operadores = list(datos["operadores"])
+    lados_derechos = list(datos["lados_derechos"])
     tipo_operacion = datos["tipo_operacion"]
     
     # Para minimización, cambiamos el signo de la función objetivo
@@ -230,10 +305,11 @@ def metodo_gran_m(datos):
         coef_obj = [-c for c in coef_obj]
     
     # Asegurarse de que todos los lados derechos sean no negativos
+    signos_filas = np.where(np.array(lados_derechos, dtype=float) < 0, -1.0, 1.0)
+    valores_nz = valores_nz * signos_filas[filas_nz]
     for i in range(num_rest):
         if lados_derechos[i] < 0:
             lados_derechos[i] *= -1
-            coef_rest[i] = [-c for c in coef_rest[i]]
             if operadores[i] == "<=":
                 operadores[i] = ">="
             elif operadores[i] == ">=":
@@ -279,16 +355,16 @@ def metodo_gran_m(datos):
     for i, vars_lista in enumerate(vars_adicionales):
         for tipo, idx in vars_lista:
             if tipo == 'a':  # Variable artificial
-                # Para maximización y minimización (como ya invertimos la FO), siempre restamos M
+                # Para maximización y minimización (como ya invertimos la FO), siempre restamos M*R,
+                # que en la fila Z - c·x = 0 aparece con signo positivo
                 col_idx = 1 + num_vars + num_vars_holgura + idx
-                Tabla_M[0, col_idx] = -1  # -M
+                Tabla_M[0, col_idx] = 1  # +M
+    
+    # Coeficientes de las variables originales (solo los no nulos)
+    Tabla_numerico[filas_nz + 1, cols_nz + 1] = valores_nz
     
     # Llenar las filas de restricciones
     for i in range(num_rest):
-        # Coeficientes de las variables originales
-        for j in range(num_vars):
-            Tabla_numerico[i+1, j+1] = coef_rest[i][j]
-        
         # Variables adicionales
         for tipo, idx in vars_adicionales[i]:
             if tipo == 'h':  # Variable de holgura
@@ -302,6 +378,12 @@ def metodo_gran_m(datos):
         # Lado derecho
         Tabla_numerico[i+1, -1] = lados_derechos[i]
     
+    # Variable básica de cada fila: la holgura en las <= y la artificial en el resto
+    base = [None]
+    for vars_lista in vars_adicionales:
+        tipo, idx = vars_lista[-1]
+        base.append(1 + num_vars + idx if tipo == 'h' else 1 + num_vars + num_vars_holgura + idx)
+    
     # Crear nombres para las columnas y filas
     nombres_columnas = ["Z"] + [f"X{j+1}" for j in range(num_vars)]
     nombres_columnas += [f"S{j+1}" for j in range(num_vars_holgura)]
@@ -313,36 +395,18 @@ def metodo_gran_m(datos):
     # Lista para almacenar cada paso
     pasos = []
     
-    # Combinar los coeficientes numéricos con los simbólicos M para mostrar
-    Tabla_combinado = {}
-    for i in range(num_filas):
-        for j in range(num_cols):
-            if i not in Tabla_combinado:
-                Tabla_combinado[i] = {}
-            
-            if Tabla_M[i][j] != 0:
-                Tabla_combinado[i][j] = {
-                    "numerico": Tabla_numerico[i][j],
-                    "simbolico": Tabla_M[i][j],
-                    "tiene_M": True
-                }
-            else:
-                Tabla_combinado[i][j] = {
-                    "numerico": Tabla_numerico[i][j],
-                    "simbolico": 0,
-                    "tiene_M": False
-                }
+    # La tabla inicial se guarda siempre: a partir de ella se reconstruye cualquier paso
+    modo_traza = datos.get("modo_traza", "completo")
+    tablas = {"Tabla_numerico": Tabla_numerico, "Tabla_M": Tabla_M}
     
     # Añadir Tabla inicial
-    pasos.append({
+    pasos.append(_registrar_tablas({
         "paso": 0,
         "descripcion": "Tabla inicial",
-        "Tabla_numerico": Tabla_numerico.copy(),
-        "Tabla_M": Tabla_M.copy(),
-        "Tabla_combinado": Tabla_combinado.copy(),
+        "modo_traza": modo_traza,
         "nombres_columnas": nombres_columnas,
         "nombres_filas": nombres_filas
-    })
+    }, tablas, True))
     
     # Si hay variables artificiales, hay que hacer ceros en la fila objetivo
     if num_vars_artificiales > 0:
@@ -353,107 +417,68 @@ def metodo_gran_m(datos):
                     col_idx = 1 + num_vars + num_vars_holgura + idx
                     if Tabla_M[0, col_idx] != 0:  # Si tiene coeficiente M
                         # Multiplicar la fila de restricción por el coeficiente de M y restar de la F.O.
-                        m_coef = Tabla_M[0, col_idx]  # Coeficiente de M (normalmente -1)
-                        
-                        # Actualizar coeficientes numéricos
-                        Tabla_numerico[0] = Tabla_numerico[0] - m_coef * Tabla_numerico[i+1]
-                        
-                        # Actualizar coeficientes simbólicos M
-                        Tabla_M[0] = Tabla_M[0] - m_coef * Tabla_M[i+1]
-                        
-                        # Actualizar Tabla combinado
-                        nuevo_combinado = {}
-                        for ii in range(num_filas):
-                            for jj in range(num_cols):
-                                if ii not in nuevo_combinado:
-                                    nuevo_combinado[ii] = {}
-                                
-                                if Tabla_M[ii][jj] != 0:
-                                    nuevo_combinado[ii][jj] = {
-                                        "numerico": Tabla_numerico[ii][jj],
-                                        "simbolico": Tabla_M[ii][jj],
-                                        "tiene_M": True
-                                    }
-                                else:
-                                    nuevo_combinado[ii][jj] = {
-                                        "numerico": Tabla_numerico[ii][jj],
-                                        "simbolico": 0,
-                                        "tiene_M": False
-                                    }
+                        m_coef = Tabla_M[0, col_idx]  # Coeficiente de M (normalmente 1)
+                        _ajustar_fila_objetivo(tablas, i+1, m_coef)
                         
                         # Registrar la operación
-                        pasos.append({
+                        pasos.append(_registrar_tablas({
                             "paso": 0,
                             "descripcion": "Ajuste de fila objetivo para variables artificiales",
                             "operacion": f"{nombres_filas[0]} = {nombres_filas[0]} - {m_coef:.0f}M * {nombres_filas[i+1]}",
-                            "Tabla_numerico": Tabla_numerico.copy(),
-                            "Tabla_M": Tabla_M.copy(),
-                            "Tabla_combinado": nuevo_combinado,
+                            "fila": i+1,
+                            "factor_M": m_coef,
                             "nombres_columnas": nombres_columnas,
                             "nombres_filas": nombres_filas
-                        })
+                        }, tablas, modo_traza == "completo"))
+    
+        if modo_traza == "iteraciones":
+            _registrar_tablas(pasos[-1], tablas, True)
     
-    # Iteraciones del método Simplex
+    # Iteraciones del método Simplex (limitadas para evitar bucles infinitos)
     iteracion = 1
-    max_iteraciones = 20  # Evitar bucles infinitos
+    limites = leer_limites(datos, MAX_ITERACIONES_TABLA)
+    estado = "max_iteraciones"
+    no_acotado = False
+    precio = nuevo_estado(datos.get("regla_precio", "dantzig"), num_cols)
+    columnas = np.arange(1, num_cols - 1)
     
-    while iteracion <= max_iteraciones:
-        # Verificar si ya se alcanzó la solución óptima
-        # Para el criterio de optimalidad, primero verificamos los coeficientes con M
-        hay_negativos_M = any(Tabla_M[0, j] < 0 for j in range(1, num_cols-1))
+    while iteracion <= limites["max_iteraciones"]:
+        if tiempo_agotado(limites):
+            estado = "tiempo"
+            break
         
-        # Si no hay coeficientes M negativos, verificamos los numéricos
-        if not hay_negativos_M:
-            if all(Tabla_numerico[0, j] >= 0 for j in range(1, num_cols-1)):
-                break
+        # El valor solo tiene sentido cuando ya no quedan términos en M
+        informar_progreso(limites, iteracion,
+                          Tabla_numerico[0, -1] if abs(Tabla_M[0, -1]) <= 1e-10 else None)
         
         # Encontrar la columna pivote
         # Prioridad a los coeficientes con M negativos, luego a los numéricos
-        col_pivote = 0
-        valor_minimo = 0
-        
-        for j in range(1, num_cols-1):
-            # Si el coeficiente M es negativo, es mayor prioridad
-            if Tabla_M[0, j] < 0:
-                if Tabla_M[0, j] < valor_minimo:
-                    valor_minimo = Tabla_M[0, j]
-                    col_pivote = j
-            # Si no hay M negativos o están empatados, usamos los numéricos
-            elif Tabla_M[0, j] == 0 and Tabla_numerico[0, j] < 0:
-                if col_pivote == 0 or Tabla_numerico[0, j] < Tabla_numerico[0, col_pivote]:
-                    col_pivote = j
-        
-        # Si no se encontró columna pivote, verificar si es por error numérico
-        if col_pivote == 0:
+        col_pivote = _columna_entrada(tablas, columnas, precio)
+        
+        # Sin candidatas ya se alcanzó la solución óptima
+        if col_pivote is None:
+            estado = "optimo"
             break
         
         # Calcular los cocientes para identificar la fila pivote
-        cocientes = []
-        for i in range(1, num_filas):
-            if Tabla_numerico[i, col_pivote] <= 0:
-                cocientes.append(float('inf'))
-            else:
-                cocientes.append(Tabla_numerico[i, -1] / Tabla_numerico[i, col_pivote])
+        cocientes = _cocientes(Tabla_numerico, col_pivote)
         
-        if all(c == float('inf') for c in cocientes):
-            return {
-                "pasos": pasos,
-                "metodo": "gran_m",
-                "resultado_final": {
-                    "status_text": "Problema no acotado",
-                    "valor_objetivo": None,
-                    "variables": None
-                }
-            }
+        if not np.isfinite(cocientes).any():
+            # Solo es no acotado si no quedan artificiales positivas (se comprueba abajo)
+            no_acotado = True
+            estado = "optimo"
+            break
         
         # Encontrar la fila pivote (el menor cociente positivo)
-        fila_pivote = cocientes.index(min(cocientes)) + 1
+        fila_pivote = elegir_salida(cocientes, base[1:], regla_activa(precio)) + 1
+        _actualizar_precio(tablas, precio, fila_pivote, col_pivote, base[fila_pivote], cocientes[fila_pivote-1])
+        base[fila_pivote] = col_pivote
         
         # Valor pivote (siempre es numérico, no tiene M)
         valor_pivote = Tabla_numerico[fila_pivote, col_pivote]
         
         # Registrar la selección de pivote
-        pasos.append({
+        pasos.append(_registrar_tablas({
             "paso": iteracion,
             "descripcion": f"Selección de pivote",
             "columna_pivote": col_pivote,
@@ -461,125 +486,119 @@ def metodo_gran_m(datos):
             "fila_pivote": fila_pivote,
             "fila_pivote_nombre": nombres_filas[fila_pivote-1],
             "valor_pivote": valor_pivote,
-            "cocientes": cocientes,
-            "Tabla_numerico": Tabla_numerico.copy(),
-            "Tabla_M": Tabla_M.copy(),
+            "cocientes": cocientes.tolist(),
             "nombres_columnas": nombres_columnas,
             "nombres_filas": nombres_filas
-        })
+        }, tablas, modo_traza == "completo"))
         
         # Normalizar la fila pivote
-        Tabla_numerico[fila_pivote] = Tabla_numerico[fila_pivote] / valor_pivote
-        Tabla_M[fila_pivote] = Tabla_M[fila_pivote] / valor_pivote
-        
-        # Actualizar Tabla combinado
-        nuevo_combinado = {}
-        for i in range(num_filas):
-            for j in range(num_cols):
-                if i not in nuevo_combinado:
-                    nuevo_combinado[i] = {}
-                
-                if Tabla_M[i][j] != 0:
-                    nuevo_combinado[i][j] = {
-                        "numerico": Tabla_numerico[i][j],
-                        "simbolico": Tabla_M[i][j],
-                        "tiene_M": True
-                    }
-                else:
-                    nuevo_combinado[i][j] = {
-                        "numerico": Tabla_numerico[i][j],
-                        "simbolico": 0,
-                        "tiene_M": False
-                    }
+        _normalizar_fila(tablas, fila_pivote, col_pivote)
         
         # Registrar la normalización
-        pasos.append({
+        pasos.append(_registrar_tablas({
             "paso": iteracion,
             "descripcion": f"Normalización de la fila pivote",
             "operacion": f"{nombres_filas[fila_pivote-1]} = {nombres_filas[fila_pivote-1]} / {valor_pivote:.4f}",
-            "Tabla_numerico": Tabla_numerico.copy(),
-            "Tabla_M": Tabla_M.copy(),
-            "Tabla_combinado": nuevo_combinado,
+            "fila_pivote": fila_pivote,
+            "columna_pivote": col_pivote,
             "nombres_columnas": nombres_columnas,
             "nombres_filas": nombres_filas
-        })
+        }, tablas, modo_traza == "completo"))
         
-        # Hacer ceros en la columna pivote
-        for i in range(num_filas):
-            if i != fila_pivote:
-                # Factor numérico
-                factor_numerico = Tabla_numerico[i, col_pivote]
-                # Factor para términos con M
-                factor_M = Tabla_M[i, col_pivote]
-                
-                # Ajustar coeficientes numéricos
-                Tabla_numerico[i] = Tabla_numerico[i] - factor_numerico * Tabla_numerico[fila_pivote]
-                # Ajustar coeficientes con M
-                Tabla_M[i] = Tabla_M[i] - factor_M * Tabla_M[fila_pivote] - factor_numerico * Tabla_M[fila_pivote]
-                
-                # Actualizar Tabla combinado
-                nuevo_combinado = {}
-                for ii in range(num_filas):
-                    for jj in range(num_cols):
-                        if ii not in nuevo_combinado:
-                            nuevo_combinado[ii] = {}
-                        
-                        if Tabla_M[ii][jj] != 0:
-                            nuevo_combinado[ii][jj] = {
-                                "numerico": Tabla_numerico[ii][jj],
-                                "simbolico": Tabla_M[ii][jj],
-                                "tiene_M": True
-                            }
-                        else:
-                            nuevo_combinado[ii][jj] = {
-                                "numerico": Tabla_numerico[ii][jj],
-                                "simbolico": 0,
-                                "tiene_M": False
-                            }
-                
-                # Determinar la operación a mostrar
-                if abs(factor_numerico) > 1e-10 or abs(factor_M) > 1e-10:
-                    operacion = f"{nombres_filas[i]} = {nombres_filas[i]}"
-                    if abs(factor_numerico) > 1e-10:
-                        operacion += f" - {factor_numerico:.4f} * {nombres_filas[fila_pivote-1]}"
-                    if abs(factor_M) > 1e-10:
-                        if abs(factor_numerico) > 1e-10:
-                            operacion += " -"
-                        else:
-                            operacion += " -"
-                        operacion += f" {abs(factor_M):.0f}M * {nombres_filas[fila_pivote-1]}"
-                    
-                    # Registrar cada operación de fila
-                    pasos.append({
-                        "paso": iteracion,
-                        "descripcion": "Operación de fila",
-                        "operacion": operacion,
-                        "Tabla_numerico": Tabla_numerico.copy(),
-                        "Tabla_M": Tabla_M.copy(),
-                        "Tabla_combinado": nuevo_combinado,
-                        "nombres_columnas": nombres_columnas,
-                        "nombres_filas": nombres_filas
-                    })
+        # Hacer ceros en la columna pivote (una actualización de rango 1 para todas las filas)
+        intermedias = _copiar_tablas(tablas) if modo_traza == "completo" else None
+        factores_numericos, factores_M = _eliminar_columna(tablas, fila_pivote, col_pivote)
+        ultima = -1
+        
+        for i in np.nonzero((np.abs(factores_numericos) > 1e-10) | (np.abs(factores_M) > 1e-10))[0]:
+            factor_numerico, factor_M = float(factores_numericos[i]), float(factores_M[i])
+            if intermedias is not None:
+                # Tabla tal y como queda tras operar la fila i (las siguientes aún sin operar)
+                _copiar_filas(intermedias, tablas, ultima + 1, i + 1)
+                ultima = i
+            
+            # Determinar la operación a mostrar
+            operacion = f"{nombres_filas[i]} = {nombres_filas[i]}"
+            if abs(factor_numerico) > 1e-10:
+                operacion += f" - {factor_numerico:.4f} * {nombres_filas[fila_pivote-1]}"
+            if abs(factor_M) > 1e-10:
+                operacion += f" - {abs(factor_M):.0f}M * {nombres_filas[fila_pivote-1]}"
+            
+            # Registrar cada operación de fila
+            pasos.append(_registrar_tablas({
+                "paso": iteracion,
+                "descripcion": "Operación de fila",
+                "operacion": operacion,
+                "fila": int(i),
+                "fila_pivote": fila_pivote,
+                "columna_pivote": col_pivote,
+                "factor": factor_numerico,
+                "factor_M": factor_M,
+                "nombres_columnas": nombres_columnas,
+                "nombres_filas": nombres_filas
+            }, intermedias, intermedias is not None))
+        
+        # En modo "iteraciones" solo se guarda la tabla al final de cada iteración
+        if modo_traza == "iteraciones":
+            _registrar_tablas(pasos[-1], tablas, True)
         
         iteracion += 1
     
-    # Verificar si hay variables artificiales en la base
-    for j in range(1 + num_vars + num_vars_holgura, 1 + num_vars + num_vars_holgura + num_vars_artificiales):
-        col_num = Tabla_numerico[:, j]
-        col_M = Tabla_M[:, j]
-        
-        for i in range(1, num_filas):
-            # Si hay un valor significativo en una variable artificial y el lado derecho no es cero
-            if (abs(col_num[i]) > 1e-10 or abs(col_M[i]) > 1e-10) and abs(Tabla_numerico[i, -1]) > 1e-10:
-                return {
-                    "pasos": pasos,
-                    "metodo": "gran_m",
-                    "resultado_final": {
-                        "status_text": "Problema sin solución factible",
-                        "valor_objetivo": None,
-                        "variables": None
-                    }
-                }
+    col_artificiales = 1 + num_vars + num_vars_holgura
+    artificiales_positivas = any(base[i] >= col_artificiales and Tabla_numerico[i, -1] > 1e-10
+                                 for i in range(1, num_rest + 1))
+
+    # Una columna de entrada sin fila que la bloquee con artificiales aún positivas no
+    # reduce la infeasibilidad: es una dirección de mejora del problema original, que
+    # no está acotado si es factible y no tiene solución si no lo es. Lo decide la fase 1
+    if no_acotado and artificiales_positivas:
+        pasos.append(_registrar_tablas({
+            "paso": iteracion,
+            "descripcion": "Comprobación de factibilidad",
+            "operacion": f"{nombres_columnas[col_pivote]} no tiene cocientes finitos con variables artificiales "
+                         "positivas: la fase 1 del método de dos fases decide si el problema es factible",
+            "columna_pivote": col_pivote,
+            "columna_pivote_nombre": nombres_columnas[col_pivote],
+            "nombres_columnas": nombres_columnas,
+            "nombres_filas": nombres_filas
+        }, tablas, modo_traza != "pivotes"))
+        # Con lo que queda del presupuesto de iteraciones y tiempo; sus pasos no se añaden
+        # a la traza (son tablas de otro método), pero el resultado indica quién lo decidió
+        resultado = metodo_dos_fases(dict(datos, modo_traza="pivotes",
+                                          **limites_restantes(limites, iteracion - 1)))["resultado_final"]
+        resultado["iteraciones"] += iteracion - 1
+        resultado["cambio_a_bland"] = resultado["cambio_a_bland"] or precio["cambio_a_bland"]
+        resultado["decidido_por"] = "dos_fases"
+        return {
+            "pasos": pasos,
+            "metodo": "gran_m",
+            "resultado_final": resultado
+        }
+
+    # Verificar si hay variables artificiales básicas que conservan un valor positivo
+    for i in range(1, num_rest + 1):
+        if base[i] >= col_artificiales and Tabla_numerico[i, -1] > 1e-10:
+            # Si las iteraciones no terminaron, la base actual simplemente aún no es factible
+            return {
+                "pasos": pasos,
+                "metodo": "gran_m",
+                "resultado_final": _resumen_iteraciones({
+                    "status_text": "Problema sin solución factible" if estado == "optimo" else TEXTO_ESTADO[estado],
+                    "valor_objetivo": None,
+                    "variables": None
+                }, iteracion, precio)
+            }
+    
+    if no_acotado:
+        return {
+            "pasos": pasos,
+            "metodo": "gran_m",
+            "resultado_final": _resumen_iteraciones({
+                "status_text": "Problema no acotado",
+                "valor_objetivo": None,
+                "variables": None
+            }, iteracion, precio)
+        }
     
     # Extraer la solución final
     # Identificar variables básicas (columnas con exactamente un 1 y el resto ceros)
@@ -593,7 +612,7 @@ def metodo_gran_m(datos):
         es_basica = False
         fila_uno = -1
         
-        for i in range(num_filas):
+        for i in range(1, num_filas):
             if abs(col_num[i] - 1) < 1e-10 and abs(col_M[i]) < 1e-10:
                 # Verificar si el resto de la columna es cero
                 es_cero_resto = True
@@ -616,7 +635,7 @@ def metodo_gran_m(datos):
     
     # Preparar el resultado final
     resultado = {
-        "status_text": "Óptimo" if iteracion <= max_iteraciones else "Número máximo de iteraciones alcanzado",
+        "status_text": TEXTO_ESTADO[estado],
         "valor_objetivo": Tabla_numerico[0, -1] if not es_minimizacion else -Tabla_numerico[0, -1],
         "variables": []
     }
@@ -635,8 +654,721 @@ def metodo_gran_m(datos):
             "valor": valor
         })
     
+    # Base final con nombres independientes del método (para arrancar en caliente)
+    resultado["base"] = nombres_base([j - 1 for j in base[1:]], num_vars, operadores)
+    
     return {
         "pasos": pasos,
         "metodo": "gran_m",
-        "resultado_final": resultado
+        "resultado_final": _resumen_iteraciones(resultado, iteracion, precio)
     }
+
+def metodo_dos_fases(datos):
+    """
+    Aplica el método de las dos fases para problemas con restricciones mixtas.
+    
+    La fase 1 minimiza la suma de las variables artificiales; si llega a cero,
+    la fase 2 optimiza la función objetivo original partiendo de la base
+    factible encontrada. A diferencia de la Gran M, toda la aritmética se hace
+    sobre una sola tabla numérica, sin coeficientes simbólicos.
+    """
+    num_vars = datos["num_variables"]
+    num_rest = datos["num_restricciones"]
+    coef_obj = np.array(datos["coef_objetivo"], dtype=float)
+    # Solo los coeficientes no nulos, como tripletas (fila, columna, valor)
+    filas_nz, cols_nz, valores_nz = tripletas(datos["coef_restricciones"], num_rest, num_vars)
+    operadores = list(datos["operadores"])
+    lados_derechos = np.array(datos["lados_derechos"], dtype=float)
+    
+    # Para minimización, cambiamos el signo de la función objetivo
+    es_minimizacion = datos["tipo_operacion"] == "minimizar"
+    if es_minimizacion:
+        coef_obj = -coef_obj
+    
+    # Asegurarse de que todos los lados derechos sean no negativos
+    signos_filas = np.where(lados_derechos < 0, -1.0, 1.0)
+    valores_nz = valores_nz * signos_filas[filas_nz]
+    lados_derechos = np.abs(lados_derechos)
+    invertir = {"<=": ">=", ">=": "<=", "=": "="}
+    operadores = [invertir[op] if signo < 0 else op for op, signo in zip(operadores, signos_filas)]
+    
+    # Contar variables adicionales necesarias
+    num_vars_holgura = sum(1 for op in operadores if op in ["<=", ">="])
+    num_vars_artificiales = sum(1 for op in operadores if op in [">=", "="])
+    
+    # Columnas: Z, X1...Xn, S1...Sm, R1...Rk, Sol
+    num_cols = 1 + num_vars + num_vars_holgura + num_vars_artificiales + 1
+    num_filas = 1 + num_rest
+    col_artificiales = 1 + num_vars + num_vars_holgura  # Primera columna artificial
+    
+    Tabla = np.zeros((num_filas, num_cols))
+    Tabla[0, 0] = 1  # Coeficiente de Z
+    
+    # Coeficientes de las variables originales (solo los no nulos)
+    Tabla[filas_nz + 1, cols_nz + 1] = valores_nz
+    
+    # Holguras, artificiales y variable básica inicial de cada fila
+    base = [None] * num_filas
+    idx_holgura = 0
+    idx_artificial = 0
+    for i, op in enumerate(operadores):
+        if op in ["<=", ">="]:
+            col_idx = 1 + num_vars + idx_holgura
+            # Si es <=, se suma; si es >=, se resta
+            Tabla[i+1, col_idx] = 1 if op == "<=" else -1
+            base[i+1] = col_idx
+            idx_holgura += 1
+        if op in [">=", "="]:
+            col_idx = col_artificiales + idx_artificial
+            Tabla[i+1, col_idx] = 1
+            base[i+1] = col_idx
+            idx_artificial += 1
+        
+        # Lado derecho
+        Tabla[i+1, -1] = lados_derechos[i]
+    
+    # Fila objetivo de la fase 2: Z - c·x = 0
+    fila_fase2 = np.zeros(num_cols)
+    fila_fase2[0] = 1
+    fila_fase2[1:num_vars+1] = -coef_obj
+    
+    # Fila objetivo de la fase 1: maximizar -ΣR, es decir, Z + ΣR = 0
+    if num_vars_artificiales > 0:
+        Tabla[0, col_artificiales:-1] = 1
+    else:
+        Tabla[0] = fila_fase2
+    
+    nombres_columnas = ["Z"] + [f"X{j+1}" for j in range(num_vars)]
+    nombres_columnas += [f"S{j+1}" for j in range(num_vars_holgura)]
+    nombres_columnas += [f"R{j+1}" for j in range(num_vars_artificiales)]
+    nombres_columnas += ["Sol"]
+    nombres_filas = ["f1"] + [f"f{i+2}" for i in range(num_rest)]
+    
+    # La tabla inicial se guarda siempre: a partir de ella se reconstruye cualquier paso
+    modo_traza = datos.get("modo_traza", "completo")
+    tablas = {"Tabla": Tabla}
+    pasos = []
+    
+    pasos.append(_registrar_tablas({
+        "paso": 0,
+        "descripcion": "Tabla inicial",
+        "modo_traza": modo_traza,
+        "fase": 1 if num_vars_artificiales > 0 else 2,
+        "nombres_columnas": nombres_columnas,
+        "nombres_filas": nombres_filas
+    }, tablas, True))
+    
+    limites = leer_limites(datos, MAX_ITERACIONES_TABLA)  # Evitar bucles infinitos
+    iteracion = 1
+    # La regla de precio (y sus pesos) se mantiene de una fase a la siguiente
+    precio = nuevo_estado(datos.get("regla_precio", "dantzig"), num_cols)
+    
+    def resultado_sin_solucion(status_text, iteracion):
+        return {
+            "pasos": pasos,
+            "metodo": "dos_fases",
+            "resultado_final": _resumen_iteraciones({
+                "status_text": status_text,
+                "valor_objetivo": None,
+                "variables": None
+            }, iteracion, precio)
+        }
+    
+    if num_vars_artificiales > 0:
+        # Hacer ceros en la fila objetivo bajo las artificiales básicas
+        for i in range(1, num_filas):
+            if base[i] >= col_artificiales:
+                _ajustar_fila_objetivo(tablas, i, 1.0)
+                pasos.append(_registrar_tablas({
+                    "paso": 0,
+                    "descripcion": "Ajuste de fila objetivo para variables artificiales",
+                    "operacion": f"{nombres_filas[0]} = {nombres_filas[0]} - {nombres_filas[i]}",
+                    "fila": i,
+                    "factor": 1.0,
+                    "nombres_columnas": nombres_columnas,
+                    "nombres_filas": nombres_filas
+                }, tablas, modo_traza == "completo"))
+        
+        if modo_traza == "iteraciones":
+            _registrar_tablas(pasos[-1], tablas, True)
+        
+        # Fase 1: cualquier columna puede entrar a la base
+        estado, iteracion = _iterar_tabla(tablas, pasos, np.arange(1, num_cols - 1),
+                                          base, iteracion, limites, modo_traza, precio, fase=1)
+        # Sin terminar la fase 1 aún no hay una base factible que devolver
+        if estado in ["max_iteraciones", "tiempo"]:
+            return resultado_sin_solucion(TEXTO_ESTADO[estado], iteracion)
+        
+        # En el óptimo de la fase 1, Sol de la fila objetivo vale -ΣR
+        if Tabla[0, -1] < -1e-9 * (1 + lados_derechos.max()):
+            return resultado_sin_solucion("Problema sin solución factible", iteracion)
+        
+        # Sacar de la base las artificiales que quedaron con valor cero
+        for i in range(1, num_filas):
+            if base[i] >= col_artificiales:
+                candidatas = np.nonzero(np.abs(Tabla[i, 1:col_artificiales]) > 1e-9)[0]
+                # Sin candidatas la restricción es redundante y la artificial sigue en cero
+                if len(candidatas):
+                    col_pivote = int(candidatas[0]) + 1
+                    _pivotear_tabla(tablas, pasos, i, col_pivote, iteracion, modo_traza, fase=1)
+                    base[i] = col_pivote
+                    iteracion += 1
+        
+        # Fila objetivo original expresada en función de las variables no básicas
+        fila_objetivo = fila_fase2.copy()
+        for i in range(1, num_filas):
+            if fila_objetivo[base[i]] != 0:
+                fila_objetivo -= fila_objetivo[base[i]] * Tabla[i]
+        Tabla[0] = fila_objetivo
+        
+        pasos.append(_registrar_tablas({
+            "paso": iteracion,
+            "descripcion": "Inicio de la fase 2",
+            "operacion": f"{nombres_filas[0]} = función objetivo original en términos de la base factible",
+            "fila_objetivo": fila_objetivo.copy(),
+            "fase": 2,
+            "nombres_columnas": nombres_columnas,
+            "nombres_filas": nombres_filas
+        }, tablas, modo_traza != "pivotes"))
+    
+    # Fase 2: las artificiales ya no pueden volver a entrar a la base
+    estado, iteracion = _iterar_tabla(tablas, pasos, np.arange(1, col_artificiales),
+                                      base, iteracion, limites, modo_traza, precio, fase=2)
+    if estado == "no_acotado":
+        return resultado_sin_solucion("Problema no acotado", iteracion)
+    
+    # Extraer la solución final a partir de la base
+    valores = np.zeros(num_cols)
+    for i in range(1, num_filas):
+        valores[base[i]] = Tabla[i, -1]
+    
+    resultado = {
+        "status_text": TEXTO_ESTADO[estado],
+        "valor_objetivo": Tabla[0, -1] if not es_minimizacion else -Tabla[0, -1],
+        "variables": [{"nombre": f"x{j+1}", "valor": valores[j+1]} for j in range(num_vars)]
+    }
+    
+    # Base final con nombres independientes del método (para arrancar en caliente)
+    resultado["base"] = nombres_base([j - 1 for j in base[1:]], num_vars, operadores)
+    
+    return {
+        "pasos": pasos,
+        "metodo": "dos_fases",
+        "resultado_final": _resumen_iteraciones(resultado, iteracion, precio)
+    }
+
+def metodo_simplex_dual(datos):
+    """
+    Aplica el método Simplex dual. Parte de la tabla con una holgura por
+    restricción (las >= multiplicadas por -1), que no es factible si algún lado
+    derecho queda negativo pero sí es dual factible cuando ningún coeficiente de
+    la fila objetivo es negativo: el caso de minimizar costos positivos con
+    restricciones >= (dieta, cobertura). En cada iteración sale una básica con
+    valor negativo y entra la columna que conserva la optimalidad de la fila
+    objetivo, sin variables artificiales.
+    
+    Raises:
+        ValueError: Si hay restricciones de igualdad o la tabla inicial no es dual factible
+    """
+    num_vars = datos["num_variables"]
+    num_rest = datos["num_restricciones"]
+    operadores = list(datos["operadores"])
+    filas_nz, cols_nz, valores_nz = tripletas(datos["coef_restricciones"], num_rest, num_vars)
+    lados_derechos = list(datos["lados_derechos"])
+    
+    if "=" in operadores:
+        raise ValueError("El simplex dual no admite restricciones de igualdad: use gran_m o dos_fases")
+    
+    # Para minimización, cambiamos el signo de la función objetivo
+    es_minimizacion = datos["tipo_operacion"] == "minimizar"
+    coef_obj = [-c for c in datos["coef_objetivo"]] if es_minimizacion else list(datos["coef_objetivo"])
+    
+    # Columnas: Z, X1...Xn, S1...Sm, Sol; las filas >= se multiplican por -1 para que S sea +1
+    num_cols = 1 + num_vars + num_rest + 1
+    num_filas = 1 + num_rest
+    signos = np.array([-1.0 if op == ">=" else 1.0 for op in operadores])
+    
+    Tabla = np.zeros((num_filas, num_cols))
+    Tabla[0, 0] = 1
+    Tabla[0, 1:num_vars+1] = [-c for c in coef_obj]
+    Tabla[filas_nz + 1, cols_nz + 1] = valores_nz * signos[filas_nz]
+    for i in range(num_rest):
+        Tabla[i+1, num_vars+i+1] = 1
+        Tabla[i+1, -1] = signos[i] * lados_derechos[i]
+    
+    if (Tabla[0, 1:-1] < -1e-10).any():
+        raise ValueError("El simplex dual necesita una tabla inicial dual factible "
+                         "(ningún coeficiente negativo en la fila objetivo)")
+    
+    nombres_columnas = ["Z"] + [f"X{j+1}" for j in range(num_vars)] + [f"S{j+1}" for j in range(num_rest)] + ["Sol"]
+    nombres_filas = ["f1"] + [f"f{i+2}" for i in range(num_rest)]
+    
+    modo_traza = datos.get("modo_traza", "completo")
+    tablas = {"Tabla": Tabla}
+    pasos = [_registrar_tablas({
+        "paso": 0,
+        "descripcion": "Tabla inicial",
+        "modo_traza": modo_traza,
+        "nombres_columnas": nombres_columnas,
+        "nombres_filas": nombres_filas
+    }, tablas, True)]
+    
+    limites = leer_limites(datos, MAX_ITERACIONES_TABLA)
+    base = [None] + [num_vars + i + 1 for i in range(num_rest)]
+    precio = nuevo_estado(datos.get("regla_precio", "dantzig"), num_cols)
+    
+    estado, iteracion = _iterar_dual(tablas, pasos, base, 1, limites, modo_traza, precio)
+    
+    if estado != "optimo":
+        # Hasta el óptimo, la base del simplex dual no es factible: no hay solución que devolver
+        return {
+            "pasos": pasos,
+            "metodo": "dual",
+            "resultado_final": _resumen_iteraciones({
+                "status_text": "Problema sin solución factible" if estado == "infactible" else TEXTO_ESTADO[estado],
+                "valor_objetivo": None,
+                "variables": None
+            }, iteracion, precio)
+        }
+    
+    # Extraer la solución final a partir de la base
+    valores = np.zeros(num_cols)
+    for i in range(1, num_filas):
+        valores[base[i]] = Tabla[i, -1]
+    
+    resultado = {
+        "status_text": TEXTO_ESTADO[estado],
+        "valor_objetivo": Tabla[0, -1] if not es_minimizacion else -Tabla[0, -1],
+        "variables": [{"nombre": f"x{j+1}", "valor": valores[j+1]} for j in range(num_vars)]
+    }
+    
+    # Base final con nombres independientes del método (para arrancar en caliente)
+    resultado["base"] = nombres_base([j - 1 for j in base[1:]], num_vars, operadores)
+    
+    return {
+        "pasos": pasos,
+        "metodo": "dual",
+        "resultado_final": _resumen_iteraciones(resultado, iteracion, precio)
+    }
+
+def _pivotear_tabla(tablas, pasos, fila_pivote, col_pivote, iteracion, modo_traza, cocientes=None, fase=None,
+                    cocientes_duales=None):
+    """
+    Registra la selección de pivote, normaliza la fila pivote y hace ceros en el
+    resto de la columna pivote de tablas["Tabla"], añadiendo un paso por operación.
+    cocientes son los de cada fila (Simplex primal) y cocientes_duales los de
+    cada columna (Simplex dual, desde la columna 1).
+    """
+    Tabla = tablas["Tabla"]
+    nombres_columnas = pasos[0]["nombres_columnas"]
+    nombres_filas = pasos[0]["nombres_filas"]
+    
+    # Registrar la selección de pivote
+    seleccion = {
+        "paso": iteracion,
+        "descripcion": "Selección de pivote",
+        "columna_pivote": col_pivote,
+        "columna_pivote_nombre": nombres_columnas[col_pivote],
+        "fila_pivote": fila_pivote,
+        "fila_pivote_nombre": nombres_filas[fila_pivote-1],
+        "valor_pivote": Tabla[fila_pivote, col_pivote]
+    }
+    if cocientes is not None:
+        seleccion["cocientes"] = cocientes
+    if cocientes_duales is not None:
+        seleccion["cocientes_duales"] = cocientes_duales
+    if fase is not None:
+        seleccion["fase"] = fase
+    pasos.append(seleccion)
+    
+    # Normalizar la fila pivote
+    valor_pivote = _normalizar_fila(tablas, fila_pivote, col_pivote)
+    
+    # Registrar la normalización
+    pasos.append(_registrar_tablas({
+        "paso": iteracion,
+        "descripcion": "Normalización de la fila pivote",
+        "operacion": f"{nombres_filas[fila_pivote-1]} = {nombres_filas[fila_pivote-1]} / {valor_pivote:.4f}",
+        "fila_pivote": fila_pivote,
+        "columna_pivote": col_pivote,
+        "nombres_columnas": nombres_columnas,
+        "nombres_filas": nombres_filas
+    }, tablas, modo_traza == "completo"))
+    
+    # Hacer ceros en la columna pivote (una actualización de rango 1 para todas las filas)
+    intermedias = _copiar_tablas(tablas) if modo_traza == "completo" else None
+    factores, _ = _eliminar_columna(tablas, fila_pivote, col_pivote)
+    ultima = -1
+    
+    # Registrar cada operación de fila (solo si el factor no es prácticamente cero)
+    for i in np.nonzero(np.abs(factores) > 1e-10)[0]:
+        factor = float(factores[i])
+        if intermedias is not None:
+            # Tabla tal y como queda tras operar la fila i (las siguientes aún sin operar)
+            _copiar_filas(intermedias, tablas, ultima + 1, i + 1)
+            ultima = i
+        
+        pasos.append(_registrar_tablas({
+            "paso": iteracion,
+            "descripcion": "Operación de fila",
+            "operacion": f"{nombres_filas[i]} = {nombres_filas[i]} - {factor:.4f} * {nombres_filas[fila_pivote-1]}",
+            "fila": int(i),
+            "fila_pivote": fila_pivote,
+            "columna_pivote": col_pivote,
+            "factor": factor,
+            "nombres_columnas": nombres_columnas,
+            "nombres_filas": nombres_filas
+        }, intermedias, intermedias is not None))
+    
+    # En modo "iteraciones" solo se guarda la tabla al final de cada iteración
+    if modo_traza == "iteraciones":
+        _registrar_tablas(pasos[-1], tablas, True)
+
+def _iterar_tabla(tablas, pasos, columnas, base, iteracion, limites, modo_traza, precio, fase=None):
+    """
+    Itera el Simplex sobre tablas["Tabla"] (maximización) hasta que ninguna de las
+    columnas candidatas tenga coeficiente negativo en la fila objetivo.
+    
+    Args:
+        columnas: Índices de las columnas que pueden entrar a la base
+        base: Variable básica de cada fila; se actualiza en cada pivote
+        iteracion: Número de la primera iteración
+        limites: Límites de iteraciones y tiempo (ver models/limites.py)
+        precio: Estado de la regla de precio (ver models/precios.py)
+    
+    Returns:
+        Tupla (estado, iteracion) con estado "optimo", "no_acotado", "max_iteraciones"
+        o "tiempo" e iteracion el número de la siguiente iteración
+    """
+    Tabla = tablas["Tabla"]
+    
+    while iteracion <= limites["max_iteraciones"]:
+        if tiempo_agotado(limites):
+            return "tiempo", iteracion
+        
+        # En la fase 1 la fila objetivo es la suma de las artificiales, no el objetivo
+        informar_progreso(limites, iteracion, None if fase == 1 else Tabla[0, -1])
+        
+        # Columna pivote según la regla de precio (con Dantzig, el valor más negativo
+        # de la fila objetivo); si ninguna tiene coeficiente negativo, es el óptimo
+        col_pivote = _columna_entrada(tablas, columnas, precio)
+        if col_pivote is None:
+            return "optimo", iteracion
+        
+        # Calcular los cocientes para identificar la fila pivote
+        cocientes = _cocientes(Tabla, col_pivote)
+        
+        if not np.isfinite(cocientes).any():
+            return "no_acotado", iteracion
+        
+        # Encontrar la fila pivote (el menor cociente positivo)
+        fila_pivote = elegir_salida(cocientes, base[1:], regla_activa(precio)) + 1
+        _actualizar_precio(tablas, precio, fila_pivote, col_pivote, base[fila_pivote], cocientes[fila_pivote-1])
+        
+        _pivotear_tabla(tablas, pasos, fila_pivote, col_pivote, iteracion, modo_traza, cocientes.tolist(), fase)
+        base[fila_pivote] = col_pivote
+        iteracion += 1
+    
+    return "max_iteraciones", iteracion
+
+def _iterar_dual(tablas, pasos, base, iteracion, limites, modo_traza, precio):
+    """
+    Itera el Simplex dual sobre tablas["Tabla"] (dual factible) hasta que ningún
+    lado derecho sea negativo.
+    
+    La fila que sale es la del lado derecho más negativo (con "steepest_edge" o
+    "devex", el mayor Sol_r² / ||fila r de B⁻¹||², con B⁻¹ leída de las columnas
+    de holgura; con Bland, la de la básica de menor índice). Entra la columna con
+    el menor cociente |costo / coeficiente| entre las de coeficiente negativo en
+    esa fila, lo que mantiene la fila objetivo sin coeficientes negativos.
+    
+    Returns:
+        Tupla (estado, iteracion) con estado "optimo", "infactible", "max_iteraciones"
+        o "tiempo" e iteracion el número de la siguiente iteración
+    """
+    Tabla = tablas["Tabla"]
+    num_filas = Tabla.shape[0]
+    holguras = np.arange(Tabla.shape[1] - num_filas, Tabla.shape[1] - 1)
+    
+    while iteracion <= limites["max_iteraciones"]:
+        if tiempo_agotado(limites):
+            return "tiempo", iteracion
+        
+        # Hasta el final la base no es factible: no hay valor del objetivo que informar
+        informar_progreso(limites, iteracion)
+        
+        lados = Tabla[1:, -1]
+        negativos = lados < -1e-10
+        if not negativos.any():
+            return "optimo", iteracion
+        
+        regla = regla_activa(precio)
+        if regla == "bland":
+            fila_pivote = min(np.nonzero(negativos)[0], key=lambda i: base[i + 1]) + 1
+        elif regla in ("steepest_edge", "devex"):
+            pesos = np.einsum("ij,ij->i", Tabla[1:, holguras], Tabla[1:, holguras])
+            fila_pivote = int(np.argmax(np.where(negativos, lados ** 2 / pesos, -np.inf))) + 1
+        else:
+            fila_pivote = int(np.argmin(lados)) + 1
+        
+        # Cocientes de la prueba del cociente dual (infinito en las columnas que no pueden entrar)
+        fila = Tabla[fila_pivote, 1:-1]
+        cocientes = np.full(len(fila), np.inf)
+        candidatas = fila < -1e-10
+        if not candidatas.any():
+            # La fila dice que una suma de términos no negativos es negativa
+            return "infactible", iteracion
+        cocientes[candidatas] = np.maximum(Tabla[0, 1:-1][candidatas], 0.0) / -fila[candidatas]
+        col_pivote = int(np.argmin(cocientes)) + 1
+        registrar_pivote(precio, cocientes[col_pivote - 1])
+        
+        _pivotear_tabla(tablas, pasos, fila_pivote, col_pivote, iteracion, modo_traza,
+                        cocientes_duales=cocientes.tolist())
+        base[fila_pivote] = col_pivote
+        iteracion += 1
+    
+    return "max_iteraciones", iteracion
+
+def _columna_entrada(tablas, columnas, precio):
+    """
+    Elige entre las columnas candidatas la que entra a la base según la regla
+    de precio activa, o None si ninguna mejora el objetivo. En la Gran M las
+    columnas con coeficiente M negativo tienen prioridad sobre las numéricas.
+    """
+    numerico = tablas.get("Tabla", tablas.get("Tabla_numerico"))
+    regla = regla_activa(precio)
+    costos = numerico[0, columnas]
+    
+    if "Tabla_M" in tablas:
+        costos_M = tablas["Tabla_M"][0, columnas]
+        sin_M = np.abs(costos_M) <= 1e-10
+        if regla == "bland":
+            # Bland sobre el orden lexicográfico (coeficiente M, coeficiente numérico)
+            mejora = (costos_M < -1e-10) | (sin_M & (costos < -1e-10))
+            return int(columnas[np.argmax(mejora)]) if mejora.any() else None
+        if (costos_M < -1e-10).any():
+            costos = costos_M
+        else:
+            costos = np.where(sin_M, costos, 0.0)
+    
+    pesos = None
+    if regla == "steepest_edge":
+        # En la tabla se dispone de las columnas completas: γ_j = 1 + ||columna j||²
+        pesos = 1.0 + np.einsum("ij,ij->j", numerico[1:, columnas], numerico[1:, columnas])
+    elif regla == "devex":
+        pesos = precio["pesos"][columnas]
+    
+    posicion = elegir_entrada(regla, costos, pesos)
+    return None if posicion is None else int(columnas[posicion])
+
+def _actualizar_precio(tablas, precio, fila_pivote, col_entrada, col_salida, theta):
+    """
+    Actualiza el estado de la regla de precio antes de pivotar (la fila pivote
+    debe ser todavía la de la tabla anterior al pivote).
+    """
+    if regla_activa(precio) == "devex":
+        numerico = tablas.get("Tabla", tablas.get("Tabla_numerico"))
+        actualizar_devex(precio["pesos"], numerico[fila_pivote], col_entrada, col_salida)
+    registrar_pivote(precio, theta)
+
+def _resumen_iteraciones(resultado, iteracion, precio):
+    """
+    Añade al resultado final el número de iteraciones y la regla de precio usada.
+    """
+    resultado["iteraciones"] = iteracion - 1
+    resultado["regla_precio"] = precio["regla"]
+    resultado["cambio_a_bland"] = precio["cambio_a_bland"]
+    return resultado
+
+def _combinar_tablas(Tabla_numerico, Tabla_M):
+    """
+    Vista combinada de la tabla de la Gran M para mostrar: los coeficientes
+    numéricos, los simbólicos M y una máscara booleana de las celdas con M.
+    Las plantillas la consumen directamente sin recorrer diccionarios por celda.
+    """
+    return {
+        "numerico": Tabla_numerico,
+        "simbolico": Tabla_M,
+        "tiene_M": np.abs(Tabla_M) > 1e-10
+    }
+
+def _registrar_tablas(paso, tablas, guardar):
+    """
+    Añade al paso una copia de las tablas actuales si guardar es True.
+    tablas es {"Tabla": ...} (Simplex estándar) o {"Tabla_numerico": ..., "Tabla_M": ...} (Gran M).
+    """
+    if guardar:
+        for nombre, tabla in tablas.items():
+            paso[nombre] = tabla.copy()
+        if "Tabla_M" in tablas:
+            # La vista combinada comparte las copias recién guardadas
+            paso["Tabla_combinado"] = _combinar_tablas(paso["Tabla_numerico"], paso["Tabla_M"])
+    return paso
+
+def _normalizar_fila(tablas, fila, columna):
+    """
+    Divide la fila pivote por el elemento pivote (siempre numérico) y devuelve su valor.
+    """
+    numerico = tablas.get("Tabla", tablas.get("Tabla_numerico"))
+    valor_pivote = numerico[fila, columna]
+    for tabla in tablas.values():
+        tabla[fila] = tabla[fila] / valor_pivote
+    return valor_pivote
+
+def _eliminar_fila(tablas, fila, fila_pivote, columna):
+    """
+    Hace cero la columna pivote en la fila indicada y devuelve (factor_numerico, factor_M).
+    """
+    if "Tabla" in tablas:
+        Tabla = tablas["Tabla"]
+        factor = Tabla[fila, columna]
+        Tabla[fila] = Tabla[fila] - factor * Tabla[fila_pivote]
+        return factor, 0.0
+    
+    Tabla_numerico = tablas["Tabla_numerico"]
+    Tabla_M = tablas["Tabla_M"]
+    factor_numerico = Tabla_numerico[fila, columna]
+    factor_M = Tabla_M[fila, columna]
+    
+    # Ajustar coeficientes numéricos
+    Tabla_numerico[fila] = Tabla_numerico[fila] - factor_numerico * Tabla_numerico[fila_pivote]
+    # Ajustar coeficientes con M: (n + mM) - (fn + fmM) * fila_pivote
+    Tabla_M[fila] = Tabla_M[fila] - factor_M * Tabla_numerico[fila_pivote] - factor_numerico * Tabla_M[fila_pivote]
+    return factor_numerico, factor_M
+
+def _eliminar_columna(tablas, fila_pivote, columna):
+    """
+    Hace cero la columna pivote en todas las filas salvo la pivote con una sola
+    actualización de rango 1 por tabla. Equivale a aplicar _eliminar_fila fila a
+    fila (mismas operaciones en coma flotante) sin recorrerlas en Python.
+    
+    Returns:
+        Tupla (factores_numericos, factores_M) con el factor aplicado a cada fila
+    """
+    numerico = tablas.get("Tabla", tablas.get("Tabla_numerico"))
+    factores = numerico[:, columna].copy()
+    factores[fila_pivote] = 0
+    
+    if "Tabla" in tablas:
+        numerico -= np.outer(factores, numerico[fila_pivote])
+        return factores, np.zeros_like(factores)
+    
+    Tabla_M = tablas["Tabla_M"]
+    factores_M = Tabla_M[:, columna].copy()
+    factores_M[fila_pivote] = 0
+    
+    # (n + mM) - (fn + fmM) * fila_pivote, con la fila pivote puramente numérica en su parte n
+    numerico -= np.outer(factores, numerico[fila_pivote])
+    Tabla_M -= np.outer(factores_M, numerico[fila_pivote])
+    Tabla_M -= np.outer(factores, Tabla_M[fila_pivote])
+    return factores, factores_M
+
+def _cocientes(Tabla, columna):
+    """
+    Prueba del cociente mínimo: Sol / columna pivote en cada fila de restricción,
+    con infinito donde el elemento no es positivo (los prácticamente cero tampoco
+    se consideran: pivotar sobre ellos amplifica el error).
+    """
+    columna_pivote = Tabla[1:, columna]
+    cocientes = np.full(len(columna_pivote), np.inf)
+    positivos = columna_pivote > 1e-10
+    cocientes[positivos] = Tabla[1:, -1][positivos] / columna_pivote[positivos]
+    return cocientes
+
+def _copiar_tablas(tablas):
+    return {nombre: tabla.copy() for nombre, tabla in tablas.items()}
+
+def _copiar_filas(destino, origen, desde, hasta):
+    for nombre, tabla in origen.items():
+        destino[nombre][desde:hasta] = tabla[desde:hasta]
+
+def _ajustar_fila_objetivo(tablas, fila, m_coef):
+    """
+    Resta m_coef·M veces la fila de una artificial a la fila objetivo (Gran M),
+    o m_coef veces sin M en la fase 1 del método de las dos fases.
+    """
+    if "Tabla" in tablas:
+        tablas["Tabla"][0] = tablas["Tabla"][0] - m_coef * tablas["Tabla"][fila]
+        return
+    
+    Tabla_numerico = tablas["Tabla_numerico"]
+    Tabla_M = tablas["Tabla_M"]
+    
+    # Actualizar coeficientes numéricos
+    Tabla_numerico[0] = Tabla_numerico[0] - m_coef * Tabla_numerico[fila]
+    
+    # Actualizar coeficientes simbólicos M (la fila de restricción es puramente numérica)
+    Tabla_M[0] = Tabla_M[0] - m_coef * Tabla_numerico[fila]
+
+def reconstruir_tabla(resultado, indice_paso):
+    """
+    Reconstruye las tablas tal y como estaban en resultado["pasos"][indice_paso]
+    a partir de la tabla inicial y la secuencia de pivotes registrada.
+    
+    Permite usar los modos de traza compactos ("iteraciones" y "pivotes"), que
+    no guardan una copia de la tabla en cada operación de fila.
+    
+    Returns:
+        Diccionario {"Tabla": ...} o {"Tabla_numerico": ..., "Tabla_M": ...}
+    """
+    pasos = resultado["pasos"]
+    inicial = pasos[0]
+    if "Tabla" in inicial:
+        tablas = {"Tabla": inicial["Tabla"].copy()}
+    else:
+        tablas = {"Tabla_numerico": inicial["Tabla_numerico"].copy(), "Tabla_M": inicial["Tabla_M"].copy()}
+    num_filas = len(inicial["nombres_filas"])
+    
+    # Pivote en curso y última fila ya eliminada en esa iteración
+    pivote = None
+    ultima_fila = -1
+    
+    def completar_pivote(hasta):
+        # Las filas con factor prácticamente cero no generan paso, pero sí se operaron
+        for i in range(ultima_fila + 1, hasta + 1):
+            if i != pivote[0]:
+                _eliminar_fila(tablas, i, pivote[0], pivote[1])
+    
+    for paso in pasos[1:indice_paso + 1]:
+        descripcion = paso["descripcion"]
+        
+        if descripcion == "Ajuste de fila objetivo para variables artificiales":
+            _ajustar_fila_objetivo(tablas, paso["fila"], paso["factor_M"] if "Tabla_M" in tablas else paso["factor"])
+        elif descripcion == "Inicio de la fase 2":
+            if pivote is not None:
+                completar_pivote(num_filas - 1)
+            pivote = None
+            tablas["Tabla"][0] = paso["fila_objetivo"]
+        elif descripcion in ("Selección de pivote", "Comprobación de factibilidad"):
+            if pivote is not None:
+                completar_pivote(num_filas - 1)
+            pivote = None
+        elif descripcion == "Normalización de la fila pivote":
+            pivote = (paso["fila_pivote"], paso["columna_pivote"])
+            ultima_fila = -1
+            _normalizar_fila(tablas, *pivote)
+        elif descripcion == "Operación de fila":
+            completar_pivote(paso["fila"])
+            ultima_fila = paso["fila"]
+    
+    return tablas
+
+def paso_con_tablas(resultado, indice_paso):
+    """
+    Copia de resultado["pasos"][indice_paso] con sus tablas: las guardadas o,
+    si el modo de traza no las guardó en ese paso, las reconstruidas con
+    reconstruir_tabla.
+    
+    Raises:
+        ValueError: Si el paso no existe o el método no usa tablas (Simplex revisado)
+    """
+    pasos = resultado.get("pasos") or []
+    if resultado.get("metodo") == "revisado":
+        raise ValueError("El Simplex revisado no guarda tablas: no hay tabla que reconstruir")
+    if not 0 <= indice_paso < len(pasos):
+        raise ValueError(f"El paso debe estar entre 0 y {len(pasos) - 1}")
+    
+    paso = dict(pasos[indice_paso])
+    if "Tabla" in paso or "Tabla_numerico" in paso:
+        return paso
+    return _registrar_tablas(paso, reconstruir_tabla(resultado, indice_paso), True)
@@ -0,0 +1,525 @@
+import numpy as np
+from models.dispersa import matriz_desde_datos
+from models.precios import (nuevo_estado, regla_activa, elegir_entrada, elegir_salida,
+                            registrar_pivote, actualizar_devex, actualizar_steepest_edge)
+from models.limites import leer_limites, tiempo_agotado, informar_progreso
+
+# Número de actualizaciones en forma producto (vectores eta) antes de refactorizar la base
+FRECUENCIA_REFACTORIZACION = 50
+
+# Tamaño de bloque para la factorización LU y las sustituciones triangulares
+TAMANO_BLOQUE = 64
+
+TOLERANCIA = 1e-9
+
+def _factorizar_lu(B):
+    """
+    Factoriza P·B = L·U con pivoteo parcial por bloques (las actualizaciones del
+    bloque restante se hacen con productos de matrices).
+
+    Returns:
+        Diccionario con LU (L unitaria bajo la diagonal y U en el triángulo superior),
+        la permutación de filas y las inversas de los bloques diagonales de L y U.
+    """
+    LU = np.array(B, dtype=float)
+    m = LU.shape[0]
+    perm = np.arange(m)
+
+    for k0 in range(0, m, TAMANO_BLOQUE):
+        k1 = min(k0 + TAMANO_BLOQUE, m)
+
+        # Factorizar el panel k0:k1 columna a columna
+        for k in range(k0, k1):
+            p = k + int(np.argmax(np.abs(LU[k:, k])))
+            if abs(LU[p, k]) < 1e-14:
+                raise np.linalg.LinAlgError("Base singular")
+            if p != k:
+                LU[[k, p]] = LU[[p, k]]
+                perm[[k, p]] = perm[[p, k]]
+            LU[k+1:, k] /= LU[k, k]
+            LU[k+1:, k+1:k1] -= np.outer(LU[k+1:, k], LU[k, k+1:k1])
+
+        if k1 < m:
+            # U12 = L11^-1 · A12 y actualización del bloque restante A22 -= L21 · U12
+            L11 = np.tril(LU[k0:k1, k0:k1], -1) + np.eye(k1 - k0)
+            LU[k0:k1, k1:] = np.linalg.solve(L11, LU[k0:k1, k1:])
+            LU[k1:, k1:] -= LU[k1:, k0:k1] @ LU[k0:k1, k1:]
+
+    # Inversas de los bloques diagonales para las sustituciones por bloques
+    bloques = []
+    for k0 in range(0, m, TAMANO_BLOQUE):
+        k1 = min(k0 + TAMANO_BLOQUE, m)
+        L_bb = np.tril(LU[k0:k1, k0:k1], -1) + np.eye(k1 - k0)
+        U_bb = np.triu(LU[k0:k1, k0:k1])
+        bloques.append((k0, k1, np.linalg.inv(L_bb), np.linalg.inv(U_bb)))
+
+    return {"LU": LU, "perm": perm, "bloques": bloques}
+
+def _resolver_lu(factor, b):
+    """
+    Resuelve B·x = b a partir de la factorización P·B = L·U.
+    """
+    LU = factor["LU"]
+    x = np.array(b, dtype=float)[factor["perm"]]
+
+    # Sustitución hacia adelante con L
+    for k0, k1, L_inv, _ in factor["bloques"]:
+        if k0 > 0:
+            x[k0:k1] -= LU[k0:k1, :k0] @ x[:k0]
+        x[k0:k1] = L_inv @ x[k0:k1]
+
+    # Sustitución hacia atrás con U
+    for k0, k1, _, U_inv in reversed(factor["bloques"]):
+        if k1 < len(x):
+            x[k0:k1] -= LU[k0:k1, k1:] @ x[k1:]
+        x[k0:k1] = U_inv @ x[k0:k1]
+
+    return x
+
+def _resolver_lu_transpuesta(factor, c):
+    """
+    Resuelve Bᵀ·y = c a partir de la factorización P·B = L·U.
+    """
+    LU = factor["LU"]
+    z = np.array(c, dtype=float)
+
+    # Uᵀ es triangular inferior
+    for k0, k1, _, U_inv in factor["bloques"]:
+        if k0 > 0:
+            z[k0:k1] -= LU[:k0, k0:k1].T @ z[:k0]
+        z[k0:k1] = U_inv.T @ z[k0:k1]
+
+    # Lᵀ es triangular superior
+    for k0, k1, L_inv, _ in reversed(factor["bloques"]):
+        if k1 < len(z):
+            z[k0:k1] -= LU[k1:, k0:k1].T @ z[k1:]
+        z[k0:k1] = L_inv.T @ z[k0:k1]
+
+    y = np.empty_like(z)
+    y[factor["perm"]] = z
+    return y
+
+def _ftran(factor, etas, a):
+    """
+    Calcula B⁻¹·a aplicando la LU y después los vectores eta en orden.
+    """
+    x = _resolver_lu(factor, a)
+    for r, alfa in etas:
+        x_r = x[r] / alfa[r]
+        x -= x_r * alfa
+        x[r] = x_r
+    return x
+
+def _btran(factor, etas, c):
+    """
+    Calcula cᵀ·B⁻¹ aplicando los vectores eta en orden inverso y después la LU.
+    """
+    w = np.array(c, dtype=float)
+    for r, alfa in reversed(etas):
+        w[r] = (w[r] - (w @ alfa - w[r] * alfa[r])) / alfa[r]
+    return _resolver_lu_transpuesta(factor, w)
+
+def nombres_base(indices, num_vars, operadores):
+    """
+    Nombres de las columnas básicas, independientes del método que resolvió el
+    modelo: "x{j}" para las variables, "h{i}" para la holgura de la restricción
+    i y "a{i}" para su artificial.
+
+    Args:
+        indices: Índices de las columnas básicas, ordenadas como variables,
+            holguras (filas <= y >=) y artificiales (filas >= y =)
+        operadores: Operadores de las restricciones tras hacer no negativos los lados derechos
+    """
+    filas_holgura = [i for i, op in enumerate(operadores) if op in ["<=", ">="]]
+    filas_artificial = [i for i, op in enumerate(operadores) if op in [">=", "="]]
+    nombres = []
+    for j in indices:
+        j = int(j)
+        if j < num_vars:
+            nombres.append(f"x{j+1}")
+        elif j < num_vars + len(filas_holgura):
+            nombres.append(f"h{filas_holgura[j - num_vars] + 1}")
+        else:
+            nombres.append(f"a{filas_artificial[j - num_vars - len(filas_holgura)] + 1}")
+    return nombres
+
+def indices_base(nombres, num_vars, operadores):
+    """
+    Inversa de nombres_base para una base previa. Devuelve None si no sirve
+    para arrancar: tamaño distinto, columnas repetidas o desconocidas (por
+    ejemplo la holgura de una restricción que ahora es de igualdad) o
+    artificiales, que no pueden volver a la base.
+    """
+    filas_holgura = [i for i, op in enumerate(operadores) if op in ["<=", ">="]]
+    posicion_holgura = {fila: k for k, fila in enumerate(filas_holgura)}
+    indices = []
+    for nombre in nombres:
+        tipo, numero = str(nombre)[:1], str(nombre)[1:]
+        if not numero.isdigit():
+            return None
+        numero = int(numero) - 1
+        if tipo == "x" and 0 <= numero < num_vars:
+            indices.append(numero)
+        elif tipo == "h" and numero in posicion_holgura:
+            indices.append(num_vars + posicion_holgura[numero])
+        else:
+            return None
+    if len(indices) != len(operadores) or len(set(indices)) != len(indices):
+        return None
+    return np.array(indices, dtype=int)
+
+def metodo_simplex_revisado(datos):
+    """
+    Aplica el método Simplex revisado (forma matricial) en dos fases.
+
+    La matriz de restricciones se guarda en formato disperso (CSR) y, en lugar
+    de la tabla completa, se mantiene solo la factorización LU de la base,
+    actualizada en forma producto y refactorizada periódicamente; los costos
+    reducidos se calculan bajo demanda a partir de los multiplicadores simplex.
+    Pensado para modelos grandes, por lo que los pasos registran únicamente la
+    variable que entra, la que sale y el valor objetivo de cada iteración.
+
+    La variable que entra se elige con datos["regla_precio"] (ver models/precios.py);
+    steepest edge mantiene los pesos exactos con la actualización de Goldfarb-Reid,
+    a costa de dos BTRAN adicionales por iteración (Devex necesita solo uno).
+
+    Con datos["base_inicial"] (la "base" de un resultado anterior, ver nombres_base)
+    se arranca en caliente desde esa base: si sigue siendo factible (cambió el
+    objetivo) se continúa con el simplex primal, y si solo dejó de serlo pero
+    conserva los costos reducidos óptimos (cambiaron los lados derechos) se
+    reoptimiza con el simplex dual. Si no es ninguna de las dos, se resuelve desde cero.
+    """
+    num_vars = datos["num_variables"]
+    num_rest = datos["num_restricciones"]
+    tipo_operacion = datos["tipo_operacion"]
+
+    A = matriz_desde_datos(datos["coef_restricciones"], num_rest, num_vars)
+    b = np.array(datos["lados_derechos"], dtype=float)
+    operadores = list(datos["operadores"])
+
+    # Para maximización se minimiza -c·x
+    es_minimizacion = tipo_operacion == "minimizar"
+    c = np.array(datos["coef_objetivo"], dtype=float)
+    c_min = c if es_minimizacion else -c
+
+    # Asegurarse de que todos los lados derechos sean no negativos
+    negativos = b < 0
+    A = A.escalar_filas(np.where(negativos, -1.0, 1.0))
+    b[negativos] *= -1
+    for i in np.where(negativos)[0]:
+        if operadores[i] == "<=":
+            operadores[i] = ">="
+        elif operadores[i] == ">=":
+            operadores[i] = "<="
+
+    # Variables adicionales: holguras (+1 para <=, -1 para >=) y artificiales (>= y =)
+    filas_holgura = np.array([i for i, op in enumerate(operadores) if op in ["<=", ">="]], dtype=int)
+    signos_holgura = np.array([1.0 if operadores[i] == "<=" else -1.0 for i in filas_holgura])
+    filas_artificial = np.array([i for i, op in enumerate(operadores) if op in [">=", "="]], dtype=int)
+
+    num_holgura = len(filas_holgura)
+    num_artificial = len(filas_artificial)
+    inicio_holgura = num_vars
+    inicio_artificial = num_vars + num_holgura
+    num_cols = inicio_artificial + num_artificial
+
+    nombres_columnas = [f"X{j+1}" for j in range(num_vars)]
+    nombres_columnas += [f"S{j+1}" for j in range(num_holgura)]
+    nombres_columnas += [f"R{j+1}" for j in range(num_artificial)]
+    nombres_filas = [f"f{i+2}" for i in range(num_rest)]
+
+    def columna(j):
+        if j < inicio_holgura:
+            return A.columna(j)
+        col = np.zeros(num_rest)
+        if j < inicio_artificial:
+            col[filas_holgura[j - inicio_holgura]] = signos_holgura[j - inicio_holgura]
+        else:
+            col[filas_artificial[j - inicio_artificial]] = 1.0
+        return col
+
+    def producto_columnas(y):
+        # yᵀ·a_j para todas las columnas (originales, holguras y artificiales)
+        p = np.empty(num_cols)
+        p[:inicio_holgura] = A.producto_transpuesto(y)
+        p[inicio_holgura:inicio_artificial] = signos_holgura * y[filas_holgura]
+        p[inicio_artificial:] = y[filas_artificial]
+        return p
+
+    def costos_reducidos(costos, y):
+        return costos - producto_columnas(y)
+
+    # Base inicial: la holgura de cada fila <= y la artificial del resto
+    base = np.empty(num_rest, dtype=int)
+    for k, i in enumerate(filas_holgura):
+        if operadores[i] == "<=":
+            base[i] = inicio_holgura + k
+    for k, i in enumerate(filas_artificial):
+        base[i] = inicio_artificial + k
+
+    def refactorizar():
+        B = np.column_stack([columna(j) for j in base]) if num_rest > 0 else np.zeros((0, 0))
+        return _factorizar_lu(B)
+
+    es_artificial = np.zeros(num_cols, dtype=bool)
+    es_artificial[inicio_artificial:] = True
+    costos_fase2 = np.zeros(num_cols)
+    costos_fase2[:num_vars] = c_min
+
+    # Arranque en caliente: la base previa se usa si es válida, no singular y
+    # primal factible o dual factible
+    arranque_en_caliente = False
+    usar_dual = False
+    if datos.get("base_inicial") is not None:
+        previa = indices_base(datos["base_inicial"], num_vars, operadores)
+        if previa is not None:
+            try:
+                factor_previo = _factorizar_lu(np.column_stack([columna(j) for j in previa])
+                                               if num_rest > 0 else np.zeros((0, 0)))
+                x_previo = _ftran(factor_previo, [], b)
+                d = costos_reducidos(costos_fase2, _btran(factor_previo, [], costos_fase2[previa]))
+                d[previa] = 0.0
+                d[es_artificial] = 0.0
+                usar_dual = bool((x_previo < -TOLERANCIA).any())
+                if not usar_dual or not (d < -TOLERANCIA).any():
+                    arranque_en_caliente = True
+                    base, factor, x_B = previa, factor_previo, x_previo
+            except np.linalg.LinAlgError:
+                pass
+
+    if not arranque_en_caliente:
+        usar_dual = False
+        factor = refactorizar()
+        x_B = _ftran(factor, [], b)
+    etas = []
+
+    pasos = [{
+        "paso": 0,
+        "descripcion": "Base inicial" + (" (arranque en caliente)" if arranque_en_caliente else ""),
+        "base": [nombres_columnas[j] for j in base],
+        "nombres_columnas": ["Z"] + nombres_columnas + ["Sol"],
+        "nombres_filas": ["f1"] + nombres_filas
+    }]
+
+    # La base inicial es la identidad, así que γ_j = 1 + ||a_j||² es exacto al empezar
+    precio = nuevo_estado(datos.get("regla_precio", "dantzig"), num_cols)
+    if precio["regla"] == "steepest_edge":
+        precio["pesos"][:num_vars] += np.bincount(A.indices, weights=A.valores ** 2, minlength=num_vars)
+        precio["pesos"][num_vars:] = 2.0
+
+    iteracion = 1
+    limites = leer_limites(datos, max(100, 10 * (num_rest + num_cols)))
+    estado = None
+    fase = None
+
+    if arranque_en_caliente:
+        # Los pesos iniciales suponen la base identidad: con otra base se parte de un marco de referencia nuevo
+        precio["pesos"][:] = 1.0
+
+    # Simplex dual desde la base previa: sale la básica más negativa y entra la
+    # columna que conserva los costos reducidos no negativos. Un pivote es
+    # degenerado si su paso dual es nulo (no cambia el objetivo); tras
+    # MAX_PIVOTES_DEGENERADOS seguidos se pasa a la regla de Bland: sale la fila
+    # infactible con menor índice básico y, entre las razones empatadas, entra
+    # la columna de menor índice
+    while usar_dual and (x_B < -TOLERANCIA).any():
+        if iteracion > limites["max_iteraciones"]:
+            estado = "Número máximo de iteraciones alcanzado"
+            break
+        if tiempo_agotado(limites):
+            estado = "Tiempo límite alcanzado"
+            break
+        informar_progreso(limites, iteracion)
+
+        regla = regla_activa(precio)
+        if regla == "bland":
+            infactibles = np.nonzero(x_B < -TOLERANCIA)[0]
+            fila_salida = int(infactibles[np.argmin(base[infactibles])])
+        else:
+            fila_salida = int(np.argmin(x_B))
+        e_r = np.zeros(num_rest)
+        e_r[fila_salida] = 1.0
+        fila_pivote = producto_columnas(_btran(factor, etas, e_r))
+        d = np.maximum(costos_reducidos(costos_fase2, _btran(factor, etas, costos_fase2[base])), 0.0)
+
+        candidatas = fila_pivote < -TOLERANCIA
+        candidatas[base] = False
+        candidatas[es_artificial] = False
+        if not candidatas.any():
+            # Dual no acotado: ninguna combinación de columnas puede hacer no negativa la fila
+            estado = "Problema sin solución factible"
+            break
+
+        razones = np.full(num_cols, np.inf)
+        razones[candidatas] = d[candidatas] / -fila_pivote[candidatas]
+        col_entrada = int(np.argmin(razones))
+        if regla == "bland":
+            col_entrada = int(np.argmax(razones <= razones[col_entrada] + TOLERANCIA))
+        registrar_pivote(precio, razones[col_entrada])
+        col_salida = base[fila_salida]
+
+        alfa = _ftran(factor, etas, columna(col_entrada))
+        theta = x_B[fila_salida] / alfa[fila_salida]
+        x_B -= theta * alfa
+        x_B[fila_salida] = theta
+        base[fila_salida] = col_entrada
+        etas.append((fila_salida, alfa))
+
+        if len(etas) >= FRECUENCIA_REFACTORIZACION:
+            factor = refactorizar()
+            etas = []
+            x_B = _ftran(factor, etas, b)
+
+        pasos.append({
+            "paso": iteracion,
+            "descripcion": "Iteración del simplex dual",
+            "fase": 2,
+            "entra": nombres_columnas[col_entrada],
+            "sale": nombres_columnas[col_salida],
+            "fila_pivote_nombre": nombres_filas[fila_salida],
+            "valor_objetivo": float(costos_fase2[base] @ x_B)
+        })
+        iteracion += 1
+
+    if estado is not None:
+        fases = []
+    elif arranque_en_caliente:
+        fases = [2]
+    else:
+        fases = [1, 2] if num_artificial > 0 else [2]
+    for fase in fases:
+        costos = np.zeros(num_cols)
+        if fase == 1:
+            costos[inicio_artificial:] = 1.0
+        else:
+            costos[:num_vars] = c_min
+
+        while True:
+            if iteracion > limites["max_iteraciones"]:
+                estado = "Número máximo de iteraciones alcanzado"
+                break
+            if tiempo_agotado(limites):
+                estado = "Tiempo límite alcanzado"
+                break
+            # Los costos están en forma de minimización; en la fase 1 no hay objetivo que informar
+            informar_progreso(limites, iteracion, -(costos[base] @ x_B) if fase == 2 else None)
+
+            # Multiplicadores simplex y costos reducidos (pricing bajo demanda)
+            y = _btran(factor, etas, costos[base])
+            d = costos_reducidos(costos, y)
+            d[base] = 0.0
+            if fase == 2:
+                d[es_artificial] = 0.0
+
+            regla = regla_activa(precio)
+            col_entrada = elegir_entrada(regla, d, precio["pesos"], TOLERANCIA)
+            if col_entrada is None:
+                break
+
+            alfa = _ftran(factor, etas, columna(col_entrada))
+
+            # Prueba del cociente; en fase 2 una artificial básica en cero sale primero
+            candidatas = alfa > TOLERANCIA
+            cocientes = np.full(num_rest, np.inf)
+            cocientes[candidatas] = x_B[candidatas] / alfa[candidatas]
+            if fase == 2:
+                artificial_en_base = es_artificial[base] & (np.abs(alfa) > TOLERANCIA)
+                cocientes[artificial_en_base] = 0.0
+
+            if not np.isfinite(cocientes).any():
+                estado = "Problema no acotado"
+                break
+
+            fila_salida = elegir_salida(cocientes, base, regla)
+            theta = cocientes[fila_salida]
+            col_salida = base[fila_salida]
+
+            # Fila pivote α_r = e_rᵀ·B⁻¹·A (y, para steepest edge, a_jᵀ·B⁻ᵀ·α_q), con la base anterior
+            if regla in ["devex", "steepest_edge"]:
+                e_r = np.zeros(num_rest)
+                e_r[fila_salida] = 1.0
+                fila_pivote = producto_columnas(_btran(factor, etas, e_r))
+                if regla == "steepest_edge":
+                    producto_w = producto_columnas(_btran(factor, etas, alfa))
+            registrar_pivote(precio, theta)
+
+            # Actualizar la solución básica y la base
+            x_B -= theta * alfa
+            x_B[fila_salida] = theta
+            base[fila_salida] = col_entrada
+            etas.append((fila_salida, alfa))
+
+            if regla == "devex":
+                actualizar_devex(precio["pesos"], fila_pivote, col_entrada, col_salida)
+            elif regla == "steepest_edge":
+                no_basicas = np.ones(num_cols, dtype=bool)
+                no_basicas[base] = False
+                actualizar_steepest_edge(precio["pesos"], fila_pivote, producto_w, alfa,
+                                         col_entrada, col_salida, no_basicas)
+
+            if len(etas) >= FRECUENCIA_REFACTORIZACION:
+                factor = refactorizar()
+                etas = []
+                x_B = _ftran(factor, etas, b)
+
+            pasos.append({
+                "paso": iteracion,
+                "descripcion": "Iteración del simplex revisado",
+                "fase": fase,
+                "entra": nombres_columnas[col_entrada],
+                "sale": nombres_columnas[col_salida],
+                "fila_pivote_nombre": nombres_filas[fila_salida],
+                "valor_objetivo": float(costos[base] @ x_B)
+            })
+
+            iteracion += 1
+
+        if estado is not None:
+            break
+
+        # Al terminar la fase 1 las artificiales deben valer cero
+        if fase == 1:
+            infactibilidad = x_B[es_artificial[base]].sum()
+            if infactibilidad > 1e-7 * (1 + np.abs(b).max(initial=0)):
+                estado = "Problema sin solución factible"
+                break
+
+    # Si el presupuesto se agota en la fase 2, la base actual es factible y se
+    # devuelve como la mejor solución hallada
+    presupuesto_agotado = estado in ["Número máximo de iteraciones alcanzado", "Tiempo límite alcanzado"]
+    if estado is not None and not (presupuesto_agotado and fase == 2):
+        return {
+            "pasos": pasos,
+            "metodo": "revisado",
+            "resultado_final": {
+                "status_text": estado,
+                "valor_objetivo": None,
+                "variables": None,
+                "iteraciones": iteracion - 1,
+                "regla_precio": precio["regla"],
+                "cambio_a_bland": precio["cambio_a_bland"],
+                "arranque_en_caliente": arranque_en_caliente
+            }
+        }
+
+    # Extraer la solución final
+    x = np.zeros(num_cols)
+    x[base] = x_B
+    x[np.abs(x) < TOLERANCIA] = 0.0
+
+    resultado = {
+        "status_text": estado or "Óptimo",
+        "valor_objetivo": float(c @ x[:num_vars]),
+        "variables": [{"nombre": f"x{j+1}", "valor": float(x[j])} for j in range(num_vars)],
+        "iteraciones": iteracion - 1,
+        "regla_precio": precio["regla"],
+        "cambio_a_bland": precio["cambio_a_bland"],
+        "base": nombres_base(base, num_vars, operadores),
+        "arranque_en_caliente": arranque_en_caliente
+    }
+
+    return {
+        "pasos": pasos,
+        "metodo": "revisado",
+        "resultado_final": resultado
+    }
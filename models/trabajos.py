@@ -0,0 +1,221 @@
+import contextvars
+import json
+import logging
+import multiprocessing
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from models.ejecutor import PoolSaturado
+
+registro = logging.getLogger(__name__)
+
+# Estados de un trabajo: pendiente -> en_curso -> terminado | error
+ESTADOS_TRABAJO = ("pendiente", "en_curso", "terminado", "error")
+
+# Segundos que se conservan los trabajos terminados (o con error)
+CONSERVAR_TRABAJOS = 3600
+
+class AlmacenMemoria:
+    """
+    Almacén de trabajos en un diccionario del proceso del servidor. Los
+    trabajos se pierden al reiniciarlo.
+    """
+
+    def __init__(self):
+        self._trabajos = {}
+        self._cerrojo = threading.Lock()
+
+    def guardar(self, trabajo):
+        with self._cerrojo:
+            self._trabajos[trabajo["id"]] = dict(trabajo)
+
+    def actualizar(self, id_trabajo, **campos):
+        with self._cerrojo:
+            self._trabajos[id_trabajo].update(campos, actualizado=time.time())
+
+    def obtener(self, id_trabajo):
+        with self._cerrojo:
+            trabajo = self._trabajos.get(id_trabajo)
+            return dict(trabajo) if trabajo is not None else None
+
+    def contar_activos(self):
+        with self._cerrojo:
+            return sum(1 for t in self._trabajos.values() if t["estado"] in ("pendiente", "en_curso"))
+
+    def purgar(self, antes_de):
+        with self._cerrojo:
+            for id_trabajo in [i for i, t in self._trabajos.items()
+                               if t["estado"] in ("terminado", "error") and t["actualizado"] < antes_de]:
+                del self._trabajos[id_trabajo]
+
+class AlmacenSQLite:
+    """
+    Almacén de trabajos en un archivo SQLite: los resultados sobreviven a un
+    reinicio del servidor y varios procesos del servidor pueden compartirlo.
+    El progreso y el resultado se guardan como JSON.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        with self._conectar() as conexion:
+            conexion.execute("""
+                CREATE TABLE IF NOT EXISTS trabajos (
+                    id TEXT PRIMARY KEY,
+                    tipo TEXT NOT NULL,
+                    estado TEXT NOT NULL,
+                    progreso TEXT,
+                    resultado TEXT,
+                    error TEXT,
+                    creado REAL NOT NULL,
+                    actualizado REAL NOT NULL
+                )""")
+
+    def _conectar(self):
+        # Una conexión por operación: el almacén se usa desde varios hilos
+        return sqlite3.connect(self.ruta, timeout=10)
+
+    def guardar(self, trabajo):
+        with self._conectar() as conexion:
+            conexion.execute(
+                "INSERT INTO trabajos VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (trabajo["id"], trabajo["tipo"], trabajo["estado"], json.dumps(trabajo["progreso"]),
+                 json.dumps(trabajo["resultado"]), trabajo["error"], trabajo["creado"], trabajo["actualizado"]))
+
+    def actualizar(self, id_trabajo, **campos):
+        campos["actualizado"] = time.time()
+        for clave in ("progreso", "resultado"):
+            if clave in campos:
+                campos[clave] = json.dumps(campos[clave])
+        asignaciones = ", ".join(f"{clave} = ?" for clave in campos)
+        with self._conectar() as conexion:
+            conexion.execute(f"UPDATE trabajos SET {asignaciones} WHERE id = ?", (*campos.values(), id_trabajo))
+
+    def obtener(self, id_trabajo):
+        with self._conectar() as conexion:
+            conexion.row_factory = sqlite3.Row
+            fila = conexion.execute("SELECT * FROM trabajos WHERE id = ?", (id_trabajo,)).fetchone()
+        if fila is None:
+            return None
+        trabajo = dict(fila)
+        trabajo["progreso"] = json.loads(trabajo["progreso"])
+        trabajo["resultado"] = json.loads(trabajo["resultado"])
+        return trabajo
+
+    def contar_activos(self):
+        with self._conectar() as conexion:
+            return conexion.execute(
+                "SELECT COUNT(*) FROM trabajos WHERE estado IN ('pendiente', 'en_curso')").fetchone()[0]
+
+    def purgar(self, antes_de):
+        with self._conectar() as conexion:
+            conexion.execute("DELETE FROM trabajos WHERE estado IN ('terminado', 'error') AND actualizado < ?",
+                             (antes_de,))
+
+def ejecutar_con_progreso(funcion, datos, id_trabajo, progresos):
+    """
+    Ejecuta funcion(datos) (en un proceso del pool) publicando en
+    progresos[id_trabajo] la iteración y el valor del objetivo actuales.
+    """
+    def progreso(iteracion, valor_objetivo):
+        progresos[id_trabajo] = {"iteracion": iteracion, "valor_objetivo": valor_objetivo}
+
+    return funcion(dict(datos, progreso=progreso))
+
+class GestorTrabajos:
+    """
+    Trabajos en segundo plano sobre los solvers: enviar() devuelve un id al
+    instante y la resolución se ejecuta en el pool de procesos del ejecutor
+    cuando queda una plaza libre.
+
+    El progreso lo publican los procesos del pool en un diccionario compartido
+    (de multiprocessing.Manager) y se combina con el almacén al consultar.
+    """
+
+    def __init__(self, almacen, ejecutor, max_activos=100):
+        self.almacen = almacen
+        self.ejecutor = ejecutor
+        self.max_activos = max_activos
+        # Tantos trabajos en ejecución como procesos; el resto espera en la cola de hilos
+        self._hilos = ThreadPoolExecutor(max_workers=max(ejecutor.tamano, 1))
+        self._progresos = None
+        self._gestor_procesos = None
+        self._cerrojo = threading.Lock()
+
+    def enviar(self, tipo, funcion, datos, convertir=None):
+        """
+        Encola funcion(datos) y devuelve el id del trabajo.
+
+        Args:
+            tipo: Nombre del tipo de trabajo (se devuelve al consultarlo)
+            funcion: Función de resolución que recibe datos (debe poder enviarse a otro proceso)
+            convertir: (opcional) función aplicada al resultado antes de guardarlo
+
+        Raises:
+            PoolSaturado: Si ya hay max_activos trabajos pendientes o en curso
+        """
+        self.almacen.purgar(time.time() - CONSERVAR_TRABAJOS)
+        if self.almacen.contar_activos() >= self.max_activos:
+            raise PoolSaturado("Demasiados trabajos pendientes, inténtelo de nuevo más tarde", reintentar_en=30)
+
+        ahora = time.time()
+        trabajo = {
+            "id": uuid.uuid4().hex,
+            "tipo": tipo,
+            "estado": "pendiente",
+            "progreso": None,
+            "resultado": None,
+            "error": None,
+            "creado": ahora,
+            "actualizado": ahora
+        }
+        self.almacen.guardar(trabajo)
+        # El hilo del trabajo conserva el contexto de la petición (su id en los mensajes de registro)
+        self._hilos.submit(contextvars.copy_context().run, self._ejecutar, trabajo["id"], funcion, datos, convertir)
+        return trabajo["id"]
+
+    def consultar(self, id_trabajo):
+        """
+        Devuelve el trabajo (sin el resultado) con el progreso más reciente, o None si no existe.
+        """
+        trabajo = self.almacen.obtener(id_trabajo)
+        if trabajo is None:
+            return None
+        trabajo.pop("resultado")
+        if trabajo["estado"] == "en_curso" and self._progresos is not None:
+            trabajo["progreso"] = self._progresos.get(id_trabajo, trabajo["progreso"])
+        return trabajo
+
+    def resultado(self, id_trabajo):
+        return self.almacen.obtener(id_trabajo)
+
+    def _ejecutar(self, id_trabajo, funcion, datos, convertir):
+        progresos = self._obtener_progresos()
+        self.almacen.actualizar(id_trabajo, estado="en_curso")
+        try:
+            resultado = self.ejecutor.ejecutar(ejecutar_con_progreso, funcion, datos, id_trabajo, progresos,
+                                               esperar=True)
+            # resolver_modelo_lineal no lanza excepciones: devuelve el error en el resultado
+            if isinstance(resultado, dict) and resultado.get("error"):
+                raise ValueError(resultado["error"])
+            if convertir is not None:
+                resultado = convertir(resultado)
+            self.almacen.actualizar(id_trabajo, estado="terminado", resultado=resultado,
+                                    progreso=progresos.get(id_trabajo))
+        except Exception as e:
+            registro.warning("Trabajo %s terminado con error: %s", id_trabajo, e)
+            self.almacen.actualizar(id_trabajo, estado="error", error=str(e))
+        finally:
+            progresos.pop(id_trabajo, None)
+
+    def _obtener_progresos(self):
+        with self._cerrojo:
+            if self._progresos is None:
+                if self.ejecutor.tamano == 0:
+                    # Sin pool las resoluciones se hacen en este proceso
+                    self._progresos = {}
+                else:
+                    self._gestor_procesos = multiprocessing.get_context("spawn").Manager()
+                    self._progresos = self._gestor_procesos.dict()
+            return self._progresos
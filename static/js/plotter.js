@@ -0,0 +1,220 @@
+// Dibuja en un <canvas> la geometría del método gráfico (modo_grafico = "cliente"),
+// con el mismo contenido que la imagen que genera el servidor (models/grafico.py)
+(function() {
+    // Colores de las restricciones (los de la paleta por defecto de matplotlib)
+    const COLORES = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd',
+                     '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf'];
+    const MARGEN = {izquierda: 55, derecha: 20, arriba: 40, abajo: 45};
+    const FUENTE = '12px sans-serif';
+
+    // Paso "redondo" (1, 2 o 5 por una potencia de 10) para unas 5-10 marcas en el rango
+    function pasoMarcas(minimo, maximo) {
+        const bruto = (maximo - minimo) / 8;
+        const potencia = Math.pow(10, Math.floor(Math.log10(bruto)));
+        const relativo = bruto / potencia;
+        return potencia * (relativo < 1.5 ? 1 : relativo < 3.5 ? 2 : relativo < 7.5 ? 5 : 10);
+    }
+
+    function formatear(valor) {
+        return parseFloat(valor.toFixed(10)).toString();
+    }
+
+    function dibujar(lienzo, datos) {
+        const geometria = datos.geometria;
+        const [minimo, maximo] = geometria.limites;
+
+        // Tamaño en píxeles físicos para que se vea nítido en pantallas de alta densidad
+        const ancho = lienzo.clientWidth;
+        const alto = Math.round(ancho * 0.8);
+        const escala = window.devicePixelRatio || 1;
+        lienzo.style.height = alto + 'px';
+        lienzo.width = Math.round(ancho * escala);
+        lienzo.height = Math.round(alto * escala);
+        const ctx = lienzo.getContext('2d');
+        ctx.setTransform(escala, 0, 0, escala, 0, 0);
+        ctx.fillStyle = '#ffffff';
+        ctx.fillRect(0, 0, ancho, alto);
+
+        const area = {
+            x: MARGEN.izquierda, y: MARGEN.arriba,
+            ancho: ancho - MARGEN.izquierda - MARGEN.derecha,
+            alto: alto - MARGEN.arriba - MARGEN.abajo
+        };
+        const px = x => area.x + (x - minimo) / (maximo - minimo) * area.ancho;
+        const py = y => area.y + area.alto - (y - minimo) / (maximo - minimo) * area.alto;
+
+        // Rejilla y marcas de los ejes
+        const paso = pasoMarcas(minimo, maximo);
+        ctx.font = FUENTE;
+        ctx.lineWidth = 1;
+        for (let valor = Math.ceil(minimo / paso) * paso; valor <= maximo + paso * 1e-9; valor += paso) {
+            ctx.strokeStyle = '#b0b0b0';
+            ctx.beginPath();
+            ctx.moveTo(px(valor), area.y);
+            ctx.lineTo(px(valor), area.y + area.alto);
+            ctx.moveTo(area.x, py(valor));
+            ctx.lineTo(area.x + area.ancho, py(valor));
+            ctx.stroke();
+            ctx.fillStyle = '#000000';
+            ctx.textAlign = 'center';
+            ctx.textBaseline = 'top';
+            ctx.fillText(formatear(valor), px(valor), area.y + area.alto + 5);
+            ctx.textAlign = 'right';
+            ctx.textBaseline = 'middle';
+            ctx.fillText(formatear(valor), area.x - 5, py(valor));
+        }
+
+        // Todo lo que sigue queda recortado al área de los ejes
+        ctx.save();
+        ctx.beginPath();
+        ctx.rect(area.x, area.y, area.ancho, area.alto);
+        ctx.clip();
+
+        function segmento(puntos, color, grosor, opacidad, discontinua) {
+            ctx.globalAlpha = opacidad;
+            ctx.strokeStyle = color;
+            ctx.lineWidth = grosor;
+            ctx.setLineDash(discontinua ? [6, 4] : []);
+            ctx.beginPath();
+            ctx.moveTo(px(puntos[0][0]), py(puntos[0][1]));
+            ctx.lineTo(px(puntos[1][0]), py(puntos[1][1]));
+            ctx.stroke();
+            ctx.globalAlpha = 1;
+            ctx.setLineDash([]);
+        }
+
+        // Región factible
+        const leyenda = [];
+        if (geometria.region.length >= 3) {
+            ctx.globalAlpha = 0.2;
+            ctx.fillStyle = 'green';
+            ctx.beginPath();
+            geometria.region.forEach(([x, y], i) => i ? ctx.lineTo(px(x), py(y)) : ctx.moveTo(px(x), py(y)));
+            ctx.closePath();
+            ctx.fill();
+            ctx.globalAlpha = 1;
+        }
+
+        // Restricciones
+        geometria.restricciones.forEach(function(restriccion, i) {
+            if (restriccion.segmento) {
+                const color = COLORES[i % COLORES.length];
+                segmento(restriccion.segmento, color, 1.5, 1, true);
+                leyenda.push({texto: restriccion.etiqueta, color: color, discontinua: true});
+            }
+        });
+        if (geometria.region.length >= 3) {
+            leyenda.push({texto: 'Región Factible', color: 'green', relleno: true});
+        }
+
+        // Líneas de nivel de la función objetivo
+        geometria.lineas_nivel.forEach(function(linea) {
+            if (!linea.segmento) {
+                return;
+            }
+            if (linea.optima) {
+                segmento(linea.segmento, 'green', 2, 0.7, false);
+                leyenda.push({texto: 'F.O. = ' + linea.valor.toFixed(2), color: 'green'});
+            } else {
+                segmento(linea.segmento, 'green', 1, 0.3, false);
+            }
+        });
+
+        // Puntos de esquina y punto óptimo
+        function punto(x, y, color, radio) {
+            ctx.fillStyle = color;
+            ctx.beginPath();
+            ctx.arc(px(x), py(y), radio, 0, 2 * Math.PI);
+            ctx.fill();
+        }
+        ctx.textAlign = 'center';
+        ctx.textBaseline = 'bottom';
+        datos.puntos_esquina.forEach(function(p, i) {
+            punto(p.x, p.y, 'blue', 4);
+            ctx.fillStyle = '#000000';
+            ctx.fillText('P' + (i + 1) + '(' + p.x.toFixed(2) + ', ' + p.y.toFixed(2) + ')', px(p.x), py(p.y) - 8);
+        });
+        if (datos.punto_optimo) {
+            const p = datos.punto_optimo;
+            const texto = 'Óptimo (' + p.x.toFixed(2) + ', ' + p.y.toFixed(2) + ')';
+            punto(p.x, p.y, 'red', 6);
+            const medida = ctx.measureText(texto).width;
+            ctx.globalAlpha = 0.3;
+            ctx.fillStyle = 'yellow';
+            ctx.fillRect(px(p.x) - medida / 2 - 4, py(p.y) - 36, medida + 8, 18);
+            ctx.globalAlpha = 1;
+            ctx.fillStyle = '#000000';
+            ctx.fillText(texto, px(p.x), py(p.y) - 21);
+        }
+        ctx.restore();
+
+        // Marco de los ejes, etiquetas y título
+        ctx.strokeStyle = '#000000';
+        ctx.lineWidth = 1;
+        ctx.strokeRect(area.x, area.y, area.ancho, area.alto);
+        ctx.fillStyle = '#000000';
+        ctx.textAlign = 'center';
+        ctx.textBaseline = 'bottom';
+        ctx.fillText('x₁', area.x + area.ancho / 2, alto - 5);
+        ctx.font = '14px sans-serif';
+        ctx.fillText(geometria.titulo, area.x + area.ancho / 2, area.y - 10);
+        ctx.save();
+        ctx.font = FUENTE;
+        ctx.translate(15, area.y + area.alto / 2);
+        ctx.rotate(-Math.PI / 2);
+        ctx.textBaseline = 'middle';
+        ctx.fillText('x₂', 0, 0);
+        ctx.restore();
+
+        // Leyenda en la esquina superior derecha
+        ctx.font = FUENTE;
+        const anchoLeyenda = Math.max(...leyenda.map(e => ctx.measureText(e.texto).width), 0) + 45;
+        const xLeyenda = area.x + area.ancho - anchoLeyenda - 5;
+        ctx.globalAlpha = 0.8;
+        ctx.fillStyle = '#ffffff';
+        ctx.fillRect(xLeyenda, area.y + 5, anchoLeyenda, leyenda.length * 18 + 8);
+        ctx.globalAlpha = 1;
+        ctx.strokeStyle = '#cccccc';
+        ctx.strokeRect(xLeyenda, area.y + 5, anchoLeyenda, leyenda.length * 18 + 8);
+        ctx.textAlign = 'left';
+        ctx.textBaseline = 'middle';
+        leyenda.forEach(function(entrada, i) {
+            const y = area.y + 18 + i * 18;
+            if (entrada.relleno) {
+                ctx.globalAlpha = 0.2;
+                ctx.fillStyle = entrada.color;
+                ctx.fillRect(xLeyenda + 8, y - 5, 25, 10);
+                ctx.globalAlpha = 1;
+            } else {
+                ctx.strokeStyle = entrada.color;
+                ctx.lineWidth = 2;
+                ctx.setLineDash(entrada.discontinua ? [6, 4] : []);
+                ctx.beginPath();
+                ctx.moveTo(xLeyenda + 8, y);
+                ctx.lineTo(xLeyenda + 33, y);
+                ctx.stroke();
+                ctx.setLineDash([]);
+            }
+            ctx.fillStyle = '#000000';
+            ctx.fillText(entrada.texto, xLeyenda + 40, y);
+        });
+    }
+
+    document.addEventListener('DOMContentLoaded', function() {
+        const lienzo = document.getElementById('lienzoGrafico');
+        const fuente = document.getElementById('geometriaGrafico');
+        if (!lienzo || !fuente) {
+            return;
+        }
+        const datos = JSON.parse(fuente.textContent);
+        try {
+            dibujar(lienzo, datos);
+        } catch (e) {
+            // Sin soporte de canvas: queda visible la alternativa con la imagen del servidor
+            console.error(e);
+            return;
+        }
+        document.getElementById('alternativaGrafico').hidden = true;
+        window.addEventListener('resize', () => dibujar(lienzo, datos));
+    });
+})();
@@ -0,0 +1,35 @@
+import pytest
+
+import app
+from models.ejecutor import EjecutorResoluciones
+
+FORMULARIO = {
+    "num_variables": "2", "num_restricciones": "3", "tipo_operacion": "maximizar",
+    "obj_coef_1": "3", "obj_coef_2": "5",
+    "rest_coef_1_1": "1", "rest_coef_1_2": "0", "operador_1": "<=", "lado_derecho_1": "4",
+    "rest_coef_2_1": "0", "rest_coef_2_2": "2", "operador_2": "<=", "lado_derecho_2": "12",
+    "rest_coef_3_1": "3", "rest_coef_3_2": "2", "operador_3": "<=", "lado_derecho_3": "18"
+}
+
+@pytest.fixture
+def pool_saturado(monkeypatch):
+    # Sin caché y con la única plaza del ejecutor ocupada: todo lo que pase por el pool da 503
+    ejecutor = EjecutorResoluciones(tamano=0, max_cola=0)
+    ejecutor._plazas.acquire()
+    monkeypatch.setattr(app, "ejecutor", ejecutor)
+    monkeypatch.setattr(app, "cache", None)
+    return app.app.test_client()
+
+def test_modelo_pequeno_con_pool_saturado(pool_saturado):
+    # La resolución y la geometría del gráfico de un modelo pequeño no esperan al pool
+    respuesta = pool_saturado.post("/resolver", data=FORMULARIO)
+    assert respuesta.status_code == 200
+    assert "36" in respuesta.get_data(as_text=True)
+
+def test_api_geometria_con_pool_saturado(pool_saturado):
+    cuerpo = {"objetivo": [3, 5], "restricciones": [[1, 0], [0, 2], [3, 2]], "lados_derechos": [4, 12, 18]}
+    respuesta = pool_saturado.post("/api/v1/solve", json=dict(cuerpo, grafico="cliente"))
+    assert respuesta.status_code == 200
+    assert respuesta.get_json()["metodo_grafico"]["error"] is None
+    # La imagen sí se dibuja en el pool
+    assert pool_saturado.post("/api/v1/solve", json=dict(cuerpo, grafico="imagen")).status_code == 503
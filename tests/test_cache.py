@@ -0,0 +1,140 @@
+import os
+import pickle
+
+import pytest
+
+import app
+from models.cache import CacheResultados, huella_modelo
+
+MODELO = {
+    "num_variables": 2,
+    "num_restricciones": 2,
+    "coef_objetivo": [3, 5],
+    "tipo_operacion": "maximizar",
+    "coef_restricciones": [[1, 0], [3, 2]],
+    "operadores": ["<=", "<="],
+    "lados_derechos": [4, 18]
+}
+
+def tamano(valor):
+    return len(pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL))
+
+def test_huella_canonica():
+    clave = huella_modelo(MODELO, "resultado")
+    # La misma matriz en COO, con -0.0 y con enteros como float
+    dispersa = dict(MODELO, coef_restricciones={"filas": [0, 1, 1], "columnas": [0, 0, 1], "valores": [1, 3, 2]})
+    assert huella_modelo(dispersa, "resultado") == clave
+    assert huella_modelo(dict(MODELO, coef_restricciones=[[1.0, -0.0], [3.0, 2.0]]), "resultado") == clave
+    assert huella_modelo(dict(MODELO, lados_derechos=[4.0, 18.0]), "resultado") == clave
+    # Otro espacio, otro modelo u otra opción que afecta al resultado: otra clave
+    assert huella_modelo(MODELO, "pasos") != clave
+    assert huella_modelo(dict(MODELO, lados_derechos=[4, 19]), "resultado") != clave
+    assert huella_modelo(dict(MODELO, regla_precio="bland"), "resultado") != clave
+
+@pytest.mark.parametrize("espacio", ("resultado", "pasos"))
+def test_huella_con_base_inicial(espacio):
+    clave = huella_modelo(MODELO, espacio)
+    con_base = huella_modelo(dict(MODELO, base_inicial=["x1", "x2"]), espacio)
+    assert con_base != clave
+    assert huella_modelo(dict(MODELO, base_inicial=["h1", "x2"]), espacio) not in (clave, con_base)
+
+def test_huella_ignora_opciones_ajenas():
+    # El tiempo límite no forma parte de la clave (esos resultados no se guardan) ni
+    # el modo de traza cambia un resultado final
+    clave = huella_modelo(MODELO, "resultado")
+    assert huella_modelo(dict(MODELO, tiempo_limite=5, modo_traza="pivotes"), "resultado") == clave
+    assert huella_modelo(dict(MODELO, base_inicial=["x1", "x2"]), "grafico") == huella_modelo(MODELO, "grafico")
+
+def test_expulsion_lru():
+    valor = {"datos": "x" * 100}
+    cache = CacheResultados(max_bytes=3 * tamano(valor))
+    for clave in ("a", "b", "c"):
+        cache.guardar("resultado", clave, valor)
+    # "a" pasa a ser la más reciente: al entrar "d" se expulsa "b"
+    assert cache.obtener("resultado", "a") is not None
+    cache.guardar("resultado", "d", valor)
+    assert cache.obtener("resultado", "b") is None
+    for clave in ("a", "c", "d"):
+        assert cache.obtener("resultado", clave) == valor
+    assert cache.estadisticas()["entradas"] == 3
+
+def test_limite_de_bytes():
+    cache = CacheResultados(max_bytes=1000)
+    for i in range(50):
+        cache.guardar("resultado", str(i), list(range(i)))
+        assert cache.estadisticas()["bytes"] <= 1000
+    # Un valor mayor que toda la caché no se guarda ni expulsa a los demás
+    entradas = cache.estadisticas()["entradas"]
+    cache.guardar("resultado", "grande", "x" * 2000)
+    assert cache.obtener("resultado", "grande") is None
+    assert cache.estadisticas()["entradas"] == entradas
+
+def test_copias_independientes():
+    cache = CacheResultados()
+    cache.guardar("resultado", "a", {"variables": [1, 2]})
+    cache.obtener("resultado", "a")["variables"].append(3)
+    assert cache.obtener("resultado", "a") == {"variables": [1, 2]}
+
+def test_contadores():
+    cache = CacheResultados()
+    cache.obtener("resultado", "a")
+    cache.guardar("resultado", "a", 1)
+    cache.obtener("resultado", "a")
+    cache.obtener("resultado", "a")
+    cache.obtener("imagen", "b")
+    espacios = cache.estadisticas()["espacios"]
+    assert espacios["resultado"] == {"aciertos": 2, "fallos": 1}
+    assert espacios["imagen"] == {"aciertos": 0, "fallos": 1}
+    assert espacios["pasos"] == {"aciertos": 0, "fallos": 0}
+
+def test_persistencia_en_disco(tmp_path):
+    CacheResultados(directorio=str(tmp_path)).guardar("resultado", "a", {"valor_objetivo": 36.0})
+    assert os.listdir(tmp_path) == ["a.pkl"]
+
+    # Otra instancia (un reinicio) la lee del disco y la sube a memoria
+    nueva = CacheResultados(directorio=str(tmp_path))
+    assert nueva.obtener("resultado", "a") == {"valor_objetivo": 36.0}
+    assert nueva.estadisticas()["entradas"] == 1
+    assert nueva.estadisticas()["espacios"]["resultado"] == {"aciertos": 1, "fallos": 0}
+    nueva.vaciar()
+    assert nueva.obtener("resultado", "a") == {"valor_objetivo": 36.0}
+
+def test_limite_de_bytes_en_disco(tmp_path):
+    valor = "x" * 100
+    cache = CacheResultados(directorio=str(tmp_path), max_bytes_disco=2 * tamano(valor))
+    for clave in ("a", "b", "c"):
+        cache.guardar("resultado", clave, valor)
+        # Fechas de modificación distintas para el orden LRU en disco
+        os.utime(tmp_path / f"{clave}.pkl", (len(os.listdir(tmp_path)),) * 2)
+    assert sorted(os.listdir(tmp_path)) == ["b.pkl", "c.pkl"]
+
+@pytest.fixture
+def cache_app(monkeypatch):
+    cache = CacheResultados()
+    monkeypatch.setattr(app, "cache", cache)
+    return cache
+
+@pytest.mark.parametrize("resultado, guardado", [
+    ({"status_text": "Óptimo", "error": None}, True),
+    ({"resultado_final": {"status_text": "Óptimo"}}, True),
+    ({"status_text": None, "error": "Backend desconocido: x"}, False),
+    ({"status_text": "Tiempo límite alcanzado", "error": None}, False),
+    ({"resultado_final": {"status_text": "Tiempo límite alcanzado"}}, False)
+])
+def test_ejecutar_en_cache(cache_app, resultado, guardado):
+    llamadas = []
+
+    def funcion(datos):
+        llamadas.append(datos)
+        return resultado
+
+    for _ in range(2):
+        assert app.ejecutar_en_cache("resultado", funcion, MODELO, directo=True) == resultado
+    assert len(llamadas) == (1 if guardado else 2)
+    assert (cache_app.obtener("resultado", huella_modelo(MODELO, "resultado")) is not None) == guardado
+
+def test_ejecutar_en_cache_no_guarda_errores_del_solver(cache_app):
+    datos = dict(MODELO, backend="desconocido")
+    resultado = app.ejecutar_en_cache("resultado", app.resolver_modelo_lineal, datos, directo=True)
+    assert resultado["error"]
+    assert cache_app.estadisticas()["entradas"] == 0
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from models.grafico import semiplanos, interseccion_semiplanos
+
+NO_NEGATIVIDAD = [(1, 0, 0, ">="), (0, 1, 0, ">=")]
+
+def poligono(restricciones):
+    return interseccion_semiplanos(*semiplanos(restricciones))
+
+def esquinas(vertices, reales):
+    return sorted((round(x, 9) + 0.0, round(y, 9) + 0.0) for (x, y), real in zip(vertices.tolist(), reales) if real)
+
+def area_con_signo(vertices):
+    x, y = vertices[:, 0], vertices[:, 1]
+    return (x @ np.roll(y, -1) - y @ np.roll(x, -1)) / 2
+
+@pytest.mark.parametrize("restricciones, esperadas", [
+    # Wyndor: x <= 4, 2y <= 12, 3x + 2y <= 18
+    ([(1, 0, 4, "<="), (0, 2, 12, "<="), (3, 2, 18, "<=")] + NO_NEGATIVIDAD,
+     [(0, 0), (0, 6), (2, 6), (4, 0), (4, 3)]),
+    # x <= 1, y <= 1 y x + y <= 2 pasan por (1, 1): un solo vértice
+    ([(1, 0, 1, "<="), (0, 1, 1, "<="), (1, 1, 2, "<=")] + NO_NEGATIVIDAD,
+     [(0, 0), (0, 1), (1, 0), (1, 1)]),
+    # x + y <= 3 repetida como 2x + 2y <= 6 y una paralela redundante x + y <= 5
+    ([(1, 1, 3, "<="), (2, 2, 6, "<="), (1, 1, 5, "<=")] + NO_NEGATIVIDAD,
+     [(0, 0), (0, 3), (3, 0)])
+])
+def test_region_acotada(restricciones, esperadas):
+    vertices, reales = poligono(restricciones)
+    assert reales.all()
+    assert esquinas(vertices, reales) == esperadas
+    assert len(vertices) == len(esperadas)
+    # Sentido antihorario
+    assert area_con_signo(vertices) > 0
+
+def test_region_no_acotada():
+    # x + y >= 2 con x, y >= 0: esquinas (2, 0) y (0, 2); el resto es del cuadrado auxiliar
+    vertices, reales = poligono([(1, 1, 2, ">=")] + NO_NEGATIVIDAD)
+    assert esquinas(vertices, reales) == [(0, 2), (2, 0)]
+    auxiliares = vertices[~reales]
+    assert len(auxiliares) > 0
+    limite = np.abs(auxiliares).max()
+    assert limite > 2
+    assert np.isclose(np.abs(auxiliares).max(axis=1), limite).all()
+    assert area_con_signo(vertices) > 0
+
+@pytest.mark.parametrize("restricciones", [
+    [(1, 1, 1, "<="), (1, 1, 3, ">=")] + NO_NEGATIVIDAD,
+    [(1, 0, -1, ">="), (1, 0, -2, "<=")],
+    [(1, 1, 4, "="), (1, 1, 5, "=")],
+    # Semiplano sin recta que no se cumple nunca: 0x + 0y <= -1
+    [(0, 0, -1, "<="), (1, 1, 2, "<=")] + NO_NEGATIVIDAD
+])
+def test_region_infactible(restricciones):
+    vertices, reales = poligono(restricciones)
+    assert vertices.shape == (0, 2)
+    assert reales.shape == (0,)
+
+def test_restriccion_de_igualdad():
+    # x + y = 4 con x <= 3: el segmento de (3, 1) a (0, 4)
+    vertices, reales = poligono([(1, 1, 4, "="), (1, 0, 3, "<=")] + NO_NEGATIVIDAD)
+    assert reales.all()
+    assert esquinas(vertices, reales) == [(0, 4), (3, 1)]
+
+def test_dos_igualdades():
+    vertices, reales = poligono([(1, 0, 1, "="), (0, 1, 2, "=")])
+    assert vertices.tolist() == [[1, 2]]
+    assert reales.tolist() == [True]
+
+def test_normal_nula_que_se_cumple():
+    # 0x + 0y <= 5 y 0x + 0y >= -2 no tienen recta y no recortan la región
+    base = [(1, 1, 2, "<=")] + NO_NEGATIVIDAD
+    vertices, reales = poligono([(0, 0, 5, "<="), (0, 0, -2, ">=")] + base)
+    assert esquinas(vertices, reales) == esquinas(*poligono(base)) == [(0, 0), (0, 2), (2, 0)]
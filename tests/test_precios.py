@@ -0,0 +1,53 @@
+import pytest
+
+from models.precios import REGLAS_PRECIO
+from models.simplex import metodo_gran_m, resolver_simplex_paso_a_paso
+
+# Modelos degenerados (todos los lados derechos son 0, así que x = 0 es factible) y no
+# acotados: con la regla indicada encadenan más de MAX_PIVOTES_DEGENERADOS pivotes
+# degenerados y terminan con la regla de Bland
+MODELOS_DEGENERADOS = {
+    "dantzig": {
+        "num_variables": 5,
+        "num_restricciones": 5,
+        "coef_objetivo": [-2, 1, 3, 2, 1],
+        "tipo_operacion": "maximizar",
+        "coef_restricciones": [
+            [1, 3, 2, -2, 2],
+            [1, 0, 3, -3, 0],
+            [-2, -3, -2, 3, 0],
+            [0, 3, 2, 0, 3],
+            [1, -1, 3, -1, 1]
+        ],
+        "operadores": [">=", "<=", ">=", ">=", ">="],
+        "lados_derechos": [0, 0, 0, 0, 0]
+    },
+    "devex": {
+        "num_variables": 4,
+        "num_restricciones": 4,
+        "coef_objetivo": [1, -2, 1, -3],
+        "tipo_operacion": "maximizar",
+        "coef_restricciones": [
+            [3, -3, 2, 3],
+            [2, -2, -3, 0],
+            [2, 0, 2, -1],
+            [2, -3, 3, 3]
+        ],
+        "operadores": [">=", "<=", ">=", ">="],
+        "lados_derechos": [0, 0, 0, 0]
+    }
+}
+
+@pytest.mark.parametrize("regla", sorted(MODELOS_DEGENERADOS))
+def test_cambio_a_bland_en_modelo_degenerado(regla):
+    resultado = metodo_gran_m(dict(MODELOS_DEGENERADOS[regla], regla_precio=regla))["resultado_final"]
+    assert resultado["cambio_a_bland"]
+    assert resultado["status_text"] == "Problema no acotado"
+
+@pytest.mark.parametrize("modelo", sorted(MODELOS_DEGENERADOS))
+@pytest.mark.parametrize("regla", REGLAS_PRECIO)
+@pytest.mark.parametrize("metodo", ("gran_m", "dos_fases", "revisado"))
+def test_degenerado_factible_no_acotado(modelo, regla, metodo):
+    datos = dict(MODELOS_DEGENERADOS[modelo], regla_precio=regla, metodo=metodo)
+    resultado = resolver_simplex_paso_a_paso(datos)["resultado_final"]
+    assert resultado["status_text"] == "Problema no acotado"
@@ -0,0 +1,119 @@
+import numpy as np
+import pytest
+
+from models.lineal import resolver_modelo_lineal
+from models.presolve import presolve
+
+# Un modelo por reducción, con óptimo primal y dual únicos: con y sin presolve deben
+# coincidir el estado, el objetivo, x, los precios sombra y los costos reducidos
+MODELOS_REDUCIBLES = {
+    "filas_vacias": {
+        "num_variables": 2,
+        "num_restricciones": 3,
+        "coef_objetivo": [3, 2],
+        "tipo_operacion": "maximizar",
+        "coef_restricciones": [[1, 1], [0, 0], [1, 3]],
+        "operadores": ["<=", "<=", "<="],
+        "lados_derechos": [4, 5, 6]
+    },
+    # x1 >= 1 activa: su precio sombra sale del costo reducido de x1 en el modelo reducido
+    "cotas_inferiores": {
+        "num_variables": 2,
+        "num_restricciones": 2,
+        "coef_objetivo": [3, 2],
+        "tipo_operacion": "minimizar",
+        "coef_restricciones": [[1, 1], [1, 0]],
+        "operadores": [">=", ">="],
+        "lados_derechos": [4, 1]
+    },
+    # 2·x2 = 6 fija x2 = 3 y 2·x3 <= 0 fija x3 = 0
+    "variables_fijas": {
+        "num_variables": 3,
+        "num_restricciones": 4,
+        "coef_objetivo": [2, 3, 1],
+        "tipo_operacion": "maximizar",
+        "coef_restricciones": [[1, 1, 1], [0, 2, 0], [1, 0, 2], [0, 0, 2]],
+        "operadores": ["<=", "=", "<=", "<="],
+        "lados_derechos": [10, 6, 8, 0]
+    },
+    # La segunda fila es la primera por 2 con un lado derecho más holgado
+    "filas_duplicadas": {
+        "num_variables": 2,
+        "num_restricciones": 3,
+        "coef_objetivo": [1, 2],
+        "tipo_operacion": "maximizar",
+        "coef_restricciones": [[1, 1], [2, 2], [0, 1]],
+        "operadores": ["<=", "<=", "<="],
+        "lados_derechos": [4, 10, 3]
+    },
+    # x3 no aparece en ninguna restricción y empeora el objetivo: se fija en 0
+    "columnas_vacias": {
+        "num_variables": 3,
+        "num_restricciones": 2,
+        "coef_objetivo": [1, 1, 2],
+        "tipo_operacion": "minimizar",
+        "coef_restricciones": [[1, 2, 0], [3, 1, 0]],
+        "operadores": [">=", ">="],
+        "lados_derechos": [4, 6]
+    }
+}
+
+def resolver(datos, backend, presolve_activo):
+    resultado = resolver_modelo_lineal(dict(datos, backend=backend, presolve=presolve_activo))
+    assert resultado["error"] is None
+    return resultado
+
+@pytest.mark.parametrize("backend", ("numpy", "cbc"))
+@pytest.mark.parametrize("accion", sorted(MODELOS_REDUCIBLES))
+def test_presolve_no_cambia_el_resultado(accion, backend):
+    datos = MODELOS_REDUCIBLES[accion]
+    _, reduccion = presolve(datos)
+    assert reduccion["informe"]["acciones"][accion] > 0
+
+    con = resolver(datos, backend, True)
+    sin = resolver(datos, backend, False)
+    assert con["status_text"] == sin["status_text"] == "Óptimo"
+    assert con["valor_objetivo"] == pytest.approx(sin["valor_objetivo"])
+    np.testing.assert_allclose([v["valor"] for v in con["variables"]],
+                               [v["valor"] for v in sin["variables"]], atol=1e-9)
+
+    # Precios sombra y costos reducidos del modelo completo, también de las filas eliminadas
+    for clave, campo in (("restricciones", "precio_sombra"), ("variables", "costo_reducido")):
+        np.testing.assert_allclose([r[campo] for r in con["sensibilidad"][clave]],
+                                   [r[campo] for r in sin["sensibilidad"][clave]], atol=1e-9)
+
+@pytest.mark.parametrize("accion", sorted(MODELOS_REDUCIBLES))
+def test_base_completada_por_postsolve(accion):
+    datos = MODELOS_REDUCIBLES[accion]
+    con = resolver(datos, "numpy", True)
+    # Una base del modelo original: una columna por restricción, válida para reoptimizar
+    assert len(con["base"]) == datos["num_restricciones"]
+    caliente = resolver_modelo_lineal(dict(datos, backend="numpy", base_inicial=con["base"]))
+    assert caliente["arranque_en_caliente"]
+    assert caliente["iteraciones"] == 0
+    assert caliente["valor_objetivo"] == pytest.approx(con["valor_objetivo"])
+
+@pytest.mark.parametrize("datos, estado", [
+    # x1 <= -1 como fila singleton
+    ({"num_variables": 2, "num_restricciones": 2, "coef_objetivo": [1, 1], "tipo_operacion": "maximizar",
+      "coef_restricciones": [[1, 1], [1, 0]], "operadores": ["<=", "<="], "lados_derechos": [4, -1]},
+     "Problema sin solución factible"),
+    # 0 >= 2 como fila vacía
+    ({"num_variables": 2, "num_restricciones": 2, "coef_objetivo": [1, 1], "tipo_operacion": "maximizar",
+      "coef_restricciones": [[1, 1], [0, 0]], "operadores": ["<=", ">="], "lados_derechos": [4, 2]},
+     "Problema sin solución factible"),
+    # Filas paralelas incompatibles: x1 + x2 >= 5 y 2·x1 + 2·x2 <= 6
+    ({"num_variables": 2, "num_restricciones": 2, "coef_objetivo": [1, 1], "tipo_operacion": "minimizar",
+      "coef_restricciones": [[1, 1], [2, 2]], "operadores": [">=", "<="], "lados_derechos": [5, 6]},
+     "Problema sin solución factible"),
+    # Tras quitar la cota inferior de x1 no queda ninguna fila y x2 mejora el objetivo sin límite
+    ({"num_variables": 2, "num_restricciones": 1, "coef_objetivo": [-1, 1], "tipo_operacion": "maximizar",
+      "coef_restricciones": [[1, 0]], "operadores": [">="], "lados_derechos": [2]},
+     "Problema no acotado")
+])
+def test_presolve_decide_el_estado(datos, estado):
+    _, reduccion = presolve(datos)
+    assert reduccion["estado"] == estado
+    con = resolver(datos, "numpy", True)
+    assert con["backend"] == "presolve"
+    assert con["status_text"] == resolver(datos, "numpy", False)["status_text"] == estado
@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+
+from models.backends import resolver_con_cbc
+from models.sensibilidad import analisis_sensibilidad
+from models.simplex_revisado import metodo_simplex_revisado
+
+inf = np.inf
+
+# Ejemplo de Wyndor Glass (Hillier y Lieberman): óptimo (2, 6) con z = 36
+WYNDOR = {
+    "num_variables": 2,
+    "num_restricciones": 3,
+    "coef_objetivo": [3, 5],
+    "tipo_operacion": "maximizar",
+    "coef_restricciones": [[1, 0], [0, 2], [3, 2]],
+    "operadores": ["<=", "<=", "<="],
+    "lados_derechos": [4, 12, 18]
+}
+
+# min 2·x1 + 3·x2 + 4·x3 con x1 + x2 + x3 >= 4 y x1 - x2 = 1: óptimo (2.5, 1.5, 0)
+# con base {x1, x2}. De y·B = c_B, y = (2.5, -0.5); x1 = (b1 + b2)/2 y
+# x2 = (b1 - b2)/2 siguen no negativas con b1 >= 1 y -4 <= b2 <= 4
+MINIMIZACION = {
+    "num_variables": 3,
+    "num_restricciones": 2,
+    "coef_objetivo": [2, 3, 4],
+    "tipo_operacion": "minimizar",
+    "coef_restricciones": [[1, 1, 1], [1, -1, 0]],
+    "operadores": [">=", "="],
+    "lados_derechos": [4, 1]
+}
+
+def sensibilidad(datos):
+    resultado = metodo_simplex_revisado(dict(datos))["resultado_final"]
+    assert resultado["status_text"] == "Óptimo"
+    return resultado, analisis_sensibilidad(datos, resultado["base"])
+
+def campo(filas, nombre):
+    return [fila[nombre] for fila in filas]
+
+def test_wyndor():
+    _, analisis = sensibilidad(WYNDOR)
+    restricciones, variables = analisis["restricciones"], analisis["variables"]
+    assert campo(restricciones, "precio_sombra") == pytest.approx([0, 1.5, 1])
+    assert campo(restricciones, "holgura") == pytest.approx([2, 0, 0])
+    assert campo(restricciones, "rango_lado_derecho") == [pytest.approx(r) for r in ([2, inf], [6, 18], [12, 24])]
+    assert campo(variables, "valor") == pytest.approx([2, 6])
+    assert campo(variables, "costo_reducido") == pytest.approx([0, 0])
+    assert campo(variables, "rango_coeficiente") == [pytest.approx(r) for r in ([0, 7.5], [2, inf])]
+
+def test_minimizacion_con_mayor_o_igual_e_igualdad():
+    resultado, analisis = sensibilidad(MINIMIZACION)
+    assert resultado["valor_objetivo"] == pytest.approx(9.5)
+    restricciones, variables = analisis["restricciones"], analisis["variables"]
+    assert campo(restricciones, "precio_sombra") == pytest.approx([2.5, -0.5])
+    assert campo(restricciones, "holgura") == pytest.approx([0, 0])
+    assert campo(restricciones, "rango_lado_derecho") == [pytest.approx(r) for r in ([1, inf], [-4, 4])]
+    assert campo(variables, "valor") == pytest.approx([2.5, 1.5, 0])
+    # x3: 4 - 2.5 = 1.5; puede bajar hasta 2.5 antes de entrar en la base
+    assert campo(variables, "costo_reducido") == pytest.approx([0, 0, 1.5])
+    assert campo(variables, "rango_coeficiente") == [pytest.approx(r) for r in ([-3, 5], [-2, 6], [2.5, inf])]
+
+@pytest.mark.parametrize("datos", [WYNDOR, MINIMIZACION])
+def test_precio_sombra_como_variacion_del_objetivo(datos):
+    # Dentro del rango del lado derecho, el objetivo cambia en precio_sombra por unidad
+    resultado, analisis = sensibilidad(datos)
+    for i, fila in enumerate(analisis["restricciones"]):
+        inferior, superior = fila["rango_lado_derecho"]
+        delta = min(0.5, (superior - datos["lados_derechos"][i]) / 2)
+        if delta <= 0:
+            continue
+        lados_derechos = list(datos["lados_derechos"])
+        lados_derechos[i] += delta
+        variado = metodo_simplex_revisado(dict(datos, lados_derechos=lados_derechos))["resultado_final"]
+        assert variado["valor_objetivo"] - resultado["valor_objetivo"] == pytest.approx(fila["precio_sombra"] * delta)
+
+def modelo_no_degenerado(semilla):
+    """
+    Modelo aleatorio con restricciones mixtas cuyo óptimo no es degenerado ni
+    en el primal ni en el dual (precios sombra y costos reducidos únicos), o None.
+    """
+    rng = np.random.default_rng(semilla)
+    num_vars, num_rest = int(rng.integers(2, 6)), int(rng.integers(2, 6))
+    datos = {
+        "num_variables": num_vars,
+        "num_restricciones": num_rest,
+        "coef_objetivo": rng.integers(-3, 8, num_vars).astype(float).tolist(),
+        "tipo_operacion": str(rng.choice(["maximizar", "minimizar"])),
+        "coef_restricciones": rng.integers(-2, 6, (num_rest, num_vars)).astype(float).tolist(),
+        "operadores": [str(op) for op in rng.choice(["<=", ">=", "="], num_rest, p=[0.5, 0.3, 0.2])],
+        "lados_derechos": rng.integers(1, 15, num_rest).astype(float).tolist()
+    }
+    resultado = metodo_simplex_revisado(dict(datos))["resultado_final"]
+    if resultado["status_text"] != "Óptimo" or any(nombre.startswith("a") for nombre in resultado["base"]):
+        return None
+    analisis = analisis_sensibilidad(datos, resultado["base"])
+    x = {v["nombre"]: v["valor"] for v in analisis["variables"]}
+    holguras = {f"h{r['restriccion']}": r["holgura"] for r in analisis["restricciones"]}
+    basicas = [x.get(nombre, holguras.get(nombre)) for nombre in resultado["base"]]
+    no_basicas = [v["costo_reducido"] for v in analisis["variables"] if v["nombre"] not in resultado["base"]]
+    no_basicas += [r["precio_sombra"] for r in analisis["restricciones"]
+                   if r["operador"] != "=" and f"h{r['restriccion']}" not in resultado["base"]]
+    if min(map(abs, basicas + no_basicas)) < 1e-6:
+        return None
+    return datos, analisis
+
+def test_precios_y_costos_reducidos_como_cbc():
+    comparados, cubiertos = 0, set()
+    for semilla in range(200):
+        modelo = modelo_no_degenerado(semilla)
+        if modelo is None:
+            continue
+        datos, analisis = modelo
+        cbc = resolver_con_cbc(dict(datos))["sensibilidad"]
+        for clave, nombre in (("restricciones", "precio_sombra"), ("variables", "costo_reducido")):
+            np.testing.assert_allclose(campo(analisis[clave], nombre), campo(cbc[clave], nombre),
+                                       atol=1e-6, err_msg=f"semilla {semilla}")
+        comparados += 1
+        cubiertos.update(datos["operadores"] + [datos["tipo_operacion"]])
+    # Que el filtro de degeneración no deje la comparación vacía ni sin algún tipo de fila
+    assert comparados >= 20
+    assert cubiertos == {"<=", ">=", "=", "maximizar", "minimizar"}
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from models.simplex import resolver_simplex_paso_a_paso, paso_con_tablas, metodo_gran_m
+
+# Modelos en los que una columna de la Gran M no tiene cocientes finitos mientras
+# quedan artificiales positivas: la fase 1 de las dos fases decide el estado
+NO_ACOTADO_CON_ARTIFICIALES = {
+    "num_variables": 2,
+    "num_restricciones": 2,
+    "coef_objetivo": [1, -3],
+    "tipo_operacion": "maximizar",
+    "coef_restricciones": [[0, 3], [1, 3]],
+    "operadores": ["=", ">="],
+    "lados_derechos": [5, -3],
+    "regla_precio": "bland"
+}
+INFACTIBLE_CON_ARTIFICIALES = {
+    "num_variables": 3,
+    "num_restricciones": 4,
+    "coef_objetivo": [3, 0, 4],
+    "tipo_operacion": "maximizar",
+    "coef_restricciones": [[-3, -1, 0], [-4, -2, 1], [-3, 4, -4], [3, 4, 0]],
+    "operadores": ["=", ">=", "<=", "="],
+    "lados_derechos": [5, -1, -1, 7]
+}
+
+def modelo_aleatorio(semilla, metodo):
+    """
+    Modelo pequeño que el método admite: solo <= con lados derechos no negativos
+    para el Simplex estándar, dual factible (minimizar con costos no negativos,
+    sin igualdades) para el dual y restricciones mixtas para el resto.
+    """
+    rng = np.random.default_rng(semilla)
+    num_vars, num_rest = int(rng.integers(2, 5)), int(rng.integers(2, 5))
+    coef_restricciones = rng.integers(-3, 6, (num_rest, num_vars)).astype(float)
+    lados_derechos = rng.integers(0, 10, num_rest).astype(float)
+    if metodo == "simplex":
+        operadores = ["<="] * num_rest
+        coef_restricciones = np.abs(coef_restricciones)
+        coef_objetivo, tipo_operacion = rng.integers(0, 6, num_vars), "maximizar"
+    elif metodo == "dual":
+        operadores = [str(op) for op in rng.choice(["<=", ">="], num_rest)]
+        coef_objetivo, tipo_operacion = rng.integers(0, 6, num_vars), "minimizar"
+    else:
+        operadores = [str(op) for op in rng.choice(["<=", ">=", "="], num_rest)]
+        coef_objetivo = rng.integers(-3, 6, num_vars)
+        tipo_operacion = str(rng.choice(["maximizar", "minimizar"]))
+    return {
+        "num_variables": num_vars,
+        "num_restricciones": num_rest,
+        "coef_objetivo": coef_objetivo.astype(float).tolist(),
+        "tipo_operacion": tipo_operacion,
+        "coef_restricciones": coef_restricciones.tolist(),
+        "operadores": operadores,
+        "lados_derechos": lados_derechos.tolist(),
+        "metodo": metodo
+    }
+
+@pytest.mark.parametrize("modo_traza", ("iteraciones", "pivotes"))
+@pytest.mark.parametrize("metodo", ("simplex", "dual", "gran_m", "dos_fases"))
+def test_reconstruir_tabla_como_traza_completa(metodo, modo_traza):
+    for semilla in range(25):
+        datos = modelo_aleatorio(semilla, metodo)
+        completo = resolver_simplex_paso_a_paso(dict(datos, modo_traza="completo"))
+        compacto = resolver_simplex_paso_a_paso(dict(datos, modo_traza=modo_traza))
+        assert [paso["descripcion"] for paso in compacto["pasos"]] == \
+            [paso["descripcion"] for paso in completo["pasos"]]
+
+        for indice, esperado in enumerate(completo["pasos"]):
+            paso = paso_con_tablas(compacto, indice)
+            # En el modo completo no todos los pasos guardan tabla (la selección de pivote
+            # del Simplex con una sola tabla, por ejemplo): solo se comparan las guardadas
+            for nombre in ("Tabla", "Tabla_numerico", "Tabla_M"):
+                if nombre in esperado:
+                    np.testing.assert_allclose(paso[nombre], esperado[nombre], atol=1e-9,
+                                               err_msg=f"semilla {semilla}, paso {indice}")
+
+def test_paso_con_tablas_sin_tablas():
+    datos = dict(modelo_aleatorio(0, "gran_m"), modo_traza="pivotes")
+    resultado = resolver_simplex_paso_a_paso(datos)
+    with pytest.raises(ValueError):
+        paso_con_tablas(resultado, len(resultado["pasos"]))
+    with pytest.raises(ValueError):
+        paso_con_tablas(resolver_simplex_paso_a_paso(dict(datos, metodo="revisado")), 1)
+
+@pytest.mark.parametrize("datos, estado", [
+    (NO_ACOTADO_CON_ARTIFICIALES, "Problema no acotado"),
+    (INFACTIBLE_CON_ARTIFICIALES, "Problema sin solución factible")
+])
+def test_gran_m_decide_factibilidad_con_dos_fases(datos, estado):
+    resultado = metodo_gran_m(dict(datos))
+    assert "Comprobación de factibilidad" in [paso["descripcion"] for paso in resultado["pasos"]]
+    assert resultado["resultado_final"]["status_text"] == estado
+    assert resultado["resultado_final"]["decidido_por"] == "dos_fases"
+
+def test_gran_m_comprobacion_con_presupuesto_restante():
+    completo = metodo_gran_m(dict(INFACTIBLE_CON_ARTIFICIALES))["resultado_final"]
+    # Las dos fases continúan con las iteraciones que dejó la Gran M, no con otras tantas
+    for max_iteraciones in range(1, completo["iteraciones"]):
+        final = metodo_gran_m(dict(INFACTIBLE_CON_ARTIFICIALES, max_iteraciones=max_iteraciones))["resultado_final"]
+        assert final["status_text"] == "Número máximo de iteraciones alcanzado"
+        assert final["iteraciones"] <= max_iteraciones
+    final = metodo_gran_m(dict(INFACTIBLE_CON_ARTIFICIALES, max_iteraciones=completo["iteraciones"] + 1))
+    assert final["resultado_final"]["status_text"] == "Problema sin solución factible"
@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+from app import app
+from models.simplex_revisado import metodo_simplex_revisado
+
+# max 3·x1 + 5·x2 con x1 <= 4, 2·x2 <= 12 y 3·x1 + 2·x2 <= 18: óptimo (2, 6) con z = 36
+# y base final {h1, x2, x1}
+MODELO = {
+    "num_variables": 2,
+    "num_restricciones": 3,
+    "coef_objetivo": [3, 5],
+    "tipo_operacion": "maximizar",
+    "coef_restricciones": [[1, 0], [0, 2], [3, 2]],
+    "operadores": ["<=", "<=", "<="],
+    "lados_derechos": [4, 12, 18]
+}
+
+# Sin objetivo, todo paso dual es degenerado: reoptimizar desde las holguras con
+# estos lados derechos encadena más de MAX_PIVOTES_DEGENERADOS pivotes duales
+MODELO_DUAL_DEGENERADO = {
+    "num_variables": 6,
+    "num_restricciones": 6,
+    "coef_objetivo": [0, 0, 0, 0, 0, 0],
+    "tipo_operacion": "minimizar",
+    "coef_restricciones": [
+        [3, -3, 0, 2, 2, 0],
+        [3, -1, -3, -3, 3, -3],
+        [0, -2, 2, 0, 1, 3],
+        [-2, -3, -1, 2, 1, -3],
+        [2, -1, 3, 2, 3, -2],
+        [0, 3, -3, -2, -3, -3]
+    ],
+    "operadores": ["<=", "<=", "<=", "<=", "<=", "<="],
+    "lados_derechos": [-5, -8, -5, -3, 1, -2]
+}
+
+def descripciones(resultado):
+    return {paso["descripcion"] for paso in resultado["pasos"][1:]}
+
+def comprobar_como_desde_cero(caliente, datos):
+    desde_cero = metodo_simplex_revisado(dict(datos))["resultado_final"]
+    final = caliente["resultado_final"]
+    assert final["status_text"] == desde_cero["status_text"] == "Óptimo"
+    assert final["valor_objetivo"] == pytest.approx(desde_cero["valor_objetivo"])
+    np.testing.assert_allclose([v["valor"] for v in final["variables"]],
+                               [v["valor"] for v in desde_cero["variables"]], atol=1e-9)
+
+def test_base_final():
+    final = metodo_simplex_revisado(dict(MODELO))["resultado_final"]
+    assert sorted(final["base"]) == ["h1", "x1", "x2"]
+    assert final["valor_objetivo"] == pytest.approx(36)
+
+def test_cambio_de_lados_derechos_con_simplex_dual():
+    base = metodo_simplex_revisado(dict(MODELO))["resultado_final"]["base"]
+    # Con 3·x1 + 2·x2 <= 10 la base previa daría x1 = -2/3: deja de ser factible
+    datos = dict(MODELO, lados_derechos=[4, 12, 10])
+    caliente = metodo_simplex_revisado(dict(datos, base_inicial=base))
+    assert caliente["resultado_final"]["arranque_en_caliente"]
+    assert descripciones(caliente) == {"Iteración del simplex dual"}
+    comprobar_como_desde_cero(caliente, datos)
+
+def test_cambio_de_objetivo_con_simplex_primal():
+    base = metodo_simplex_revisado(dict(MODELO))["resultado_final"]["base"]
+    # Con max 5·x1 + 2·x2 la base previa sigue siendo factible pero ya no es óptima: (4, 3)
+    datos = dict(MODELO, coef_objetivo=[5, 2])
+    caliente = metodo_simplex_revisado(dict(datos, base_inicial=base))
+    assert caliente["resultado_final"]["arranque_en_caliente"]
+    assert descripciones(caliente) == {"Iteración del simplex revisado"}
+    assert caliente["resultado_final"]["valor_objetivo"] == pytest.approx(26)
+    comprobar_como_desde_cero(caliente, datos)
+
+@pytest.mark.parametrize("base_inicial", [
+    ["h1", "x2"],                   # tamaño distinto
+    ["x1", "x1", "h1"],             # columna repetida
+    ["a1", "x1", "x2"],             # artificial
+    ["x3", "x1", "h1"],             # variable desconocida
+    ["h1", "x2", "x1", "q"],        # nombre sin número
+    ["x2", "h2", "h3"]              # singular: ninguna columna cubre la primera fila
+])
+def test_base_inicial_no_valida_resuelve_desde_cero(base_inicial):
+    datos = dict(MODELO, lados_derechos=[4, 12, 10])
+    caliente = metodo_simplex_revisado(dict(datos, base_inicial=base_inicial))
+    assert not caliente["resultado_final"]["arranque_en_caliente"]
+    comprobar_como_desde_cero(caliente, datos)
+
+def test_simplex_dual_degenerado_pasa_a_bland():
+    datos = dict(MODELO_DUAL_DEGENERADO, base_inicial=[f"h{i+1}" for i in range(6)])
+    caliente = metodo_simplex_revisado(datos)
+    final = caliente["resultado_final"]
+    assert descripciones(caliente) == {"Iteración del simplex dual"}
+    assert final["cambio_a_bland"]
+    assert final["status_text"] == metodo_simplex_revisado(dict(MODELO_DUAL_DEGENERADO))["resultado_final"]["status_text"]
+
+    # Cualquier punto factible es óptimo: basta con comprobar la factibilidad
+    x = np.array([v["valor"] for v in final["variables"]])
+    assert (x >= 0).all()
+    assert (np.array(datos["coef_restricciones"]) @ x <= np.array(datos["lados_derechos"]) + 1e-9).all()
+
+@pytest.mark.parametrize("cambio", [{"lados_derechos": [4, 12, 10]}, {"objetivo": [5, 2]}])
+def test_api_reoptimizar(cambio):
+    cliente = app.test_client()
+    cuerpo = {"objetivo": [3, 5], "restricciones": [[1, 0], [0, 2], [3, 2]], "lados_derechos": [4, 12, 18]}
+    previo = cliente.post("/api/v1/solve", json=cuerpo).get_json()
+
+    respuesta = cliente.post(f"/api/v1/solve/{previo['id_resultado']}/resolve", json=cambio)
+    assert respuesta.status_code == 200
+    caliente = respuesta.get_json()
+    desde_cero = cliente.post("/api/v1/solve", json=dict(cuerpo, **cambio)).get_json()
+    assert caliente["arranque_en_caliente"] and not desde_cero["arranque_en_caliente"]
+    assert caliente["status_text"] == desde_cero["status_text"] == "Óptimo"
+    assert caliente["valor_objetivo"] == pytest.approx(desde_cero["valor_objetivo"])
+    np.testing.assert_allclose([v["valor"] for v in caliente["variables"]],
+                               [v["valor"] for v in desde_cero["variables"]], atol=1e-9)
+
+def test_api_reoptimizar_errores():
+    cliente = app.test_client()
+    assert cliente.post("/api/v1/solve/desconocido/resolve", json={}).status_code == 404
+    cuerpo = {"objetivo": [3, 5], "restricciones": [[1, 0], [0, 2], [3, 2]], "lados_derechos": [4, 12, 18]}
+    previo = cliente.post("/api/v1/solve", json=cuerpo).get_json()
+    respuesta = cliente.post(f"/api/v1/solve/{previo['id_resultado']}/resolve", json={"lados_derechos": [1]})
+    assert respuesta.status_code == 400
@@ -0,0 +1,76 @@
+import time
+
+import pytest
+
+import app
+from models.ejecutor import EjecutorResoluciones
+from models.trabajos import GestorTrabajos, AlmacenMemoria, AlmacenSQLite
+
+CUERPO = {"objetivo": [3, 5], "restricciones": [[1, 0], [0, 2], [3, 2]], "lados_derechos": [4, 12, 18]}
+
+def esperar(gestor, id_trabajo, limite=10):
+    final = time.monotonic() + limite
+    while time.monotonic() < final:
+        trabajo = gestor.consultar(id_trabajo)
+        if trabajo["estado"] in ("terminado", "error"):
+            return trabajo
+        time.sleep(0.01)
+    raise AssertionError(f"El trabajo {id_trabajo} no terminó")
+
+@pytest.fixture(params=("memoria", "sqlite"))
+def gestor(request, tmp_path):
+    almacen = AlmacenMemoria() if request.param == "memoria" else AlmacenSQLite(str(tmp_path / "trabajos.db"))
+    return GestorTrabajos(almacen, EjecutorResoluciones(tamano=0))
+
+def resolver_con_error(datos):
+    return {"status": None, "status_text": None, "error": "Backend desconocido: x"}
+
+def resolver_sin_error(datos):
+    return {"status": 1, "status_text": "Óptimo", "error": None}
+
+def lanzar_excepcion(datos):
+    raise ValueError("Modelo no válido")
+
+@pytest.mark.parametrize("funcion, estado, error", [
+    (resolver_sin_error, "terminado", None),
+    (resolver_con_error, "error", "Backend desconocido: x"),
+    (lanzar_excepcion, "error", "Modelo no válido")
+])
+def test_estado_final(gestor, funcion, estado, error):
+    id_trabajo = gestor.enviar("solve", funcion, {})
+    trabajo = esperar(gestor, id_trabajo)
+    assert trabajo["estado"] == estado
+    assert trabajo["error"] == error
+    assert gestor.resultado(id_trabajo)["resultado"] == (resolver_sin_error({}) if estado == "terminado" else None)
+
+@pytest.fixture
+def cliente(monkeypatch):
+    gestor = GestorTrabajos(AlmacenMemoria(), EjecutorResoluciones(tamano=0))
+    monkeypatch.setattr(app, "trabajos", gestor)
+    return app.app.test_client(), gestor
+
+def test_api_trabajo_con_error_del_solver(cliente):
+    cliente, gestor = cliente
+    respuesta = cliente.post("/api/v1/jobs", json=dict(CUERPO, backend="desconocido"))
+    assert respuesta.status_code == 202
+    id_trabajo = respuesta.get_json()["id"]
+    esperar(gestor, id_trabajo)
+
+    trabajo = cliente.get(f"/api/v1/jobs/{id_trabajo}").get_json()
+    assert trabajo["estado"] == "error"
+    assert trabajo["error"] == "Backend desconocido: desconocido"
+    assert "url_resultado" not in trabajo
+    respuesta = cliente.get(f"/api/v1/jobs/{id_trabajo}/resultado")
+    assert respuesta.status_code == 400
+    assert respuesta.get_json() == {"error": "Backend desconocido: desconocido"}
+
+def test_api_trabajo_terminado(cliente):
+    cliente, gestor = cliente
+    id_trabajo = cliente.post("/api/v1/jobs", json=CUERPO).get_json()["id"]
+    esperar(gestor, id_trabajo)
+
+    trabajo = cliente.get(f"/api/v1/jobs/{id_trabajo}").get_json()
+    assert trabajo["estado"] == "terminado"
+    resultado = cliente.get(trabajo["url_resultado"]).get_json()
+    assert resultado["status_text"] == "Óptimo"
+    assert resultado["valor_objetivo"] == pytest.approx(36)